@@ -0,0 +1,75 @@
+# src/absence_repo.py
+from __future__ import annotations
+
+import sqlite3
+
+
+def insert_absence_panel(
+    con: sqlite3.Connection,
+    teacher_id: str,
+    start_date: str,
+    end_date: str,
+    already: int,
+    channel_id: str,
+    message_ts: str,
+    cover_ids: list[str],
+) -> int:
+    """
+    Record a posted absence panel and the covers it lists. Returns panel_id.
+    IMPORTANT: does NOT commit. Caller decides.
+    """
+    cur = con.execute(
+        """
+        INSERT INTO absence_panels (teacher_id, start_date, end_date, already, channel_id, message_ts)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (teacher_id, start_date, end_date, already, channel_id, message_ts),
+    )
+    panel_id = cur.lastrowid
+    con.executemany(
+        "INSERT INTO absence_panel_covers (panel_id, cover_id) VALUES (?, ?)",
+        [(panel_id, cover_id) for cover_id in cover_ids],
+    )
+    return panel_id
+
+
+def get_absence_panel(con: sqlite3.Connection, panel_id: int) -> dict | None:
+    """
+    The panel row plus "cover_ids" (in creation order), or None.
+    """
+    row = con.execute(
+        """
+        SELECT teacher_id, start_date, end_date, already, channel_id, message_ts
+        FROM absence_panels WHERE panel_id=?
+        """,
+        (panel_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    cur = con.execute(
+        "SELECT cover_id FROM absence_panel_covers WHERE panel_id=? ORDER BY cover_id",
+        (panel_id,),
+    )
+    return {
+        "teacher_id": row[0],
+        "start_date": row[1],
+        "end_date": row[2],
+        "already": row[3],
+        "channel_id": row[4],
+        "message_ts": row[5],
+        "cover_ids": [r[0] for r in cur.fetchall()],
+    }
+
+
+def list_panels_for_covers(con: sqlite3.Connection, cover_ids: list[str]) -> set[int]:
+    """
+    panel_ids of the absence panels listing any of these covers.
+    """
+    if not cover_ids:
+        return set()
+    marks = ",".join("?" * len(cover_ids))
+    cur = con.execute(
+        f"SELECT DISTINCT panel_id FROM absence_panel_covers WHERE cover_id IN ({marks})",
+        cover_ids,
+    )
+    return {r[0] for r in cur.fetchall()}
@@ -25,7 +25,7 @@ def list_attempts_for_cover(con: sqlite3.Connection, cover_id: str):
         """
         SELECT * FROM accept_attempts
         WHERE cover_id = ?
-        ORDER BY id ASC
+        ORDER BY attempt_id ASC
         """,
         (cover_id,),
     ).fetchall()
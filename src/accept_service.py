@@ -3,20 +3,22 @@ from __future__ import annotations
 
 import sqlite3
 from datetime import datetime, timezone
+from typing import Callable
 
 from accept_repo import log_attempt
 from cover_repo import get_cover, fill_cover
-from cover_time import materialize_for_cover_date
+from cover_time import materialize_for_cover_date, week_start
 from algorithm import eligibility_reasons
 from models import Teacher, ClassSession
-from reason_library import match_reasons
+from reason_library import Reason, encode_reasons, match_reason
+from week_load_repo import get_week_load
 
 
-def _friendly(codes: list[str]) -> str:
+def _friendly(codes: list[Reason] | list[str]) -> str:
     # Slack-friendly bullets
     if not codes:
         return ""
-    return "\n".join(f"• {match_reasons(c)}" for c in codes)
+    return "\n".join(f"• {match_reason(c)}" for c in codes)
 
 
 def attempt_accept(
@@ -26,10 +28,13 @@ def attempt_accept(
     teachers_by_id: dict[str, Teacher],
     classes_by_id: dict[str, ClassSession],
     busy_sessions_by_teacher: dict[str, list[ClassSession]],
+    on_fill: Callable[[sqlite3.Connection], None] | None = None,
 ) -> tuple[bool, str]:
     """
     Returns: (accepted?, message_or_reason)
     Deterministic + explainable.
+    on_fill(con) runs inside the fill's transaction, before the commit (e.g. to
+    enqueue follow-up jobs that must not be lost to a crash).
     """
     ts = datetime.now(timezone.utc).isoformat(timespec="seconds")
 
@@ -72,9 +77,13 @@ def attempt_accept(
             con.commit()
             return False, _friendly([code])
 
-        reasons = eligibility_reasons(teacher, class_session, busy_sessions_by_teacher)
+        # Weekly cap: read under the write lock, a point lookup on teacher_week_loads
+        covers_this_week = get_week_load(con, teacher_id, week_start(cover.cover_date))
+        reasons = eligibility_reasons(
+            teacher, class_session, busy_sessions_by_teacher, covers_this_week
+        )
         if reasons:
-            reason_str = "|".join(reasons)  # store raw codes in DB
+            reason_str = encode_reasons(reasons)  # same "a|b(x)" codes as always
             log_attempt(con, cover_id, teacher_id, ts, "REJECTED", reason_str)
             con.commit()
             return False, _friendly(reasons)
@@ -83,6 +92,8 @@ def attempt_accept(
         ok = fill_cover(con, cover_id, teacher_id)
         if ok:
             log_attempt(con, cover_id, teacher_id, ts, "ACCEPTED", "")
+            if on_fill is not None:
+                on_fill(con)
             con.commit()
             return True, "accepted"
 
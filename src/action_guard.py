@@ -0,0 +1,146 @@
+# src/action_guard.py
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from action_repo import claim_action, get_action_result, set_action_results
+from db import get_con
+
+# Redeliveries of one interaction carry the same action_ts / view id
+ACTION_TTL_S = 3600
+# Double clicks are separate interactions (new action_ts) on the same button
+ACTION_CLICK_WINDOW_S = 10
+
+MEM_PRUNE_AT = 5000
+
+
+@dataclass(frozen=True)
+class ActionClaim:
+    key: str | None
+    first: bool
+    result: str | None = None  # first delivery's outcome, for duplicates
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat(timespec="milliseconds")
+
+
+def action_keys(body) -> tuple[str | None, str | None]:
+    """
+    (delivery key, click key) for an interaction payload.
+
+    delivery: action_id + action_ts (block actions) or callback_id + view id
+              (modal submits; trigger_id if there is no view) + user
+    click:    the same button on the same message by the same user, any ts
+    """
+    user = (body.get("user") or {}).get("id", "")
+    kind = body.get("type")
+
+    if kind == "block_actions" and body.get("actions"):
+        a = body["actions"][0]
+        delivery = f"action:{a['action_id']}:{a.get('action_ts')}:{user}"
+        msg_ts = (body.get("container") or {}).get("message_ts", "")
+        click = f"click:{a['action_id']}:{a.get('value', '')}:{msg_ts}:{user}"
+        return delivery, click
+
+    if kind == "view_submission":
+        view = body.get("view") or {}
+        ref = view.get("id") or body.get("trigger_id")
+        return f"view:{view.get('callback_id')}:{ref}:{user}", None
+
+    return None, None
+
+
+class ActionGuard:
+    """
+    At-most-once handling of Slack interactions.
+
+    begin() claims the delivery (and, for buttons, a short click window) in an
+    in-memory front cache and in the action_claims TTL table. Only the first
+    claim proceeds; duplicates get the first delivery's recorded result back and
+    must return without touching the DB or Slack.
+    """
+
+    def __init__(
+        self, ttl_s: int = ACTION_TTL_S, click_window_s: int = ACTION_CLICK_WINDOW_S
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.click_window_s = click_window_s
+        # key -> (monotonic expiry, delivery key that owns it)
+        self._mem: dict[str, tuple[float, str]] = {}
+        # delivery key -> result of that first delivery
+        self._results: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def begin(self, body) -> ActionClaim:
+        delivery, click = action_keys(body)
+        if delivery is None:
+            return ActionClaim(None, True)
+
+        claims = [(delivery, self.ttl_s)]
+        if click is not None:
+            claims.append((click, self.click_window_s))
+
+        # Front cache: duplicates in this process never reach SQLite
+        now_m = time.monotonic()
+        with self._lock:
+            for key, _ttl in claims:
+                hit = self._mem.get(key)
+                if hit is not None and hit[0] > now_m:
+                    self.duplicates += 1
+                    return ActionClaim(delivery, False, self._results.get(hit[1]))
+            for key, ttl in claims:
+                self._mem[key] = (now_m + ttl, delivery)
+            self._prune(now_m)
+
+        # Durable claim (survives restarts / other processes)
+        now = datetime.now(timezone.utc)
+        con = get_con()
+        try:
+            con.execute("BEGIN IMMEDIATE")
+            taken = [
+                key
+                for key, ttl in claims
+                if not claim_action(
+                    con, key, _iso(now), _iso(now + timedelta(seconds=ttl))
+                )
+            ]
+            if not taken:
+                con.commit()
+                return ActionClaim(delivery, True)
+            con.rollback()
+            result = get_action_result(con, taken[0])
+        finally:
+            con.close()
+
+        with self._lock:
+            self.duplicates += 1
+        return ActionClaim(delivery, False, result)
+
+    def finish(self, body, key: str | None, result: str) -> None:
+        """
+        Record the first delivery's outcome (what duplicates get back).
+        """
+        if key is None:
+            return
+        keys = [k for k in action_keys(body) if k is not None]
+        with self._lock:
+            self._results[key] = result
+
+        con = get_con()
+        try:
+            set_action_results(con, keys, result)
+            con.commit()
+        finally:
+            con.close()
+
+    def _prune(self, now_m: float) -> None:
+        if len(self._mem) < MEM_PRUNE_AT:
+            return
+        self._mem = {k: v for k, v in self._mem.items() if v[0] > now_m}
+        live = {owner for _exp, owner in self._mem.values()}
+        self._results = {k: v for k, v in self._results.items() if k in live}
@@ -0,0 +1,45 @@
+import sqlite3
+
+# IMPORTANT: does NOT commit. Caller decides.
+
+
+def claim_action(
+    con: sqlite3.Connection, action_key: str, created_at: str, expires_at: str
+) -> bool:
+    """
+    True if this is the first claim of action_key (or the old claim has expired).
+    """
+    con.execute(
+        "DELETE FROM action_claims WHERE action_key=? AND expires_at <= ?",
+        (action_key, created_at),
+    )
+    cur = con.execute(
+        """
+      INSERT INTO action_claims (action_key, result, created_at, expires_at)
+      VALUES (?, NULL, ?, ?)
+      ON CONFLICT(action_key) DO NOTHING
+    """,
+        (action_key, created_at, expires_at),
+    )
+    return cur.rowcount == 1
+
+
+def set_action_results(
+    con: sqlite3.Connection, action_keys: list[str], result: str
+) -> None:
+    con.executemany(
+        "UPDATE action_claims SET result=? WHERE action_key=?",
+        [(result, k) for k in action_keys],
+    )
+
+
+def get_action_result(con: sqlite3.Connection, action_key: str) -> str | None:
+    row = con.execute(
+        "SELECT result FROM action_claims WHERE action_key=?", (action_key,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def purge_expired_actions(con: sqlite3.Connection, now: str) -> int:
+    cur = con.execute("DELETE FROM action_claims WHERE expires_at <= ?", (now,))
+    return cur.rowcount
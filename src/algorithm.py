@@ -1,10 +1,13 @@
 # src/algorithm.py
 from __future__ import annotations
 
+import heapq
 from zoneinfo import ZoneInfo
 
 from models import Teacher, ClassSession
 from datetime import date
+from reason_library import Reason, ReasonCode, reason
+from rule_pipeline import RulePipeline
 
 SYDNEY_TZ = ZoneInfo("Australia/Sydney")
 
@@ -13,17 +16,20 @@ SENIOR_SUBJECTS = {"MADV", "MAS", "MX1", "MX2"}
 
 MIN_TRAVEL_GAP_MIN = 180  # 3 hours
 
+# Ranking weights (soft preferences among recommended teachers; higher = better)
+SCORE_PRIMARY_CAMPUS = 3.0
+SCORE_NEAR_CLASS = 2.0  # scaled by how close their nearest same-day class is
+NEAR_CLASS_HORIZON_MIN = 240  # beyond this gap, being "in that day" counts for nothing
+SCORE_WEEKLY_LOAD = 4.0  # penalty scaled by covers_this_week / max_covers_per_week
+SCORE_LIGHT_LOAD = 1.5  # scaled by spare teaching hours
+FULL_LOAD_HOURS = 40.0
+SCORE_EMPLOYMENT = {"CASUAL": 2.0, "PART_TIME": 1.0, "FULL_TIME": 0.0}
+
 
 def is_senior_teacher(t: Teacher) -> bool:
     return (12 in t.year_levels) or ("MX1" in t.subjects) or ("MX2" in t.subjects)
 
 
-def mm_to_hhmm(m: int) -> str:
-    h = m // 60
-    mm = m % 60
-    return f"{h:02d}:{mm:02d}"
-
-
 def matrix_can_teach(t: Teacher, c: ClassSession) -> bool:
     if is_senior_teacher(t):
         # Senior can cover everything 7–12, all courses
@@ -86,42 +92,41 @@ def within_availability(
     return False
 
 
-def capability_reasons(teacher: Teacher, c: ClassSession) -> list[str]:
-    reasons: list[str] = []
+def matrix_reasons(teacher: Teacher, c: ClassSession) -> list[Reason]:
+    if matrix_can_teach(teacher, c):
+        return []
+    if is_senior_teacher(teacher):
+        return [reason(ReasonCode.INVALID_CLASS_SUBJECT_OR_YEAR)]
+
+    reasons: list[Reason] = []
+    if c.year_level == 12:
+        reasons.append(reason(ReasonCode.JUNIOR_CANNOT_COVER_YEAR12))
+    if c.subject in {"MX1", "MX2"}:
+        reasons.append(reason(ReasonCode.JUNIOR_CANNOT_COVER_EXTENSION))
+    elif 7 <= c.year_level <= 10 and c.subject != "MAT":
+        reasons.append(reason(ReasonCode.JUNIOR_ONLY_MAT_7_10))
+    elif c.year_level == 11 and c.subject not in {"MADV", "MAS"}:
+        reasons.append(reason(ReasonCode.JUNIOR_ONLY_MADV_OR_MAS_11))
+    return reasons
 
-    if not matrix_can_teach(teacher, c):
-        if not is_senior_teacher(teacher):
-            if c.year_level == 12:
-                reasons.append("junior_cannot_cover_year12")
-            if c.subject in {"MX1", "MX2"}:
-                reasons.append("junior_cannot_cover_extension")
-            elif 7 <= c.year_level <= 10 and c.subject != "MAT":
-                reasons.append("junior_only_mat_7_10")
-            elif c.year_level == 11 and c.subject not in {"MADV", "MAS"}:
-                reasons.append("junior_only_madv_or_mas_11")
-        else:
-            reasons.append("invalid_class_subject_or_year")
 
+def is_regular_teacher(teacher: Teacher, c: ClassSession) -> bool:
     # can't select the regular teacher
-    if c.regular_teacher_id is not None and teacher.teacher_id == c.regular_teacher_id:
-        reasons.append("is_regular_teacher")
-
-    if c.campus not in teacher.campuses:
-        reasons.append(f"campus_not_allowed({c.campus})")
-
-    return reasons
+    return (
+        c.regular_teacher_id is not None and teacher.teacher_id == c.regular_teacher_id
+    )
 
 
 def clash_reasons(
     teacher_id: str,
     c: ClassSession,
     busy_sessions_by_teacher: dict[str, list[ClassSession]],
-) -> list[str]:
+) -> list[Reason]:
     """
     Clash check against the teacher's regular timetable.
     Later you'll also add: clashes against covers they've already accepted.
     """
-    reasons: list[str] = []
+    reasons: list[Reason] = []
 
     busy = busy_sessions_by_teacher.get(teacher_id, [])
     for b in busy:
@@ -129,48 +134,158 @@ def clash_reasons(
         if b.class_id == c.class_id:
             continue
         if overlaps(c.start_at, c.end_at, b.start_at, b.end_at):
-            reasons.append(f"timetable_clash({b.class_id})")
+            reasons.append(reason(ReasonCode.TIMETABLE_CLASH, b.class_id))
             break
 
     return reasons
 
 
-def availability_reasons(teacher: Teacher, c: ClassSession) -> list[str]:
+def has_clash(
+    teacher_id: str,
+    c: ClassSession,
+    busy_sessions_by_teacher: dict[str, list[ClassSession]],
+) -> bool:
+    for b in busy_sessions_by_teacher.get(teacher_id, []):
+        if b.class_id != c.class_id and overlaps(
+            c.start_at, c.end_at, b.start_at, b.end_at
+        ):
+            return True
+    return False
+
+
+def is_available(teacher: Teacher, c: ClassSession) -> bool:
+    day, start_min, end_min = class_local_day_and_minutes(c)
+    return within_availability(teacher, day, start_min, end_min)
+
+
+def availability_reasons(teacher: Teacher, c: ClassSession) -> list[Reason]:
     day, start_min, end_min = class_local_day_and_minutes(c)
 
     if day not in teacher.availability:
-        return [f"not_available_on_day({day})"]
+        return [reason(ReasonCode.NOT_AVAILABLE_ON_DAY, day)]
 
     if not within_availability(teacher, day, start_min, end_min):
-        return [
-            f"not_available_in_window({day}:{mm_to_hhmm(start_min)}-{mm_to_hhmm(end_min)})"
-        ]
+        return [reason(ReasonCode.NOT_AVAILABLE_IN_WINDOW, day, start_min, end_min)]
 
     return []
 
 
+def weekly_load_reasons(teacher: Teacher, covers_this_week: int) -> list[Reason]:
+    """
+    covers_this_week: FILLED covers the teacher already holds in the cover's week
+    (teacher_week_loads, so this is a lookup, not a scan).
+    """
+    if covers_this_week >= teacher.max_covers_per_week:
+        return [reason(ReasonCode.WEEKLY_COVER_LIMIT_REACHED)]
+    return []
+
+
+# ----------------------------
+# Eligibility pipeline (hard constraints)
+# Every rule takes (teacher, c, busy_sessions_by_teacher, covers_this_week);
+# covers_this_week=None skips the weekly cap (callers without load data).
+# ----------------------------
+ELIGIBILITY = RulePipeline()
+
+
+@ELIGIBILITY.rule("capability", explain=lambda t, c, _busy, _load: matrix_reasons(t, c))
+def _rule_capability(t: Teacher, c: ClassSession, _busy, _load) -> bool:
+    return matrix_can_teach(t, c)
+
+
+@ELIGIBILITY.rule(
+    "regular_teacher",
+    explain=lambda t, c, _busy, _load: (
+        [reason(ReasonCode.IS_REGULAR_TEACHER)] if is_regular_teacher(t, c) else []
+    ),
+)
+def _rule_regular_teacher(t: Teacher, c: ClassSession, _busy, _load) -> bool:
+    return not is_regular_teacher(t, c)
+
+
+@ELIGIBILITY.rule(
+    "campus",
+    explain=lambda t, c, _busy, _load: (
+        []
+        if c.campus in t.campuses
+        else [reason(ReasonCode.CAMPUS_NOT_ALLOWED, c.campus)]
+    ),
+)
+def _rule_campus(t: Teacher, c: ClassSession, _busy, _load) -> bool:
+    return c.campus in t.campuses
+
+
+@ELIGIBILITY.rule(
+    "availability", explain=lambda t, c, _busy, _load: availability_reasons(t, c)
+)
+def _rule_availability(t: Teacher, c: ClassSession, _busy, _load) -> bool:
+    return is_available(t, c)
+
+
+@ELIGIBILITY.rule(
+    "clash", explain=lambda t, c, busy, _load: clash_reasons(t.teacher_id, c, busy)
+)
+def _rule_clash(t: Teacher, c: ClassSession, busy, _load) -> bool:
+    return not has_clash(t.teacher_id, c, busy)
+
+
+@ELIGIBILITY.rule(
+    "weekly_cap",
+    explain=lambda t, _c, _busy, load: (
+        [] if load is None else weekly_load_reasons(t, load)
+    ),
+)
+def _rule_weekly_cap(t: Teacher, _c, _busy, load: int | None) -> bool:
+    return load is None or load < t.max_covers_per_week
+
+
 def eligibility_reasons(
     teacher: Teacher,
     c: ClassSession,
     busy_sessions_by_teacher: dict[str, list[ClassSession]],
-) -> list[str]:
-    reasons: list[str] = []
-    reasons += capability_reasons(teacher, c)
-    reasons += availability_reasons(teacher, c)
-    reasons += clash_reasons(teacher.teacher_id, c, busy_sessions_by_teacher)
-    return reasons
+    covers_this_week: int | None = None,
+) -> list[Reason]:
+    """
+    Every failing rule's reasons (explain mode).
+    """
+    return ELIGIBILITY.explain(teacher, c, busy_sessions_by_teacher, covers_this_week)
+
+
+def is_eligible(
+    teacher: Teacher,
+    c: ClassSession,
+    busy_sessions_by_teacher: dict[str, list[ClassSession]],
+    covers_this_week: int | None = None,
+) -> bool:
+    """
+    Decide-only: stops at the first failing rule, allocates no reasons.
+    """
+    return ELIGIBILITY.decide(teacher, c, busy_sessions_by_teacher, covers_this_week)
 
 
 def eligible_teachers_for_class(
     teachers_by_id: dict[str, Teacher],
     c: ClassSession,
     busy_sessions_by_teacher: dict[str, list[ClassSession]],
-) -> tuple[list[str], dict[str, list[str]]]:
+    weekly_covers: dict[str, int] | None = None,
+    explain: bool = True,
+) -> tuple[list[str], dict[str, list[Reason]]]:
+    """
+    weekly_covers: teacher_id -> covers this week (enables the weekly cap).
+    explain=False only splits eligible/not: rejected comes back empty and no
+    reasons are allocated.
+    """
     eligible: list[str] = []
-    rejected: dict[str, list[str]] = {}
+    rejected: dict[str, list[Reason]] = {}
 
     for t in teachers_by_id.values():
-        reasons = eligibility_reasons(t, c, busy_sessions_by_teacher)
+        load = None if weekly_covers is None else weekly_covers.get(t.teacher_id, 0)
+        if not explain:
+            if is_eligible(t, c, busy_sessions_by_teacher, load):
+                eligible.append(t.teacher_id)
+            continue
+
+        reasons = eligibility_reasons(t, c, busy_sessions_by_teacher, load)
         if reasons:
             rejected[t.teacher_id] = reasons
         else:
@@ -184,7 +299,7 @@ def travel_buffer_reason(
     cover: ClassSession,
     busy_sessions_by_teacher: dict[str, list[ClassSession]],
     min_gap_min: int = MIN_TRAVEL_GAP_MIN,
-) -> str | None:
+) -> Reason | None:
     """
     Recommendation rule (weekly timetable MVP):
     - Look at the teacher's regular classes on the SAME local weekday as the cover.
@@ -223,7 +338,7 @@ def travel_buffer_reason(
         return None
 
     if closest_gap < min_gap_min:
-        return f"travel_gap_insufficient(nearest={closest.class_id}, gap_min={closest_gap})"
+        return reason(ReasonCode.TRAVEL_GAP_INSUFFICIENT, closest.class_id, closest_gap)
 
     return None
 
@@ -232,26 +347,91 @@ def recommended_teachers_for_class(
     teachers_by_id: dict[str, Teacher],
     c: ClassSession,
     busy_sessions_by_teacher: dict[str, list[ClassSession]],
-) -> tuple[list[str], dict[str, list[str]]]:
+    weekly_covers: dict[str, int] | None = None,
+    eligible: list[str] | None = None,
+) -> tuple[list[str], dict[str, list[Reason]]]:
     """
     Returns a filtered subset of eligible teachers.
-    - Eligibility (hard constraints): capability + availability + clash
+    - Eligibility (hard constraints): capability + availability + clash + weekly cap
     - Recommendation (soft constraints): travel buffer rule
+    Pass `eligible` if the caller already ran eligibility (skips the second pass).
     """
-    eligible, rejected = eligible_teachers_for_class(
-        teachers_by_id, c, busy_sessions_by_teacher
-    )
+    if eligible is None:
+        eligible, _rejected = eligible_teachers_for_class(
+            teachers_by_id, c, busy_sessions_by_teacher, weekly_covers, explain=False
+        )
 
     recommended: list[str] = []
-    not_recommended: dict[str, list[str]] = {}
+    not_recommended: dict[str, list[Reason]] = {}
 
     for tid in eligible:
-        reason = travel_buffer_reason(tid, c, busy_sessions_by_teacher)
-        if reason:
-            not_recommended[tid] = [reason]
+        soft = travel_buffer_reason(tid, c, busy_sessions_by_teacher)
+        if soft:
+            not_recommended[tid] = [soft]
         else:
             recommended.append(tid)
 
     # merge not_recommended into rejected under a different key if you want,
     # but returning separately is usually cleaner.
     return recommended, not_recommended
+
+
+# ----------------------------
+# Ranking (among recommended teachers)
+# ----------------------------
+def nearest_class_gap_min(
+    teacher_id: str,
+    c: ClassSession,
+    busy_sessions_by_teacher: dict[str, list[ClassSession]],
+) -> int | None:
+    """
+    Minutes between the cover and the teacher's closest non-overlapping class on
+    the same local weekday (same basis as travel_buffer_reason). None if no class that day.
+    """
+    cover_day, cover_s, cover_e = class_local_day_and_minutes(c)
+
+    best: int | None = None
+    for b in busy_sessions_by_teacher.get(teacher_id, []):
+        b_day, b_s, b_e = class_local_day_and_minutes(b)
+        if b_day != cover_day or not (cover_e <= b_s or b_e <= cover_s):
+            continue
+        gap = (cover_s - b_e) if b_e <= cover_s else (b_s - cover_e)
+        if best is None or gap < best:
+            best = gap
+    return best
+
+
+def teacher_score(
+    teacher: Teacher,
+    c: ClassSession,
+    busy_sessions_by_teacher: dict[str, list[ClassSession]],
+    covers_this_week: int = 0,
+) -> float:
+    """
+    Soft ranking score. Only meaningful for teachers that passed eligibility.
+    """
+    score = 0.0
+
+    if teacher.primary_campus == c.campus:
+        score += SCORE_PRIMARY_CAMPUS
+
+    gap = nearest_class_gap_min(teacher.teacher_id, c, busy_sessions_by_teacher)
+    if gap is not None:
+        score += SCORE_NEAR_CLASS * max(0.0, 1 - gap / NEAR_CLASS_HORIZON_MIN)
+
+    cap = teacher.max_covers_per_week
+    load = covers_this_week / cap if cap > 0 else 1.0
+    score -= SCORE_WEEKLY_LOAD * min(load, 1.5)
+
+    spare = max(0.0, FULL_LOAD_HOURS - teacher.teaching_hours) / FULL_LOAD_HOURS
+    score += SCORE_LIGHT_LOAD * spare
+
+    score += SCORE_EMPLOYMENT.get(teacher.employment_type, 0.0)
+    return score
+
+
+def top_k(scores: dict[str, float], k: int) -> list[str]:
+    """
+    k best teacher_ids by score (ties by teacher_id), O(n log k).
+    """
+    return heapq.nsmallest(k, scores, key=lambda tid: (-scores[tid], tid))
@@ -0,0 +1,174 @@
+# src/archive_repo.py
+from __future__ import annotations
+
+import sqlite3
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from cover_models import CoverRequest
+from cover_repo import row_to_cover
+from cover_time import SYDNEY_TZ
+from db import get_con, init_db
+
+# Closed covers stay in the hot tables for this many days after their date.
+ARCHIVE_AFTER_DAYS = 14
+ARCHIVE_BATCH_SIZE = 200
+
+_COVER_COLS = "id, cover_id, class_id, cover_date, status, created_at, filled_at, assigned_teacher_id"
+_DM_COLS = "cover_id, teacher_id, dm_channel_id, dm_ts, status, updated_at"
+_ATTEMPT_COLS = "attempt_id, cover_id, teacher_id, attempted_at, status, reason"
+
+
+def archive_cutoff(today: date | None = None, days: int = ARCHIVE_AFTER_DAYS) -> str:
+    """
+    "YYYY-MM-DD" (Sydney): covers dated strictly before this are archivable.
+    """
+    if today is None:
+        today = datetime.now(SYDNEY_TZ).date()
+    return (today - timedelta(days=days)).isoformat()
+
+
+def _archive_batch(
+    con: sqlite3.Connection, before_date: str, batch_size: int, archived_at: str
+) -> int:
+    """
+    Moves one batch of closed covers (+ their DMs and attempts) in ONE transaction.
+    Returns how many covers moved.
+    """
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        ids = [
+            r[0]
+            for r in con.execute(
+                """
+                SELECT cover_id FROM covers
+                WHERE cover_date < ? AND status != 'OPEN'
+                ORDER BY id ASC
+                LIMIT ?
+                """,
+                (before_date, batch_size),
+            ).fetchall()
+        ]
+        if not ids:
+            con.commit()
+            return 0
+
+        marks = ",".join("?" * len(ids))
+        params = (archived_at, *ids)
+
+        con.execute(
+            f"""
+            INSERT OR REPLACE INTO covers_archive ({_COVER_COLS}, archived_at)
+            SELECT {_COVER_COLS}, ? FROM covers WHERE cover_id IN ({marks})
+            """,
+            params,
+        )
+        con.execute(
+            f"""
+            INSERT OR REPLACE INTO cover_dms_archive ({_DM_COLS}, archived_at)
+            SELECT {_DM_COLS}, ? FROM cover_dms WHERE cover_id IN ({marks})
+            """,
+            params,
+        )
+        con.execute(
+            f"""
+            INSERT OR REPLACE INTO accept_attempts_archive ({_ATTEMPT_COLS}, archived_at)
+            SELECT {_ATTEMPT_COLS}, ? FROM accept_attempts WHERE cover_id IN ({marks})
+            """,
+            params,
+        )
+
+        con.execute(f"DELETE FROM accept_attempts WHERE cover_id IN ({marks})", ids)
+        con.execute(f"DELETE FROM cover_dms WHERE cover_id IN ({marks})", ids)
+        con.execute(f"DELETE FROM covers WHERE cover_id IN ({marks})", ids)
+
+        con.commit()
+        return len(ids)
+
+    except Exception:
+        con.rollback()
+        raise
+
+
+def archive_closed_covers(
+    con: sqlite3.Connection,
+    before_date: str | None = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """
+    Moves FILLED/CANCELLED covers dated before before_date (default: archive_cutoff())
+    plus their cover_dms and accept_attempts rows into the *_archive tables.
+    Batched so the write lock is only held briefly. OPEN covers are never moved.
+    Commits per batch. Returns total covers archived.
+    """
+    if before_date is None:
+        before_date = archive_cutoff()
+    archived_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    total = 0
+    while True:
+        n = _archive_batch(con, before_date, batch_size, archived_at)
+        total += n
+        if n < batch_size:
+            return total
+
+
+# ----------------------------
+# Explicit reads of archived history
+# ----------------------------
+def get_archived_cover(con: sqlite3.Connection, cover_id: str) -> CoverRequest | None:
+    row = con.execute(
+        "SELECT * FROM covers_archive WHERE cover_id = ?", (cover_id,)
+    ).fetchone()
+    return row_to_cover(row) if row else None
+
+
+def list_archived_covers(
+    con: sqlite3.Connection, from_date: str, to_date: str
+) -> list[CoverRequest]:
+    """
+    Archived covers with from_date <= cover_date <= to_date ("YYYY-MM-DD").
+    """
+    rows = con.execute(
+        """
+        SELECT * FROM covers_archive
+        WHERE cover_date BETWEEN ? AND ?
+        ORDER BY id ASC
+        """,
+        (from_date, to_date),
+    ).fetchall()
+    return [row_to_cover(r) for r in rows]
+
+
+def list_archived_dms_for_cover(con: sqlite3.Connection, cover_id: str):
+    return con.execute(
+        """
+        SELECT teacher_id, dm_channel_id, dm_ts, status
+        FROM cover_dms_archive WHERE cover_id = ?
+        """,
+        (cover_id,),
+    ).fetchall()
+
+
+def list_archived_attempts_for_cover(con: sqlite3.Connection, cover_id: str):
+    return con.execute(
+        """
+        SELECT * FROM accept_attempts_archive
+        WHERE cover_id = ?
+        ORDER BY attempt_id ASC
+        """,
+        (cover_id,),
+    ).fetchall()
+
+
+def main() -> None:
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else ARCHIVE_AFTER_DAYS
+
+    con = get_con()
+    init_db(con)
+    n = archive_closed_covers(con, archive_cutoff(days=days))
+    print(f"Archived {n} covers older than {days} days.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,518 @@
+# src/assignment_solver.py
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from algorithm import (
+    SCORE_EMPLOYMENT,
+    SCORE_LIGHT_LOAD,
+    SCORE_NEAR_CLASS,
+    SCORE_PRIMARY_CAMPUS,
+    is_eligible,
+    teacher_score,
+    travel_buffer_reason,
+)
+from cover_models import CoverRequest
+from cover_time import materialize_for_cover_date, week_start
+from models import ClassSession, Teacher
+
+# Costs are integers: (best possible score - score) in hundredths
+_SCORE_CEILING = (
+    SCORE_PRIMARY_CAMPUS
+    + SCORE_NEAR_CLASS
+    + SCORE_LIGHT_LOAD
+    + max(SCORE_EMPLOYMENT.values())
+)
+# Travel-buffer (soft-excluded) teachers are only used when nobody better fits
+SOFT_EXCLUDED_COST = 10_000
+# Flows the chain search may run per week before keeping its best answer
+SOLVE_MAX_RELAXATIONS = 40
+
+_INF = float("inf")
+
+
+@dataclass
+class Proposal:
+    """
+    Joint assignment for a set of OPEN covers. Nothing is written.
+    """
+
+    # cover_id -> teacher_id
+    assignments: dict[str, str] = field(default_factory=dict)
+    # covers no teacher is left for
+    unassigned: list[str] = field(default_factory=list)
+    # covers given a travel-buffer (soft-excluded) teacher
+    travel_flagged: list[str] = field(default_factory=list)
+    cost: int = 0
+    # most covers any assignment could fill; > len(assignments) only when the
+    # chain search hit SOLVE_MAX_RELAXATIONS before proving its answer
+    ceiling: int = 0
+
+
+def _cost(score: float, soft: bool) -> int:
+    cost = max(0, round((_SCORE_CEILING - score) * 100))
+    return cost + SOFT_EXCLUDED_COST if soft else cost
+
+
+# ----------------------------
+# Min-cost flow (successive shortest paths, Dijkstra with potentials)
+# ----------------------------
+class _Flow:
+    def __init__(self) -> None:
+        self.adj: list[list[int]] = []
+        self.to: list[int] = []
+        self.cap: list[int] = []
+        self.cost: list[int] = []
+
+    def node(self) -> int:
+        self.adj.append([])
+        return len(self.adj) - 1
+
+    def edge(self, u: int, v: int, cap: int, cost: int) -> int:
+        e = len(self.to)
+        self.adj[u].append(e)
+        self.to += [v, u]
+        self.cap += [cap, 0]
+        self.cost += [cost, -cost]
+        self.adj[v].append(e + 1)
+        return e
+
+    def run(self, s: int, t: int) -> int:
+        """
+        Push as much flow as possible from s to t at minimum cost (all edge costs
+        start non-negative; every s-edge has capacity 1). Returns the total cost.
+
+        Each round: Dijkstra on reduced costs (stops once t is settled) to update
+        the potentials, then augment along every zero-reduced-cost path it can
+        find (all of them are shortest paths), so a round usually fills many
+        covers instead of one.
+        """
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        n = len(adj)
+        pot = [0] * n
+        total = 0
+
+        while True:
+            dist = [_INF] * n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if u == t:
+                    break
+                pu = pot[u]
+                for e in adj[u]:
+                    if cap[e] > 0:
+                        v = to[e]
+                        nd = d + cost[e] + pu - pot[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+            dt = dist[t]
+            if dt == _INF:
+                return total
+
+            # Reduced costs stay >= 0 with distances capped at dist[t]
+            for v in range(n):
+                pot[v] += dist[v] if dist[v] < dt else dt
+
+            total += self._augment_admissible(s, t, pot)
+
+    def _augment_admissible(self, s: int, t: int, pot: list[int]) -> int:
+        """
+        Unit augmenting paths over residual edges with zero reduced cost
+        (iterative DFS with current-arc pointers). Returns the cost added.
+        """
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        arc = [0] * len(adj)
+        dead = [False] * len(adj)
+        on_path = [False] * len(adj)
+        added = 0
+
+        while True:
+            path: list[int] = []
+            u = s
+            on_path[s] = True
+            while u != t:
+                edges = adj[u]
+                while arc[u] < len(edges):
+                    e = edges[arc[u]]
+                    v = to[e]
+                    if (
+                        cap[e] > 0
+                        and not dead[v]
+                        and not on_path[v]
+                        and cost[e] + pot[u] - pot[v] == 0
+                    ):
+                        break
+                    arc[u] += 1
+                else:
+                    # Dead end: retreat
+                    dead[u] = True
+                    on_path[u] = False
+                    if not path:
+                        return added
+                    e = path.pop()
+                    u = to[e ^ 1]
+                    arc[u] += 1
+                    continue
+                path.append(e)
+                u = to[e]
+                on_path[u] = True
+
+            for e in path:
+                cap[e] -= 1
+                cap[e ^ 1] += 1
+                added += cost[e]
+                on_path[to[e]] = False
+            on_path[s] = False
+
+
+# ----------------------------
+# Solver
+# ----------------------------
+def _clash_groups(
+    spans: list[tuple[str, ClassSession]],
+) -> dict[str, int]:
+    """
+    One teacher's candidate covers -> clash group. Covers on the same date whose
+    times overlap (transitively) share a group; a group takes at most one cover.
+    Chains (A-B and B-C overlap, A-C don't) are one group too; _branch_chains
+    lets such a group take A+C.
+    """
+    group_of: dict[str, int] = {}
+    gid = -1
+    group_end = None
+    for cover_id, c in sorted(spans, key=lambda x: x[1].start_at):
+        if group_end is None or c.start_at >= group_end:
+            gid += 1
+            group_end = c.end_at
+        else:
+            group_end = max(group_end, c.end_at)
+        group_of[cover_id] = gid
+    return group_of
+
+
+def _solve_week(
+    covers: list[tuple[CoverRequest, ClassSession]],
+    teachers_by_id: dict[str, Teacher],
+    busy_map: dict[str, list[ClassSession]],
+    loads: dict[str, int],
+    declined: set[tuple[str, str]],
+    proposal: Proposal,
+) -> None:
+    # Candidate edges (cover, teacher, cost, soft)
+    candidates: list[tuple[str, str, int, bool]] = []
+    spans_by_teacher: dict[str, list[tuple[str, ClassSession]]] = {}
+    for cover, c in covers:
+        for t in teachers_by_id.values():
+            tid = t.teacher_id
+            load = loads.get(tid, 0)
+            if (cover.cover_id, tid) in declined:
+                continue
+            if not is_eligible(t, c, busy_map, load):
+                continue
+            soft = travel_buffer_reason(tid, c, busy_map) is not None
+            score = teacher_score(t, c, busy_map, load)
+            candidates.append((cover.cover_id, tid, _cost(score, soft), soft))
+            spans_by_teacher.setdefault(tid, []).append((cover.cover_id, c))
+
+    groups = {tid: _clash_groups(spans) for tid, spans in spans_by_teacher.items()}
+    cost_of = {
+        (cover_id, tid): (cost, soft) for cover_id, tid, cost, soft in candidates
+    }
+
+    # Incumbent: one cover per clash group, then the greedy chain pass
+    taken, cost = _flow_assign(
+        covers, candidates, teachers_by_id, loads, groups, {}, frozenset()
+    )
+    added = _fill_chains(covers, candidates, teachers_by_id, loads, taken)
+    cost += sum(cost_of[pair][0] for pair in added.items())
+    taken.update(added)
+    ceiling = len(taken)
+
+    # Exact pass, only where a chain exists (a group holding 2+ disjoint covers)
+    caps: dict[tuple[str, int], int] = {}
+    for tid, spans in spans_by_teacher.items():
+        members: dict[int, list[ClassSession]] = {}
+        for cover_id, c in spans:
+            members.setdefault(groups[tid][cover_id], []).append(c)
+        for gid, sessions in members.items():
+            n = _max_disjoint(sessions)
+            if n > 1:
+                caps[(tid, gid)] = n
+    if caps:
+        taken, cost, ceiling = _branch_chains(
+            covers,
+            candidates,
+            teachers_by_id,
+            loads,
+            groups,
+            caps,
+            spans_by_teacher,
+            (taken, cost),
+        )
+
+    proposal.cost += cost
+    proposal.ceiling += ceiling
+    for cover_id, tid in taken.items():
+        proposal.assignments[cover_id] = tid
+        if cost_of[(cover_id, tid)][1]:
+            proposal.travel_flagged.append(cover_id)
+
+
+def _flow_assign(
+    covers: list[tuple[CoverRequest, ClassSession]],
+    candidates: list[tuple[str, str, int, bool]],
+    teachers_by_id: dict[str, Teacher],
+    loads: dict[str, int],
+    groups: dict[str, dict[str, int]],
+    caps: dict[tuple[str, int], int],
+    banned: frozenset[tuple[str, str]],
+) -> tuple[dict[str, str], int]:
+    """
+    One min-cost flow: src -> cover (1) -> teacher clash group (caps, default 1)
+    -> teacher week (max_covers_per_week - load) -> sink. banned (cover_id,
+    teacher_id) edges are left out. Returns cover_id -> teacher_id and the cost.
+    """
+    g = _Flow()
+    src, sink = g.node(), g.node()
+    cover_node = {cover.cover_id: g.node() for cover, _c in covers}
+    for n in cover_node.values():
+        g.edge(src, n, 1, 0)
+
+    group_node: dict[tuple[str, int], int] = {}
+    for tid, group_of in groups.items():
+        t = teachers_by_id[tid]
+        week = g.node()
+        g.edge(week, sink, t.max_covers_per_week - loads.get(tid, 0), 0)
+        for gid in set(group_of.values()):
+            n = g.node()
+            g.edge(n, week, caps.get((tid, gid), 1), 0)
+            group_node[(tid, gid)] = n
+
+    choice_edges: list[tuple[int, str, str]] = []
+    for cover_id, tid, cost, _soft in candidates:
+        if (cover_id, tid) in banned:
+            continue
+        gn = group_node[(tid, groups[tid][cover_id])]
+        e = g.edge(cover_node[cover_id], gn, 1, cost)
+        choice_edges.append((e, cover_id, tid))
+
+    total = g.run(src, sink)
+    taken = {cover_id: tid for e, cover_id, tid in choice_edges if g.cap[e] == 0}
+    return taken, total
+
+
+def _branch_chains(
+    covers: list[tuple[CoverRequest, ClassSession]],
+    candidates: list[tuple[str, str, int, bool]],
+    teachers_by_id: dict[str, Teacher],
+    loads: dict[str, int],
+    groups: dict[str, dict[str, int]],
+    caps: dict[tuple[str, int], int],
+    spans_by_teacher: dict[str, list[tuple[str, ClassSession]]],
+    incumbent: tuple[dict[str, str], int],
+) -> tuple[dict[str, str], int, int]:
+    """
+    Best-first branch and bound over chains. Relaxation: each clash group takes
+    up to its most disjoint covers, so every valid answer fits but overlaps can
+    sneak in. The best open branch whose relaxation has no overlap is optimal.
+    Otherwise, at the start of a teacher's overlap, branch on which one of the
+    covers running then that teacher may keep.
+    Stops after SOLVE_MAX_RELAXATIONS flows and keeps the best answer so far.
+    Returns (cover_id -> teacher_id, cost, most covers that could be filled):
+    the last equals the answer's size unless the search stopped early.
+    """
+    best, best_cost = incumbent
+    session = {cover.cover_id: c for cover, c in covers}
+    cost_of = {(cover_id, tid): cost for cover_id, tid, cost, _soft in candidates}
+    heap: list[tuple[int, int, int, frozenset[tuple[str, str]], dict[str, str]]] = []
+    seen: set[frozenset[tuple[str, str]]] = set()
+
+    def relax(banned: frozenset[tuple[str, str]]) -> None:
+        nonlocal best, best_cost
+        seen.add(banned)
+        got, cost = _flow_assign(
+            covers, candidates, teachers_by_id, loads, groups, caps, banned
+        )
+        if (-len(got), cost) >= (-len(best), best_cost):
+            return
+        # Repaired copy (overlaps dropped, then refilled) may beat the incumbent
+        fixed = _drop_overlaps(got, session)
+        fixed.update(_fill_chains(covers, candidates, teachers_by_id, loads, fixed))
+        fixed_cost = sum(cost_of[pair] for pair in fixed.items())
+        if (-len(fixed), fixed_cost) < (-len(best), best_cost):
+            best, best_cost = fixed, fixed_cost
+        if (-len(got), cost) < (-len(best), best_cost):
+            heapq.heappush(heap, (-len(got), cost, len(seen), banned, got))
+
+    relax(frozenset())
+    while heap:
+        neg_n, cost, _seq, banned, got = heapq.heappop(heap)
+        if (neg_n, cost) >= (-len(best), best_cost):
+            continue
+        clash = _first_overlap(got, session)
+        if clash is None:
+            return got, cost, len(got)
+        tid, at = clash
+        running = [
+            cover_id
+            for cover_id, c in spans_by_teacher[tid]
+            if c.start_at <= at < c.end_at and (cover_id, tid) not in banned
+        ]
+        for keep in running:
+            child = banned | {(cid, tid) for cid in running if cid != keep}
+            if child in seen:
+                continue
+            if len(seen) == SOLVE_MAX_RELAXATIONS:
+                return best, best_cost, max(-neg_n, len(best))
+            relax(child)
+    return best, best_cost, len(best)
+
+
+def _max_disjoint(sessions: list[ClassSession]) -> int:
+    """
+    Most pairwise non-overlapping sessions (earliest end first).
+    """
+    n = 0
+    end = None
+    for c in sorted(sessions, key=lambda x: x.end_at):
+        if end is None or c.start_at >= end:
+            n += 1
+            end = c.end_at
+    return n
+
+
+def _first_overlap(
+    taken: dict[str, str], session: dict[str, ClassSession]
+) -> tuple[str, datetime] | None:
+    """
+    A teacher given two overlapping covers, as (teacher_id, when both run).
+    """
+    held: dict[str, list[str]] = {}
+    for cover_id, tid in taken.items():
+        held.setdefault(tid, []).append(cover_id)
+    for tid, cover_ids in held.items():
+        cover_ids.sort(key=lambda cid: session[cid].start_at)
+        for a, b in zip(cover_ids, cover_ids[1:]):
+            if session[b].start_at < session[a].end_at:
+                return tid, session[b].start_at
+    return None
+
+
+def _drop_overlaps(
+    taken: dict[str, str], session: dict[str, ClassSession]
+) -> dict[str, str]:
+    """
+    taken without overlaps: per teacher, keep covers earliest end first.
+    """
+    kept: dict[str, str] = {}
+    last_end: dict[str, datetime] = {}
+    for cover_id in sorted(taken, key=lambda cid: session[cid].end_at):
+        tid = taken[cover_id]
+        c = session[cover_id]
+        if tid not in last_end or c.start_at >= last_end[tid]:
+            kept[cover_id] = tid
+            last_end[tid] = c.end_at
+    return kept
+
+
+def _fill_chains(
+    covers: list[tuple[CoverRequest, ClassSession]],
+    candidates: list[tuple[str, str, int, bool]],
+    teachers_by_id: dict[str, Teacher],
+    loads: dict[str, int],
+    taken: dict[str, str],
+) -> dict[str, str]:
+    """
+    Greedy pass over covers the flow left empty: give each its cheapest
+    candidate with weekly room and no overlap with what that teacher already
+    has (exact pairwise check). Only covers lost to a clash-group chain can
+    be filled here; the flow already maximised everything else.
+    Returns the added cover_id -> teacher_id.
+    """
+    session = {cover.cover_id: c for cover, c in covers}
+    options: dict[str, list[tuple[int, str]]] = {}
+    for cover_id, tid, cost, _soft in candidates:
+        if cover_id not in taken:
+            options.setdefault(cover_id, []).append((cost, tid))
+    added: dict[str, str] = {}
+    if not options:
+        return added
+
+    held: dict[str, list[ClassSession]] = {}
+    for cover_id, tid in taken.items():
+        held.setdefault(tid, []).append(session[cover_id])
+
+    for cover_id in sorted(options, key=lambda cid: session[cid].start_at):
+        c = session[cover_id]
+        for _cost, tid in sorted(options[cover_id]):
+            mine = held.get(tid, [])
+            room = teachers_by_id[tid].max_covers_per_week - loads.get(tid, 0)
+            if len(mine) >= room:
+                continue
+            if any(c.start_at < b.end_at and b.start_at < c.end_at for b in mine):
+                continue
+            added[cover_id] = tid
+            held.setdefault(tid, []).append(c)
+            break
+    return added
+
+
+def solve_assignment(
+    covers: list[CoverRequest],
+    teachers_by_id: dict[str, Teacher],
+    classes_by_id: dict[str, ClassSession],
+    busy_map: dict[str, list[ClassSession]],
+    weekly_loads: dict[str, dict[str, int]],
+    declined: set[tuple[str, str]] | None = None,
+) -> Proposal:
+    """
+    Minimum-cost, maximum-cardinality assignment of teachers to OPEN covers.
+
+    - hard: eligibility rules (incl. clashes with their timetable + filled covers)
+    - a teacher never gets two overlapping covers. Chains of overlapping covers
+      are solved exactly by branch and bound, up to SOLVE_MAX_RELAXATIONS flows
+      per week; past that, proposal.ceiling says how many more might fit
+    - at most max_covers_per_week - already filled, per ISO week
+    - cost: recommended teachers by ranking score; travel-buffer ones last
+    weekly_loads: week_start -> {teacher_id: covers already filled that week}.
+    declined: (cover_id, teacher_id) pairs to leave out.
+    Weeks share no constraints, so each week is its own (smaller) flow problem.
+    """
+    declined = declined or set()
+    proposal = Proposal()
+
+    by_week: dict[str, list[tuple[CoverRequest, ClassSession]]] = {}
+    for cover in covers:
+        template = classes_by_id.get(cover.class_id)
+        if cover.status != "OPEN" or template is None:
+            proposal.unassigned.append(cover.cover_id)
+            continue
+        try:
+            c = materialize_for_cover_date(template, cover.cover_date)
+        except ValueError:
+            proposal.unassigned.append(cover.cover_id)
+            continue
+        by_week.setdefault(week_start(cover.cover_date), []).append((cover, c))
+
+    for wk, week_covers in sorted(by_week.items()):
+        _solve_week(
+            week_covers,
+            teachers_by_id,
+            busy_map,
+            weekly_loads.get(wk, {}),
+            declined,
+            proposal,
+        )
+
+    for week_covers in by_week.values():
+        for cover, _c in week_covers:
+            if cover.cover_id not in proposal.assignments:
+                proposal.unassigned.append(cover.cover_id)
+    return proposal
@@ -0,0 +1,138 @@
+# src/async_runtime.py
+from __future__ import annotations
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from slack_bolt.async_app import AsyncApp
+
+DB_EXECUTOR_WORKERS = 16
+
+
+class DbExecutor:
+    """
+    Bounded pool for blocking work awaited from the event loop: call(fn, ...)
+    runs a sync listener body (which opens its own connections) off the loop.
+    """
+
+    def __init__(self, workers: int = DB_EXECUTOR_WORKERS) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+
+    async def call(self, fn: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, partial(fn, *args, **kwargs))
+
+
+def _sync_bridge(loop: asyncio.AbstractEventLoop, coro_fn: Callable | None):
+    """
+    Blocking wrapper so a sync listener body can call an async respond().
+    """
+    if coro_fn is None:
+        return None
+
+    def call(*args, **kwargs):
+        fut = asyncio.run_coroutine_threadsafe(coro_fn(*args, **kwargs), loop)
+        return fut.result()
+
+    return call
+
+
+def _noop(*_args, **_kwargs) -> None:
+    return None
+
+
+def adapt(kind: str, fn: Callable, sync_client, executor: DbExecutor) -> Callable:
+    """
+    Wrap a sync listener (ack, body, client, respond, view, command — any subset)
+    as an async Bolt listener.
+
+    - options: the body's ack(options=...) IS the response, so it is captured on
+      the executor and sent from the loop afterwards
+    - views: the body acks itself (it may answer with response_action=errors),
+      bridged back to the loop
+    - everything else: ack() right away on the loop, then run the body
+    """
+    wanted = list(inspect.signature(fn).parameters)
+
+    def kwargs_for(body, ack, respond) -> dict[str, Any]:
+        available = {
+            "ack": ack,
+            "body": body,
+            "client": sync_client,  # lanes/SlackIO stay on the sync WebClient
+            "respond": respond,
+            "view": body.get("view"),
+            "command": body,
+        }
+        return {name: available[name] for name in wanted}
+
+    if kind == "options":
+
+        async def options_listener(ack, body):
+            captured: dict[str, Any] = {}
+            await executor.call(fn, **kwargs_for(body, captured.update, None))
+            await ack(**captured)
+
+        return options_listener
+
+    if kind == "view":
+
+        async def view_listener(ack, body, respond):
+            loop = asyncio.get_running_loop()
+            try:
+                await executor.call(
+                    fn,
+                    **kwargs_for(
+                        body, _sync_bridge(loop, ack), _sync_bridge(loop, respond)
+                    ),
+                )
+            except Exception as e:
+                print(f"view listener {fn.__name__} failed:", e)
+
+        return view_listener
+
+    async def listener(ack, body, respond):
+        await ack()
+        sync_respond = _sync_bridge(asyncio.get_running_loop(), respond)
+        try:
+            await executor.call(fn, **kwargs_for(body, _noop, sync_respond))
+        except Exception as e:
+            print(f"{kind} listener {fn.__name__} failed:", e)
+
+    return listener
+
+
+def build_async_app(
+    routes: list[tuple[str, str, Callable]], sync_client, executor: DbExecutor
+) -> AsyncApp:
+    app = AsyncApp(token=sync_client.token)
+    for kind, constraint, fn in routes:
+        getattr(app, kind)(constraint)(adapt(kind, fn, sync_client, executor))
+    return app
+
+
+def run_async(
+    routes: list[tuple[str, str, Callable]],
+    sync_client,
+    app_token: str,
+    workers: int = DB_EXECUTOR_WORKERS,
+) -> None:
+    """
+    Optional asyncio runtime (BOT_RUNTIME=async).
+
+    AsyncApp + AsyncSocketModeHandler own the socket and every ack()/respond()
+    on one event loop, so interactions are acknowledged immediately however busy
+    the process is. Listener bodies are the SAME functions the sync App runs
+    (slack_bot.ROUTES); their SQLite/algorithm work is blocking, so it is awaited
+    on a bounded DbExecutor instead of holding a Bolt worker per request.
+    Needs aiohttp (slack_bolt's async extras).
+    """
+
+    async def main() -> None:
+        app = build_async_app(routes, sync_client, DbExecutor(workers))
+        await AsyncSocketModeHandler(app, app_token).start_async()
+
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+# src/board_repo.py
+from __future__ import annotations
+
+import sqlite3
+
+
+def upsert_board_page(
+    con: sqlite3.Connection,
+    week_start: str,
+    campus: str,
+    page: int,
+    channel_id: str,
+    message_ts: str,
+) -> None:
+    """
+    IMPORTANT: does NOT commit. Caller decides.
+    """
+    con.execute(
+        """
+        INSERT INTO cover_boards (week_start, campus, page, channel_id, message_ts)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(week_start, campus, page) DO UPDATE SET
+          channel_id=excluded.channel_id,
+          message_ts=excluded.message_ts
+        """,
+        (week_start, campus, page, channel_id, message_ts),
+    )
+
+
+def delete_board_pages_from(
+    con: sqlite3.Connection, week_start: str, campus: str, first_page: int
+) -> None:
+    """
+    Drop pages >= first_page (the board shrank). Does NOT commit.
+    """
+    con.execute(
+        "DELETE FROM cover_boards WHERE week_start=? AND campus=? AND page>=?",
+        (week_start, campus, first_page),
+    )
+
+
+def list_board_pages(
+    con: sqlite3.Connection,
+) -> dict[tuple[str, str], list[tuple[str, str]]]:
+    """
+    (week_start, campus) -> [(channel_id, message_ts), ...] in page order.
+    """
+    cur = con.execute(
+        """
+        SELECT week_start, campus, channel_id, message_ts
+        FROM cover_boards
+        ORDER BY week_start, campus, page
+        """
+    )
+    out: dict[tuple[str, str], list[tuple[str, str]]] = {}
+    for r in cur.fetchall():
+        out.setdefault((r[0], r[1]), []).append((r[2], r[3]))
+    return out
@@ -0,0 +1,97 @@
+# src/card_updater.py
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+CARD_FLUSH_WINDOW_S = 0.75
+CARD_FLUSH_WORKERS = 4
+
+PUBLIC = "public"
+ADMIN = "admin"
+
+
+class CardUpdater:
+    """
+    Coalesces cover card refreshes.
+
+    mark_dirty() records which cards (public/admin) of a cover need redrawing and
+    schedules ONE flush for that cover CARD_FLUSH_WINDOW_S after the first mark.
+    Marks landing before the flush merge into it, so a burst of declines becomes
+    a single public + admin update. render(cover_id, kinds) runs at flush time and
+    must read the latest state itself.
+
+    At most one render per cover runs at a time: marks landing during a render
+    wait for it to finish, so an older render can't overwrite a newer one.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[str, set[str]], None],
+        window_s: float = CARD_FLUSH_WINDOW_S,
+        workers: int = CARD_FLUSH_WORKERS,
+    ) -> None:
+        self._render = render
+        self._window_s = window_s
+        self._dirty: dict[str, set[str]] = {}
+        self._due: dict[str, float] = {}
+        self._inflight: set[str] = set()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="card-flush"
+        )
+        threading.Thread(target=self._loop, name="card-updater", daemon=True).start()
+
+    def mark_dirty(
+        self, cover_id: str, public: bool = True, admin: bool = True
+    ) -> None:
+        kinds = ({PUBLIC} if public else set()) | ({ADMIN} if admin else set())
+        if not kinds:
+            return
+        with self._cond:
+            self._dirty.setdefault(cover_id, set()).update(kinds)
+            if cover_id not in self._due:
+                # Deadline is fixed by the FIRST mark: bounded staleness under bursts
+                self._due[cover_id] = time.monotonic() + self._window_s
+                self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._dirty)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due:
+                    self._cond.wait()
+
+                now = time.monotonic()
+                waiting = {
+                    cid: t for cid, t in self._due.items() if cid not in self._inflight
+                }
+                ready = [cid for cid, t in waiting.items() if t <= now]
+                if not ready:
+                    # Nothing due, or only covers whose render is still running
+                    self._cond.wait(min(waiting.values()) - now if waiting else None)
+                    continue
+
+                batch = []
+                for cid in ready:
+                    del self._due[cid]
+                    self._inflight.add(cid)
+                    batch.append((cid, self._dirty.pop(cid)))
+
+            for cid, kinds in batch:
+                self._pool.submit(self._safe_render, cid, kinds)
+
+    def _safe_render(self, cover_id: str, kinds: set[str]) -> None:
+        try:
+            self._render(cover_id, kinds)
+        except Exception as e:
+            print(f"card flush for {cover_id} failed:", e)
+        finally:
+            with self._cond:
+                self._inflight.discard(cover_id)
+                self._cond.notify()
@@ -0,0 +1,89 @@
+# src/cover_board.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from cover_store import CoverStore
+from cover_time import materialize_for_cover_date, week_start
+from models import ClassSession
+
+# (week_start, campus)
+BoardKey = tuple[str, str]
+
+
+class CoverBoardIndex:
+    """
+    OPEN covers grouped per board: (week_start, campus) -> {cover_id: session}.
+
+    Follows CoverStore.generation. A cover's class/date never change, so a
+    sync is a set difference on cover_ids: only boards that gained or lost a
+    cover are marked, and collected until take_changed().
+    """
+
+    def __init__(
+        self, store: CoverStore, classes_by_id: dict[str, ClassSession]
+    ) -> None:
+        self.store = store
+        self.classes_by_id = classes_by_id
+        self._generation: int | None = None
+        self._key_of: dict[str, BoardKey] = {}
+        self._boards: dict[BoardKey, dict[str, ClassSession]] = {}
+        self._changed: set[BoardKey] = set()
+        self._lock = threading.Lock()
+
+    def sync(self, con: sqlite3.Connection) -> None:
+        self.store.sync(con)
+        gen = self.store.generation
+        with self._lock:
+            if gen == self._generation:
+                return
+        open_covers = {c.cover_id: c for c in self.store.list_open(con)}
+
+        with self._lock:
+            for cover_id in [cid for cid in self._key_of if cid not in open_covers]:
+                key = self._key_of.pop(cover_id)
+                board = self._boards[key]
+                del board[cover_id]
+                if not board:
+                    del self._boards[key]
+                self._changed.add(key)
+
+            for cover_id, cover in open_covers.items():
+                if cover_id in self._key_of:
+                    continue
+                template = self.classes_by_id.get(cover.class_id)
+                if template is None:
+                    continue
+                try:
+                    c = materialize_for_cover_date(template, cover.cover_date)
+                except ValueError:
+                    continue
+                key = (week_start(cover.cover_date), c.campus)
+                self._key_of[cover_id] = key
+                self._boards.setdefault(key, {})[cover_id] = c
+                self._changed.add(key)
+            self._generation = gen
+
+    def rows(self, key: BoardKey) -> list[tuple[str, ClassSession]]:
+        """
+        The board's open covers, soonest first.
+        """
+        with self._lock:
+            board = dict(self._boards.get(key, {}))
+        return sorted(board.items(), key=lambda row: (row[1].start_at, row[0]))
+
+    def mark(self, key: BoardKey) -> None:
+        """
+        Re-queue a board (e.g. its update failed).
+        """
+        with self._lock:
+            self._changed.add(key)
+
+    def take_changed(self) -> set[BoardKey]:
+        """
+        Boards that gained or lost a cover since the last call.
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed
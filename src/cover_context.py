@@ -0,0 +1,114 @@
+# src/cover_context.py
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+from cover_dm_repo import list_dms_for_cover
+from cover_models import CoverRequest
+from cover_store import CoverStore
+from cover_time import materialize_for_cover_date
+from indexes import (
+    index_regular_classes_by_teacher,
+    index_filled_cover_classes_by_teacher,
+    merge_busy_maps,
+)
+from models import Teacher, ClassSession
+from recommendation_cache import RecommendationCache
+from recommendations_engine import RecommendationResult, get_recommendations_for_cover
+
+# Derived values that depend on covers.status / filled covers
+_COVER_DERIVED = ("cover", "session", "busy_map", "recommendations")
+# Derived values that depend on cover_dms
+_DM_DERIVED = ("dm_rows", "dm_status_by_teacher", "declined")
+
+
+@dataclass
+class CoverContext:
+    """
+    Request-scoped unit of work for one cover.
+
+    Every value is loaded lazily, at most once per request. After a write the
+    handler calls invalidate_cover()/invalidate_dms() so the next read reloads.
+    """
+
+    con: sqlite3.Connection
+    cover_id: str
+    store: CoverStore
+    teachers_by_id: dict[str, Teacher]
+    classes_by_id: dict[str, ClassSession]
+    # Shared busy map / recommendations (optional: without it they're computed here)
+    recs: RecommendationCache | None = None
+
+    @cached_property
+    def cover(self) -> CoverRequest | None:
+        return self.store.get(self.con, self.cover_id)
+
+    @cached_property
+    def session(self) -> ClassSession:
+        """
+        The class template materialized onto the cover's date (always render with this).
+        """
+        cover = self.cover
+        template = self.classes_by_id[cover.class_id]
+        return materialize_for_cover_date(template, cover.cover_date)
+
+    @cached_property
+    def busy_map(self) -> dict[str, list[ClassSession]]:
+        if self.recs is not None:
+            return self.recs.busy_map(self.con)
+        regular_map = index_regular_classes_by_teacher(self.classes_by_id)
+        filled_map = index_filled_cover_classes_by_teacher(self.con, self.classes_by_id)
+        return merge_busy_maps(regular_map, filled_map)
+
+    @cached_property
+    def recommendations(self) -> RecommendationResult:
+        if self.recs is not None:
+            return self.recs.get(self.con, self.cover_id, cover=self.cover)
+        return get_recommendations_for_cover(
+            self.con,
+            self.cover_id,
+            self.teachers_by_id,
+            self.classes_by_id,
+            cover=self.cover,
+            busy_map=self.busy_map,
+        )
+
+    @cached_property
+    def dm_rows(self) -> list[Any]:
+        return list_dms_for_cover(self.con, self.cover_id)
+
+    @cached_property
+    def dm_status_by_teacher(self) -> dict[str, str]:
+        return {r["teacher_id"]: r["status"] for r in self.dm_rows}
+
+    @cached_property
+    def declined(self) -> set[str]:
+        # Derived from dm_rows so it doesn't cost another query
+        return {r["teacher_id"] for r in self.dm_rows if r["status"] == "DECLINED"}
+
+    def seed(self, **values: Any) -> None:
+        """
+        Pre-fill values the handler already holds (e.g. a cover it just inserted,
+        or dm_rows=[] for a brand-new cover) so they are never queried.
+        """
+        self.__dict__.update(values)
+
+    # ----------------------------
+    # Invalidation (call after writes)
+    # ----------------------------
+    def _drop(self, names: tuple[str, ...]) -> None:
+        for name in names:
+            self.__dict__.pop(name, None)
+
+    def invalidate_cover(self) -> None:
+        """
+        After a fill/assign: re-read the cover through the store and drop anything derived.
+        """
+        self._drop(_COVER_DERIVED)
+        self.__dict__["cover"] = self.store.refresh(self.con, self.cover_id)
+
+    def invalidate_dms(self) -> None:
+        self._drop(_DM_DERIVED)
@@ -24,6 +24,27 @@ def upsert_dm(
     )
 
 
+def upsert_dms(
+    con: sqlite3.Connection,
+    rows: list[tuple[str, str, str, str, str, str]],
+) -> None:
+    """
+    Batched upsert_dm: rows are (cover_id, teacher_id, dm_channel_id, dm_ts, status, updated_at).
+    """
+    con.executemany(
+        """
+      INSERT INTO cover_dms (cover_id, teacher_id, dm_channel_id, dm_ts, status, updated_at)
+      VALUES (?, ?, ?, ?, ?, ?)
+      ON CONFLICT(cover_id, teacher_id) DO UPDATE SET
+        dm_channel_id=excluded.dm_channel_id,
+        dm_ts=excluded.dm_ts,
+        status=excluded.status,
+        updated_at=excluded.updated_at
+    """,
+        rows,
+    )
+
+
 def set_status(
     con: sqlite3.Connection,
     cover_id: str,
@@ -40,6 +61,22 @@ def set_status(
     )
 
 
+def set_statuses(
+    con: sqlite3.Connection,
+    rows: list[tuple[str, str, str, str]],
+) -> None:
+    """
+    Batched set_status: rows are (status, updated_at, cover_id, teacher_id).
+    """
+    con.executemany(
+        """
+      UPDATE cover_dms SET status=?, updated_at=?
+      WHERE cover_id=? AND teacher_id=?
+    """,
+        rows,
+    )
+
+
 def list_dms_for_cover(con: sqlite3.Connection, cover_id: str):
     cur = con.execute(
         """
@@ -59,3 +96,55 @@ def list_declined_teacher_ids(con: sqlite3.Connection, cover_id: str) -> set[str
         (cover_id,),
     )
     return {r[0] for r in cur.fetchall()}
+
+
+def list_dms_for_covers(con: sqlite3.Connection, cover_ids: list[str]):
+    """
+    Batched list_dms_for_cover: one query for many covers (rows include cover_id).
+    """
+    if not cover_ids:
+        return []
+    marks = ",".join("?" * len(cover_ids))
+    cur = con.execute(
+        f"""
+      SELECT cover_id, teacher_id, dm_channel_id, dm_ts, status
+      FROM cover_dms WHERE cover_id IN ({marks})
+    """,
+        cover_ids,
+    )
+    return cur.fetchall()
+
+
+def expire_notified_dms(
+    con: sqlite3.Connection, cover_ids: list[str], updated_at: str
+) -> None:
+    """
+    NOTIFIED -> EXPIRED for the given covers, in one UPDATE.
+    """
+    if not cover_ids:
+        return
+    marks = ",".join("?" * len(cover_ids))
+    con.execute(
+        f"""
+      UPDATE cover_dms SET status='EXPIRED', updated_at=?
+      WHERE status='NOTIFIED' AND cover_id IN ({marks})
+    """,
+        (updated_at, *cover_ids),
+    )
+
+
+def repoint_dms(
+    con: sqlite3.Connection,
+    rows: list[tuple[str, str, str, str, str]],
+) -> None:
+    """
+    Move DM rows onto a reposted message: rows are
+    (new_channel_id, new_ts, updated_at, old_channel_id, old_ts).
+    """
+    con.executemany(
+        """
+      UPDATE cover_dms SET dm_channel_id=?, dm_ts=?, updated_at=?
+      WHERE dm_channel_id=? AND dm_ts=?
+    """,
+        rows,
+    )
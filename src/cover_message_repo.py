@@ -23,3 +23,16 @@ def get_cover_message(con: sqlite3.Connection, cover_id: str) -> tuple[str, str]
     )
     row = cur.fetchone()
     return (row[0], row[1]) if row else None
+
+
+def get_cover_messages(
+    con: sqlite3.Connection, cover_ids: list[str]
+) -> dict[str, tuple[str, str]]:
+    if not cover_ids:
+        return {}
+    marks = ",".join("?" * len(cover_ids))
+    cur = con.execute(
+        f"SELECT cover_id, channel_id, message_ts FROM cover_messages WHERE cover_id IN ({marks})",
+        cover_ids,
+    )
+    return {r[0]: (r[1], r[2]) for r in cur.fetchall()}
@@ -4,6 +4,8 @@ from __future__ import annotations
 import sqlite3
 from datetime import datetime, timezone
 from cover_models import CoverRequest
+from cover_time import week_start
+from week_load_repo import add_week_load
 
 
 def insert_cover(con: sqlite3.Connection, cover: CoverRequest) -> str:
@@ -33,11 +35,7 @@ def insert_cover(con: sqlite3.Connection, cover: CoverRequest) -> str:
     return cover_id
 
 
-def get_cover(con: sqlite3.Connection, cover_id: str) -> CoverRequest | None:
-    row = con.execute("SELECT * FROM covers WHERE cover_id = ?", (cover_id,)).fetchone()
-    if row is None:
-        return None
-
+def row_to_cover(row: sqlite3.Row) -> CoverRequest:
     return CoverRequest(
         cover_id=row["cover_id"],
         class_id=row["class_id"],
@@ -51,13 +49,22 @@ def get_cover(con: sqlite3.Connection, cover_id: str) -> CoverRequest | None:
     )
 
 
+def get_cover(con: sqlite3.Connection, cover_id: str) -> CoverRequest | None:
+    row = con.execute("SELECT * FROM covers WHERE cover_id = ?", (cover_id,)).fetchone()
+    if row is None:
+        return None
+
+    return row_to_cover(row)
+
+
 def fill_cover(con: sqlite3.Connection, cover_id: str, teacher_id: str) -> bool:
     """
-    Atomic fill. IMPORTANT: does NOT commit. Caller decides.
+    Atomic fill; also counts the cover towards the teacher's weekly load.
+    IMPORTANT: does NOT commit. Caller decides.
     """
     now = datetime.now(timezone.utc).isoformat()
 
-    cur = con.execute(
+    row = con.execute(
         """
         UPDATE covers
         SET status = 'FILLED',
@@ -65,11 +72,15 @@ def fill_cover(con: sqlite3.Connection, cover_id: str, teacher_id: str) -> bool:
             filled_at = ?
         WHERE cover_id = ?
           AND status = 'OPEN'
+        RETURNING cover_date
         """,
         (teacher_id, now, cover_id),
-    )
+    ).fetchone()
+    if row is None:
+        return False
 
-    return cur.rowcount == 1
+    add_week_load(con, teacher_id, week_start(row[0]))
+    return True
 
 
 def list_open_covers(con: sqlite3.Connection) -> list[CoverRequest]:
@@ -77,22 +88,26 @@ def list_open_covers(con: sqlite3.Connection) -> list[CoverRequest]:
         "SELECT * FROM covers WHERE status = 'OPEN' ORDER BY created_at ASC"
     ).fetchall()
 
-    out: list[CoverRequest] = []
-    for r in rows:
-        out.append(
-            CoverRequest(
-                cover_id=r["cover_id"],
-                class_id=r["class_id"],
-                cover_date=r["cover_date"],  # NEW
-                status=r["status"],
-                created_at=datetime.fromisoformat(r["created_at"]),
-                filled_at=(
-                    datetime.fromisoformat(r["filled_at"]) if r["filled_at"] else None
-                ),
-                assigned_teacher_id=r["assigned_teacher_id"],
-            )
-        )
-    return out
+    return [row_to_cover(r) for r in rows]
+
+
+def list_cached_covers(
+    con: sqlite3.Connection, filled_since: str
+) -> list[CoverRequest]:
+    """
+    Working set for CoverStore: OPEN covers + covers filled at/after filled_since (ISO UTC).
+    """
+    rows = con.execute(
+        """
+        SELECT * FROM covers
+        WHERE status = 'OPEN'
+           OR (status = 'FILLED' AND filled_at >= ?)
+        ORDER BY created_at ASC
+        """,
+        (filled_since,),
+    ).fetchall()
+
+    return [row_to_cover(r) for r in rows]
 
 
 def list_filled_covers(con: sqlite3.Connection) -> list[tuple[str, str, str, str]]:
@@ -112,3 +127,39 @@ def list_filled_covers(con: sqlite3.Connection) -> list[tuple[str, str, str, str
         (r["cover_id"], r["class_id"], r["cover_date"], r["assigned_teacher_id"])
         for r in rows
     ]
+
+
+def list_cover_keys_between(
+    con: sqlite3.Connection, start_date: str, end_date: str
+) -> set[tuple[str, str]]:
+    """
+    {(class_id, cover_date), ...} already OPEN or FILLED in [start_date, end_date].
+    """
+    rows = con.execute(
+        """
+        SELECT class_id, cover_date
+        FROM covers
+        WHERE cover_date BETWEEN ? AND ?
+          AND status IN ('OPEN', 'FILLED')
+        """,
+        (start_date, end_date),
+    ).fetchall()
+    return {(r["class_id"], r["cover_date"]) for r in rows}
+
+
+def expire_past_open_covers(con: sqlite3.Connection, before_date: str) -> list[str]:
+    """
+    Set-based expiry: OPEN covers dated before before_date ("YYYY-MM-DD") -> CANCELLED.
+    Returns the cover_ids that were expired. IMPORTANT: does NOT commit. Caller decides.
+    """
+    rows = con.execute(
+        """
+        UPDATE covers
+        SET status = 'CANCELLED'
+        WHERE status = 'OPEN'
+          AND cover_date < ?
+        RETURNING cover_id
+        """,
+        (before_date,),
+    ).fetchall()
+    return [r[0] for r in rows]
@@ -1,16 +1,40 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 
 from cover_models import CoverRequest
+from cover_repo import get_cover, list_cached_covers
+
+# Filled covers stay hot for this long after filling (cards/DM updates still touch them).
+RECENT_FILLED_DAYS = 14
 
 
 @dataclass
 class CoverStore:
+    """
+    Process-wide write-through cache of OPEN + recently FILLED covers.
+
+    - load() once at startup
+    - put()/refresh() after our own commits (insert / fill)
+    - get() reads covers_version (bumped by triggers on covers only) on a
+      dedicated watcher connection; if it moved since we last loaded, the cache
+      is reloaded. Writes to other tables (claims, jobs, DMs) never reload.
+    - generation bumps only when the cached covers actually change, so derived
+      caches (recommendations, busy map) can tell when they are stale.
+    """
+
     open_covers: dict[str, CoverRequest]
     all_covers: dict[str, CoverRequest]
 
+    generation: int = 0
+
+    _watch_con: sqlite3.Connection | None = None
+    _covers_version: int | None = None
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
     @staticmethod
     def new() -> "CoverStore":
         return CoverStore(open_covers={}, all_covers={})
@@ -32,6 +56,109 @@ class CoverStore:
             assigned_teacher_id=None,
         )
 
-        # Keep in-memory maps optional for debugging; you can also remove these later.
-        # We only store it once it has a real cover_id (after insert_cover).
+        # Not cached yet: we only store it once it has a real cover_id (put() after commit).
+        return cover
+
+    # ----------------------------
+    # Loading / coherence
+    # ----------------------------
+    def attach(self, db_path) -> None:
+        """
+        Open the watcher connection used only to read covers_version.
+        """
+        with self._lock:
+            if self._watch_con is None:
+                self._watch_con = sqlite3.connect(db_path, check_same_thread=False)
+
+    def load(self, con: sqlite3.Connection) -> None:
+        """
+        (Re)load OPEN covers + covers filled within RECENT_FILLED_DAYS.
+        """
+        since = (
+            datetime.now(timezone.utc) - timedelta(days=RECENT_FILLED_DAYS)
+        ).isoformat()
+
+        with self._lock:
+            # Version first: anything committed after it is re-read next sync
+            version = self._read_covers_version()
+            covers = list_cached_covers(con, filled_since=since)
+            all_covers = {c.cover_id: c for c in covers}
+            self._covers_version = version
+            if all_covers == self.all_covers:
+                return  # e.g. our own write, already applied by put()
+            self.all_covers = all_covers
+            self.open_covers = {c.cover_id: c for c in covers if c.status == "OPEN"}
+            self.generation += 1
+
+    def _read_covers_version(self) -> int | None:
+        if self._watch_con is None:
+            return None
+        row = self._watch_con.execute(
+            "SELECT version FROM covers_version WHERE id = 1"
+        ).fetchone()
+        # No row until the first covers write
+        return row[0] if row else 0
+
+    def sync(self, con: sqlite3.Connection) -> None:
+        """
+        Reload if covers changed (any connection) since we last loaded.
+        Our own writes reload too, but put() already applied them, so the
+        reload finds nothing new and generation doesn't move again.
+        """
+        with self._lock:
+            if self._watch_con is None:
+                return
+            if self._read_covers_version() != self._covers_version:
+                self.load(con)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def get(self, con: sqlite3.Connection, cover_id: str) -> CoverRequest | None:
+        self.sync(con)
+        with self._lock:
+            cover = self.all_covers.get(cover_id)
+        if cover is not None:
+            return cover
+
+        # Miss (old/archived cover): read through, don't cache cold covers
+        return get_cover(con, cover_id)
+
+    def list_open(self, con: sqlite3.Connection) -> list[CoverRequest]:
+        self.sync(con)
+        with self._lock:
+            return sorted(self.open_covers.values(), key=lambda c: c.created_at)
+
+    def list_cached(self, con: sqlite3.Connection) -> list[CoverRequest]:
+        """
+        Every cached cover: OPEN + recently FILLED.
+        """
+        self.sync(con)
+        with self._lock:
+            return list(self.all_covers.values())
+
+    # ----------------------------
+    # Write-through (call AFTER the caller's commit)
+    # ----------------------------
+    def put(self, cover: CoverRequest) -> None:
+        with self._lock:
+            self.all_covers[cover.cover_id] = cover
+            if cover.status == "OPEN":
+                self.open_covers[cover.cover_id] = cover
+            else:
+                self.open_covers.pop(cover.cover_id, None)
+            self.generation += 1
+
+    def refresh(self, con: sqlite3.Connection, cover_id: str) -> CoverRequest | None:
+        """
+        Re-read one cover after a committed change (fill / assign) and cache it.
+        """
+        cover = get_cover(con, cover_id)
+        with self._lock:
+            if cover is None:
+                self.all_covers.pop(cover_id, None)
+                self.open_covers.pop(cover_id, None)
+                self.generation += 1
+                return None
+        self.put(cover)
         return cover
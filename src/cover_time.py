@@ -33,3 +33,11 @@ def materialize_for_cover_date(template: ClassSession, cover_date: str) -> Class
     end_utc = end_local.astimezone(timezone.utc)
 
     return replace(template, start_at=start_utc, end_at=end_utc)
+
+
+def week_start(cover_date: str) -> str:
+    """
+    Monday ("YYYY-MM-DD") of the ISO week containing cover_date. Key for weekly cover loads.
+    """
+    d = date.fromisoformat(cover_date)
+    return (d - timedelta(days=d.weekday())).isoformat()
@@ -1,14 +1,199 @@
 # src/db.py
 from __future__ import annotations
 
+import logging
+import os
+import re
 import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
 DB_PATH = Path("state.db")
 
+log = logging.getLogger("sql")
+
+
+# ----------------------------
+# Opt-in SQL instrumentation
+#   SQL_STATS=1        -> per-statement counts / timings / rows
+#   SQL_SLOW_MS=50     -> log statements slower than this
+# ----------------------------
+@dataclass
+class StatementStats:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    rows: int = 0
+
+
+class SqlStats:
+    """
+    Aggregates per (calling module, normalized SQL). Shared by every connection.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = os.environ.get("SQL_STATS", "") == "1"
+        self.slow_ms = float(os.environ.get("SQL_SLOW_MS", "50"))
+        self.by_statement: dict[tuple[str, str], StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: tuple[str, str], elapsed_s: float) -> None:
+        with self._lock:
+            st = self.by_statement.setdefault(key, StatementStats())
+            st.count += 1
+            st.total_s += elapsed_s
+            st.max_s = max(st.max_s, elapsed_s)
+
+        if elapsed_s * 1000 >= self.slow_ms:
+            log.warning(
+                "slow query %.1fms [%s] %s", elapsed_s * 1000, key[0], key[1][:300]
+            )
+
+    def count_only(self, key: tuple[str, str]) -> None:
+        with self._lock:
+            self.by_statement.setdefault(key, StatementStats()).count += 1
+
+    def add_rows(self, key: tuple[str, str], n: int) -> None:
+        with self._lock:
+            st = self.by_statement.setdefault(key, StatementStats())
+            st.rows += n
+
+    def reset(self) -> None:
+        with self._lock:
+            self.by_statement.clear()
+
+    def summary(self, top: int = 20) -> str:
+        """
+        Text table, heaviest total time first.
+        """
+        with self._lock:
+            items = sorted(
+                self.by_statement.items(), key=lambda kv: kv[1].total_s, reverse=True
+            )[:top]
+
+        lines = [f"{'calls':>6} {'total_ms':>9} {'max_ms':>8} {'rows':>7}  module  sql"]
+        for (module, sql), st in items:
+            lines.append(
+                f"{st.count:>6} {st.total_s * 1000:>9.1f} {st.max_s * 1000:>8.1f} "
+                f"{st.rows:>7}  {module}  {sql[:120]}"
+            )
+        return "\n".join(lines)
+
+
+SQL_STATS = SqlStats()
+
+_WS = re.compile(r"\s+")
+_in_timed = threading.local()
+
+
+def _statement_key(sql: str, depth: int) -> tuple[str, str]:
+    # depth counts frames up from here: 1 = _timed, 2 = the execute/executemany
+    # override, 3 = its caller, i.e. the repo/service function. commit() calls
+    # this directly, so it passes 2.
+    module = sys._getframe(depth).f_globals.get("__name__", "?")
+    return module, _WS.sub(" ", sql).strip()
+
+
+class _TimedCursor(sqlite3.Cursor):
+    _stat_key: tuple[str, str] | None = None
+
+    def _timed(self, fn, sql, args, depth: int):
+        self._stat_key = _statement_key(sql, depth)
+        # The sqlite3 module's implicit BEGIN runs inside fn(): _trace skips it
+        # and its time counts towards this statement
+        _in_timed.active = True
+        t0 = time.perf_counter()
+        try:
+            fn(sql, args)
+            return self
+        finally:
+            _in_timed.active = False
+            SQL_STATS.record(self._stat_key, time.perf_counter() - t0)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters, 3)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters, 3)
+
+    def _count(self, rows):
+        if self._stat_key is not None:
+            SQL_STATS.add_rows(self._stat_key, len(rows))
+        return rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count([row])
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size if size is not None else self.arraysize)
+        return self._count(rows)
+
+    def fetchall(self):
+        return self._count(super().fetchall())
+
+    def __next__(self):
+        row = super().__next__()
+        self._count([row])
+        return row
+
+
+class _TimedConnection(sqlite3.Connection):
+    # sqlite3.Connection.execute() doesn't go through an overridden
+    # Cursor.execute, so route the shortcuts explicitly.
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        cur = self.cursor()
+        return cur._timed(super(_TimedCursor, cur).execute, sql, parameters, 3)
+
+    def executemany(self, sql, seq_of_parameters):
+        cur = self.cursor()
+        return cur._timed(
+            super(_TimedCursor, cur).executemany, sql, seq_of_parameters, 3
+        )
+
+    def commit(self):
+        key = _statement_key("COMMIT", 2)
+        _in_timed.active = True
+        t0 = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            _in_timed.active = False
+            SQL_STATS.record(key, time.perf_counter() - t0)
+
+
+def _trace(sql: str) -> None:
+    # Only statements that did NOT go through _TimedCursor/commit() (e.g.
+    # executescript DDL) — count them, no timing. Implicit BEGINs and COMMITs
+    # run while a timed call is active and are skipped here.
+    if getattr(_in_timed, "active", False):
+        return
+    SQL_STATS.count_only(("<trace>", _WS.sub(" ", sql).strip()))
+
+
+def enable_sql_stats(slow_ms: float | None = None) -> None:
+    """
+    Turn instrumentation on for connections opened from now on.
+    """
+    SQL_STATS.enabled = True
+    if slow_ms is not None:
+        SQL_STATS.slow_ms = slow_ms
+
 
 def get_con() -> sqlite3.Connection:
-    con = sqlite3.connect(DB_PATH)
+    if SQL_STATS.enabled:
+        con = sqlite3.connect(DB_PATH, factory=_TimedConnection)
+        con.set_trace_callback(_trace)
+    else:
+        con = sqlite3.connect(DB_PATH)
     con.row_factory = sqlite3.Row
     # Optional but good hygiene
     con.execute("PRAGMA foreign_keys = ON;")
@@ -28,7 +213,7 @@ def init_db(con: sqlite3.Connection) -> None:
           cover_id TEXT UNIQUE,
           class_id TEXT NOT NULL,
           cover_date TEXT NOT NULL,
-          status TEXT NOT NULL,                 -- OPEN | FILLED
+          status TEXT NOT NULL,                 -- OPEN | FILLED | CANCELLED
           created_at TEXT NOT NULL,             -- RFC3339 / ISO string in UTC
           filled_at TEXT,                       -- nullable
           assigned_teacher_id TEXT              -- nullable
@@ -36,6 +221,31 @@ def init_db(con: sqlite3.Connection) -> None:
 
         CREATE INDEX IF NOT EXISTS idx_covers_status ON covers(status);
 
+        -- Bumped by triggers on every covers write, from any connection; CoverStore
+        -- compares it to know when its cache is stale (other tables don't count).
+        -- The first write creates the row (no row = version 0), so init_db itself
+        -- never writes once the schema exists.
+        CREATE TABLE IF NOT EXISTS covers_version (
+          id INTEGER PRIMARY KEY CHECK (id = 1),
+          version INTEGER NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS covers_version_ins AFTER INSERT ON covers
+        BEGIN
+          INSERT INTO covers_version (id, version) VALUES (1, 1)
+          ON CONFLICT(id) DO UPDATE SET version = version + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS covers_version_upd AFTER UPDATE ON covers
+        BEGIN
+          INSERT INTO covers_version (id, version) VALUES (1, 1)
+          ON CONFLICT(id) DO UPDATE SET version = version + 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS covers_version_del AFTER DELETE ON covers
+        BEGIN
+          INSERT INTO covers_version (id, version) VALUES (1, 1)
+          ON CONFLICT(id) DO UPDATE SET version = version + 1;
+        END;
+
         -- Accept attempts log
         CREATE TABLE IF NOT EXISTS accept_attempts (
           attempt_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,7 +272,7 @@ def init_db(con: sqlite3.Connection) -> None:
           teacher_id TEXT NOT NULL,
           dm_channel_id TEXT NOT NULL,
           dm_ts TEXT NOT NULL,
-          status TEXT NOT NULL,                 -- NOTIFIED | DECLINED | ACCEPTED | LOST
+          status TEXT NOT NULL,                 -- NOTIFIED | DECLINED | ACCEPTED | LOST | EXPIRED
           updated_at TEXT NOT NULL,
           PRIMARY KEY (cover_id, teacher_id)
         );
@@ -76,6 +286,127 @@ def init_db(con: sqlite3.Connection) -> None:
 
 
         CREATE INDEX IF NOT EXISTS idx_cover_dms_cover ON cover_dms(cover_id);
+
+        -- Slack user -> IM channel (conversations_open result), so DMs skip that call
+        CREATE TABLE IF NOT EXISTS teacher_dm_channels (
+          slack_user_id TEXT PRIMARY KEY,
+          dm_channel_id TEXT NOT NULL,
+          updated_at TEXT NOT NULL
+        );
+
+        -- Archival scans by date
+        CREATE INDEX IF NOT EXISTS idx_covers_date ON covers(cover_date);
+
+        -- Cold history (see archive_repo.py). Same columns + archived_at.
+        CREATE TABLE IF NOT EXISTS covers_archive (
+          id INTEGER PRIMARY KEY,
+          cover_id TEXT UNIQUE,
+          class_id TEXT NOT NULL,
+          cover_date TEXT NOT NULL,
+          status TEXT NOT NULL,
+          created_at TEXT NOT NULL,
+          filled_at TEXT,
+          assigned_teacher_id TEXT,
+          archived_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_covers_archive_date ON covers_archive(cover_date);
+
+        CREATE TABLE IF NOT EXISTS cover_dms_archive (
+          cover_id TEXT NOT NULL,
+          teacher_id TEXT NOT NULL,
+          dm_channel_id TEXT NOT NULL,
+          dm_ts TEXT NOT NULL,
+          status TEXT NOT NULL,
+          updated_at TEXT NOT NULL,
+          archived_at TEXT NOT NULL,
+          PRIMARY KEY (cover_id, teacher_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS accept_attempts_archive (
+          attempt_id INTEGER PRIMARY KEY,
+          cover_id TEXT NOT NULL,
+          teacher_id TEXT NOT NULL,
+          attempted_at TEXT NOT NULL,
+          status TEXT NOT NULL,
+          reason TEXT NOT NULL,
+          archived_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_attempts_archive_cover ON accept_attempts_archive(cover_id);
+        CREATE INDEX IF NOT EXISTS idx_attempts_archive_teacher ON accept_attempts_archive(teacher_id);
+
+        -- Durable background jobs (see job_queue.py)
+        CREATE TABLE IF NOT EXISTS jobs (
+          job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+          kind TEXT NOT NULL,
+          dedupe_key TEXT UNIQUE,           -- same key enqueued twice -> one job
+          payload TEXT NOT NULL,            -- JSON
+          status TEXT NOT NULL,             -- QUEUED / RUNNING / DONE / FAILED
+          attempts INTEGER NOT NULL DEFAULT 0,
+          run_after TEXT NOT NULL,          -- ISO UTC; retries are pushed into the future
+          last_error TEXT,
+          created_at TEXT NOT NULL,
+          updated_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, run_after);
+
+        -- First delivery of each interaction (see action_guard.py); rows expire
+        CREATE TABLE IF NOT EXISTS action_claims (
+          action_key TEXT PRIMARY KEY,      -- kind:action_id:action_ts|trigger_id:user
+          result TEXT,                      -- outcome of the first delivery (NULL = running)
+          created_at TEXT NOT NULL,
+          expires_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_action_claims_expiry ON action_claims(expires_at);
+
+        -- Filled covers per teacher per ISO week, maintained by fill_cover (see week_load_repo.py)
+        CREATE TABLE IF NOT EXISTS teacher_week_loads (
+          week_start TEXT NOT NULL,         -- Monday "YYYY-MM-DD" (Sydney local date)
+          teacher_id TEXT NOT NULL,
+          covers INTEGER NOT NULL,
+          PRIMARY KEY (week_start, teacher_id)
+        );
+
+        -- One digest DM per teacher listing every open cover they can take (DIGEST_MODE)
+        CREATE TABLE IF NOT EXISTS teacher_digests (
+          teacher_id TEXT PRIMARY KEY,
+          dm_channel_id TEXT NOT NULL,
+          dm_ts TEXT NOT NULL,
+          updated_at TEXT NOT NULL
+        );
+
+        -- Public board messages, one per (week, campus) page (BOARD_MODE)
+        CREATE TABLE IF NOT EXISTS cover_boards (
+          week_start TEXT NOT NULL,         -- Monday "YYYY-MM-DD"
+          campus TEXT NOT NULL,
+          page INTEGER NOT NULL,            -- 0 = the pinned message; later pages are in its thread
+          channel_id TEXT NOT NULL,
+          message_ts TEXT NOT NULL,
+          PRIMARY KEY (week_start, campus, page)
+        );
+
+        -- /cover-absence summary panels, re-rendered as their covers change
+        CREATE TABLE IF NOT EXISTS absence_panels (
+          panel_id INTEGER PRIMARY KEY AUTOINCREMENT,
+          teacher_id TEXT NOT NULL,
+          start_date TEXT NOT NULL,
+          end_date TEXT NOT NULL,
+          already INTEGER NOT NULL,         -- class/dates that already had a cover
+          channel_id TEXT NOT NULL,
+          message_ts TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS absence_panel_covers (
+          panel_id INTEGER NOT NULL,
+          cover_id TEXT NOT NULL,
+          PRIMARY KEY (panel_id, cover_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_absence_panel_covers_cover
+        ON absence_panel_covers(cover_id);
         """
     )
     con.commit()
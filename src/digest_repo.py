@@ -0,0 +1,32 @@
+# src/digest_repo.py
+from __future__ import annotations
+
+import sqlite3
+
+
+def upsert_digests(
+    con: sqlite3.Connection, rows: list[tuple[str, str, str, str]]
+) -> None:
+    """
+    rows: (teacher_id, dm_channel_id, dm_ts, updated_at)
+    IMPORTANT: does NOT commit. Caller decides.
+    """
+    con.executemany(
+        """
+        INSERT INTO teacher_digests (teacher_id, dm_channel_id, dm_ts, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(teacher_id) DO UPDATE SET
+          dm_channel_id=excluded.dm_channel_id,
+          dm_ts=excluded.dm_ts,
+          updated_at=excluded.updated_at
+        """,
+        rows,
+    )
+
+
+def list_digests(con: sqlite3.Connection) -> dict[str, tuple[str, str]]:
+    """
+    teacher_id -> (dm_channel_id, dm_ts) of their digest DM.
+    """
+    cur = con.execute("SELECT teacher_id, dm_channel_id, dm_ts FROM teacher_digests")
+    return {r[0]: (r[1], r[2]) for r in cur.fetchall()}
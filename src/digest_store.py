@@ -0,0 +1,46 @@
+# src/digest_store.py
+from __future__ import annotations
+
+import threading
+
+from digest_repo import list_digests
+
+
+class DigestStore:
+    """
+    teacher_id -> (dm_channel_id, dm_ts) of their digest DM, mirrored from
+    teacher_digests. Also answers "is this message a digest?" for handlers that
+    would otherwise freeze a single-cover DM in place.
+    """
+
+    def __init__(self) -> None:
+        self._by_teacher: dict[str, tuple[str, str]] = {}
+        self._messages: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def load(self, con) -> None:
+        digests = list_digests(con)
+        with self._lock:
+            self._by_teacher = digests
+            self._messages = set(digests.values())
+
+    def get(self, teacher_id: str) -> tuple[str, str] | None:
+        with self._lock:
+            return self._by_teacher.get(teacher_id)
+
+    def teachers(self) -> set[str]:
+        with self._lock:
+            return set(self._by_teacher)
+
+    def is_digest(self, channel_id: str, ts: str) -> bool:
+        with self._lock:
+            return (channel_id, ts) in self._messages
+
+    def put(self, teacher_id: str, channel_id: str, ts: str) -> None:
+        # Call AFTER the caller's commit
+        with self._lock:
+            old = self._by_teacher.get(teacher_id)
+            if old is not None:
+                self._messages.discard(old)
+            self._by_teacher[teacher_id] = (channel_id, ts)
+            self._messages.add((channel_id, ts))
@@ -0,0 +1,45 @@
+import sqlite3
+
+
+def upsert_dm_channel(
+    con: sqlite3.Connection, slack_user_id: str, dm_channel_id: str, updated_at: str
+) -> None:
+    con.execute(
+        """
+      INSERT INTO teacher_dm_channels (slack_user_id, dm_channel_id, updated_at)
+      VALUES (?, ?, ?)
+      ON CONFLICT(slack_user_id) DO UPDATE SET
+        dm_channel_id=excluded.dm_channel_id,
+        updated_at=excluded.updated_at
+    """,
+        (slack_user_id, dm_channel_id, updated_at),
+    )
+
+
+def upsert_dm_channels(
+    con: sqlite3.Connection, rows: list[tuple[str, str, str]]
+) -> None:
+    """
+    Batched upsert_dm_channel: rows are (slack_user_id, dm_channel_id, updated_at).
+    """
+    con.executemany(
+        """
+      INSERT INTO teacher_dm_channels (slack_user_id, dm_channel_id, updated_at)
+      VALUES (?, ?, ?)
+      ON CONFLICT(slack_user_id) DO UPDATE SET
+        dm_channel_id=excluded.dm_channel_id,
+        updated_at=excluded.updated_at
+    """,
+        rows,
+    )
+
+
+def delete_dm_channel(con: sqlite3.Connection, slack_user_id: str) -> None:
+    con.execute(
+        "DELETE FROM teacher_dm_channels WHERE slack_user_id=?", (slack_user_id,)
+    )
+
+
+def list_dm_channels(con: sqlite3.Connection) -> dict[str, str]:
+    cur = con.execute("SELECT slack_user_id, dm_channel_id FROM teacher_dm_channels")
+    return {r[0]: r[1] for r in cur.fetchall()}
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+
+from db import get_con
+from dm_channel_repo import (
+    delete_dm_channel,
+    list_dm_channels,
+    upsert_dm_channel,
+    upsert_dm_channels,
+)
+from slack_fanout import gather
+
+# conversations.open is tier 3 (~50/min, burst 20). Prewarm takes 10 every 30s,
+# i.e. ~20/min, so lazy opens on the Accept/Notify path still find tokens.
+PREWARM_BATCH = 10
+PREWARM_PAUSE_S = 30.0
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class DmChannelStore:
+    """
+    slack_user_id -> IM channel id, backed by teacher_dm_channels.
+
+    Filled lazily (first DM opens the conversation and persists it) and pre-warmed
+    in bulk at startup, so repeat DMs are a single chat_postMessage.
+    Writes use their own short-lived connection: callers may be fan-out threads.
+    """
+
+    def __init__(self) -> None:
+        self._by_user: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, con) -> None:
+        channels = list_dm_channels(con)
+        with self._lock:
+            self._by_user = channels
+
+    def get(self, slack_user_id: str) -> str | None:
+        with self._lock:
+            return self._by_user.get(slack_user_id)
+
+    def channel_for(self, client, slack_user_id: str) -> str:
+        ch = self.get(slack_user_id)
+        if ch is not None:
+            return ch
+
+        im = client.conversations_open(users=slack_user_id)
+        ch = im["channel"]["id"]
+
+        with self._lock:
+            self._by_user[slack_user_id] = ch
+        con = get_con()
+        try:
+            upsert_dm_channel(con, slack_user_id, ch, _now_iso())
+            con.commit()
+        finally:
+            con.close()
+        return ch
+
+    def forget(self, slack_user_id: str) -> None:
+        """
+        Drop a stale mapping (e.g. channel_not_found) so the next DM re-opens it.
+        """
+        with self._lock:
+            self._by_user.pop(slack_user_id, None)
+        con = get_con()
+        try:
+            delete_dm_channel(con, slack_user_id)
+            con.commit()
+        finally:
+            con.close()
+
+    def prewarm(
+        self,
+        client,
+        slack_user_ids: list[str],
+        batch: int = PREWARM_BATCH,
+        pause_s: float = PREWARM_PAUSE_S,
+    ) -> int:
+        """
+        Open IM channels for every user not cached yet, `batch` at a time with
+        `pause_s` between batches, persisting each batch. Users opened lazily
+        meanwhile are skipped. Returns how many were opened.
+        """
+        missing = [u for u in slack_user_ids if self.get(u) is None]
+
+        opened = 0
+        for i in range(0, len(missing), batch):
+            if i:
+                time.sleep(pause_s)
+            chunk = [u for u in missing[i : i + batch] if self.get(u) is None]
+            # client is a SlackLane: SlackIO paces the calls inside a batch
+            results = gather(
+                [client.submit("conversations_open", users=u) for u in chunk]
+            )
+
+            ts = _now_iso()
+            rows = []
+            for u, (im, err) in zip(chunk, results):
+                if err is None:
+                    rows.append((u, im["channel"]["id"], ts))
+
+            with self._lock:
+                for u, ch, _ts in rows:
+                    self._by_user[u] = ch
+
+            if rows:
+                con = get_con()
+                try:
+                    upsert_dm_channels(con, rows)
+                    con.commit()
+                finally:
+                    con.close()
+            opened += len(rows)
+        return opened
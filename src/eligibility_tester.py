@@ -3,6 +3,7 @@ from pathlib import Path
 from csv_loader import load_validated_frames, teachers_from_df, classes_from_df
 from indexes import index_regular_classes_by_teacher
 from algorithm import eligible_teachers_for_class
+from reason_library import encode_reasons
 
 
 def main():
@@ -32,7 +33,7 @@ def main():
     # show a few rejected examples
     print("\nSample rejections:")
     for tid in list(rejected.keys())[:10]:
-        print(tid, "=>", rejected[tid])
+        print(tid, "=>", encode_reasons(rejected[tid]))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
 from __future__ import annotations
+from datetime import date, timedelta
+
 from models import ClassSession
+from algorithm import class_local_day_and_minutes
 from cover_repo import list_filled_covers
 from cover_time import materialize_for_cover_date
 
@@ -19,6 +22,26 @@ def index_regular_classes_by_teacher(
     return out
 
 
+def regular_class_dates(
+    regular_classes: list[ClassSession], start: date, end: date
+) -> list[tuple[str, str]]:
+    """
+    Every (class_id, "YYYY-MM-DD") one teacher's regular classes fall on in
+    [start, end] (Sydney local dates), in date then start-time order.
+    """
+    by_day: dict[str, list[ClassSession]] = {}
+    for c in sorted(regular_classes, key=lambda c: class_local_day_and_minutes(c)[1]):
+        by_day.setdefault(class_local_day_and_minutes(c)[0], []).append(c)
+
+    out: list[tuple[str, str]] = []
+    d = start
+    while d <= end:
+        for c in by_day.get(d.strftime("%a"), []):
+            out.append((c.class_id, d.isoformat()))
+        d += timedelta(days=1)
+    return out
+
+
 def index_filled_cover_classes_by_teacher(
     con,
     classes_by_id: dict[str, ClassSession],
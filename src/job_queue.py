@@ -0,0 +1,211 @@
+# src/job_queue.py
+from __future__ import annotations
+
+import json
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from db import get_con
+from job_repo import (
+    claim_next_job,
+    enqueue_job,
+    mark_job_done,
+    mark_job_failed,
+    mark_job_retry,
+    next_run_after,
+    requeue_running_jobs,
+)
+
+JOB_WORKERS = 4
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_BASE_S = 2.0  # 2s, 4s, 8s, ... capped
+JOB_RETRY_MAX_S = 300.0
+# done/retry/failed writes; past this the restart requeue picks the job up
+JOB_RECORD_ATTEMPTS = 3
+JOB_IDLE_POLL_S = 5.0  # upper bound on sleep (catches jobs enqueued by other processes)
+
+# A handler gets its own connection and commits its own writes.
+# It MUST be idempotent: a retry (or a crash resume) runs it again from the top.
+JobHandler = Callable[[Any, dict[str, Any]], None]
+
+
+def _iso(dt: datetime) -> str:
+    # Fixed width so run_after compares correctly as text
+    return dt.isoformat(timespec="milliseconds")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def retry_delay_s(attempts: int) -> float:
+    return min(JOB_RETRY_MAX_S, JOB_RETRY_BASE_S * 2 ** (attempts - 1))
+
+
+class JobQueue:
+    """
+    SQLite-backed work queue for everything that doesn't have to happen before
+    ack(): DM fan-out, LOST updates, thread posts.
+
+    - enqueue() commits the job, so it survives a crash from then on
+    - start() re-queues jobs left RUNNING by a previous process, then starts workers
+    - failures retry with exponential backoff; after JOB_MAX_ATTEMPTS -> FAILED
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS) -> None:
+        self._workers = workers
+        self._handlers: dict[str, JobHandler] = {}
+        self._cond = threading.Condition()
+        self._started = False
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        def register(fn: JobHandler) -> JobHandler:
+            self._handlers[kind] = fn
+            return fn
+
+        return register
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        dedupe_key: str | None = None,
+        con=None,
+    ) -> int | None:
+        """
+        Persist a job and wake a worker. Returns job_id (None if deduped).
+        Pass `con` to enqueue inside the caller's transaction; the caller then
+        commits and calls wake().
+        """
+        if kind not in self._handlers:
+            raise KeyError(f"No job handler for {kind!r}")
+
+        now = _iso(_now())
+        own = con is None
+        if own:
+            con = get_con()
+        try:
+            job_id = enqueue_job(con, kind, payload, now, now, dedupe_key)
+            if own:
+                con.commit()
+        finally:
+            if own:
+                con.close()
+
+        if own:
+            self.wake()
+        return job_id
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify()
+
+    def start(self) -> None:
+        if self._started:
+            return
+        self._started = True
+
+        con = get_con()
+        try:
+            n = requeue_running_jobs(con, _iso(_now()))
+            con.commit()
+        finally:
+            con.close()
+        if n:
+            print(f"Resumed {n} interrupted jobs.")
+
+        for i in range(self._workers):
+            threading.Thread(
+                target=self._worker, name=f"job-worker-{i}", daemon=True
+            ).start()
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _claim(self, con) -> tuple[Any, float]:
+        """
+        Returns (job row | None, seconds until the next queued job is due).
+        """
+        now = _now()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            job = claim_next_job(con, _iso(now))
+            nxt = None if job else next_run_after(con)
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+        if job or nxt is None:
+            return job, JOB_IDLE_POLL_S
+        wait = (datetime.fromisoformat(nxt) - now).total_seconds()
+        return None, max(0.05, min(JOB_IDLE_POLL_S, wait))
+
+    def _worker(self) -> None:
+        con = get_con()
+        while True:
+            try:
+                job, wait = self._claim(con)
+            except Exception as e:
+                print("job claim failed:", e)
+                job, wait = None, JOB_IDLE_POLL_S
+
+            if job is None:
+                with self._cond:
+                    self._cond.wait(wait)
+                continue
+
+            try:
+                self._run(con, job)
+            except Exception as e:
+                # Never let one job take the worker thread down
+                print("job worker error:", e)
+
+    def _run(self, con, job) -> None:
+        job_id, kind, attempts = job["job_id"], job["kind"], job["attempts"]
+        try:
+            fn = self._handlers[kind]
+            job_con = get_con()
+            try:
+                fn(job_con, json.loads(job["payload"]))
+            finally:
+                job_con.close()
+        except Exception as e:
+            err = f"{type(e).__name__}: {e}"
+            now = _now()
+            if attempts >= JOB_MAX_ATTEMPTS:
+                print(f"job {job_id} ({kind}) failed permanently:", err)
+                traceback.print_exc()
+                self._record(con, job_id, mark_job_failed, err, _iso(now))
+            else:
+                run_after = now + timedelta(seconds=retry_delay_s(attempts))
+                print(f"job {job_id} ({kind}) attempt {attempts} failed:", err)
+                self._record(
+                    con, job_id, mark_job_retry, _iso(run_after), err, _iso(now)
+                )
+            return
+
+        self._record(con, job_id, mark_job_done, _iso(_now()))
+
+    @staticmethod
+    def _record(con, job_id: int, mark: Callable, *args) -> None:
+        """
+        Job bookkeeping must not kill the worker (e.g. "database is locked"):
+        roll back and retry a few times. If it still fails the row stays
+        RUNNING and is requeued on the next start (handlers are idempotent).
+        """
+        for attempt in range(1, JOB_RECORD_ATTEMPTS + 1):
+            try:
+                mark(con, job_id, *args)
+                con.commit()
+                return
+            except Exception as e:
+                print(f"job {job_id}: {mark.__name__} attempt {attempt} failed:", e)
+                try:
+                    con.rollback()
+                except Exception:
+                    pass
+                time.sleep(0.2 * attempt)
@@ -0,0 +1,125 @@
+import json
+import sqlite3
+from typing import Any
+
+# IMPORTANT: none of these commit. Caller decides (claims run inside BEGIN IMMEDIATE).
+
+
+def enqueue_job(
+    con: sqlite3.Connection,
+    kind: str,
+    payload: dict[str, Any],
+    run_after: str,
+    created_at: str,
+    dedupe_key: str | None = None,
+) -> int | None:
+    """
+    Returns the new job_id, or None if a job with this dedupe_key already exists.
+    """
+    cur = con.execute(
+        """
+      INSERT INTO jobs (kind, dedupe_key, payload, status, attempts, run_after,
+                        created_at, updated_at)
+      VALUES (?, ?, ?, 'QUEUED', 0, ?, ?, ?)
+      ON CONFLICT(dedupe_key) DO NOTHING
+    """,
+        (kind, dedupe_key, json.dumps(payload), run_after, created_at, created_at),
+    )
+    return cur.lastrowid if cur.rowcount == 1 else None
+
+
+def claim_next_job(con: sqlite3.Connection, now: str) -> sqlite3.Row | None:
+    """
+    Oldest due QUEUED job -> RUNNING (attempts + 1). Returns the claimed row.
+    """
+    return con.execute(
+        """
+      UPDATE jobs
+      SET status='RUNNING', attempts=attempts + 1, updated_at=?
+      WHERE job_id = (
+        SELECT job_id FROM jobs
+        WHERE status='QUEUED' AND run_after <= ?
+        ORDER BY run_after, job_id
+        LIMIT 1
+      )
+      RETURNING job_id, kind, payload, attempts
+    """,
+        (now, now),
+    ).fetchone()
+
+
+def next_run_after(con: sqlite3.Connection) -> str | None:
+    row = con.execute(
+        "SELECT MIN(run_after) FROM jobs WHERE status='QUEUED'"
+    ).fetchone()
+    return row[0] if row else None
+
+
+def mark_job_done(con: sqlite3.Connection, job_id: int, updated_at: str) -> None:
+    con.execute(
+        "UPDATE jobs SET status='DONE', last_error=NULL, updated_at=? WHERE job_id=?",
+        (updated_at, job_id),
+    )
+
+
+def mark_job_retry(
+    con: sqlite3.Connection, job_id: int, run_after: str, error: str, updated_at: str
+) -> None:
+    con.execute(
+        """
+      UPDATE jobs SET status='QUEUED', run_after=?, last_error=?, updated_at=?
+      WHERE job_id=?
+    """,
+        (run_after, error, updated_at, job_id),
+    )
+
+
+def mark_job_failed(
+    con: sqlite3.Connection, job_id: int, error: str, updated_at: str
+) -> None:
+    con.execute(
+        "UPDATE jobs SET status='FAILED', last_error=?, updated_at=? WHERE job_id=?",
+        (error, updated_at, job_id),
+    )
+
+
+def requeue_running_jobs(con: sqlite3.Connection, updated_at: str) -> int:
+    """
+    Crash recovery: anything still RUNNING was interrupted mid-flight.
+    Only safe while no worker is running (i.e. at startup).
+    """
+    cur = con.execute(
+        "UPDATE jobs SET status='QUEUED', updated_at=? WHERE status='RUNNING'",
+        (updated_at,),
+    )
+    return cur.rowcount
+
+
+def count_jobs_by_status(con: sqlite3.Connection) -> dict[str, int]:
+    cur = con.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+    return {r[0]: r[1] for r in cur.fetchall()}
+
+
+def list_failed_jobs(con: sqlite3.Connection, limit: int = 20) -> list[sqlite3.Row]:
+    cur = con.execute(
+        """
+      SELECT job_id, kind, attempts, last_error, updated_at
+      FROM jobs WHERE status='FAILED'
+      ORDER BY updated_at DESC
+      LIMIT ?
+    """,
+        (limit,),
+    )
+    return cur.fetchall()
+
+
+def purge_finished_jobs(con: sqlite3.Connection, before: str) -> int:
+    """
+    Drop DONE/FAILED jobs last touched before `before`. Their dedupe_keys are
+    released with them.
+    """
+    cur = con.execute(
+        "DELETE FROM jobs WHERE status IN ('DONE', 'FAILED') AND updated_at < ?",
+        (before,),
+    )
+    return cur.rowcount
@@ -1,86 +1,199 @@
 from __future__ import annotations
 
 import re
+from enum import Enum
+from typing import Callable, NamedTuple
+
+from time_fmt import mm_to_hhmm
+
+
+class ReasonCode(str, Enum):
+    """
+    Why a teacher can't (or shouldn't) take a cover. Values are the code names
+    stored in accept_attempts.reason, so the DB format doesn't change.
+    """
+
+    # accept flow
+    COVER_NOT_FOUND = "cover_not_found"
+    COVER_NOT_OPEN = "cover_not_open"
+    TEACHER_NOT_FOUND = "teacher_not_found"
+    CLASS_NOT_FOUND_FOR_COVER = "class_not_found_for_cover"
+    ALREADY_FILLED = "already_filled"
+    ACCEPTED = "accepted"
+
+    # capability
+    IS_REGULAR_TEACHER = "is_regular_teacher"
+    JUNIOR_CANNOT_COVER_YEAR12 = "junior_cannot_cover_year12"
+    JUNIOR_CANNOT_COVER_EXTENSION = "junior_cannot_cover_extension"
+    JUNIOR_ONLY_MAT_7_10 = "junior_only_mat_7_10"
+    JUNIOR_ONLY_MADV_OR_MAS_11 = "junior_only_madv_or_mas_11"
+    INVALID_CLASS_SUBJECT_OR_YEAR = "invalid_class_subject_or_year"
+    CAMPUS_NOT_ALLOWED = "campus_not_allowed"  # (campus,)
+    SUBJECT_MISMATCH = "subject_mismatch"  # (subject,)
+    YEAR_LEVEL_MISMATCH = "year_level_mismatch"  # (year,)
+
+    # availability / timetable / load
+    NOT_AVAILABLE_ON_DAY = "not_available_on_day"  # (day,)
+    NOT_AVAILABLE_IN_WINDOW = "not_available_in_window"  # (day, start_min, end_min)
+    TIMETABLE_CLASH = "timetable_clash"  # (class_id,)
+    WEEKLY_COVER_LIMIT_REACHED = "weekly_cover_limit_reached"
+
+    # recommendation (soft)
+    TRAVEL_GAP_INSUFFICIENT = "travel_gap_insufficient"  # (nearest_class_id, gap_min)
+
+    # anything we can't parse (old rows, typos): params = (raw string,)
+    UNKNOWN = "unknown"
+
+
+class Reason(NamedTuple):
+    """
+    A reason code + its raw params. Nothing is formatted until it is rendered
+    (render_reason) or serialized (str() / encode_reasons).
+    """
+
+    code: ReasonCode
+    params: tuple = ()
+
+    def __str__(self) -> str:
+        return encode_reason(self)
+
+
+# Param-less reasons are shared instances
+_BARE = {code: Reason(code) for code in ReasonCode}
+
+
+def reason(code: ReasonCode, *params) -> Reason:
+    return Reason(code, params) if params else _BARE[code]
+
+
+# ----------------------------
+# Rendering (friendly text): one dispatch table, built once
+# ----------------------------
+_RENDER: dict[ReasonCode, Callable[..., str]] = {
+    ReasonCode.COVER_NOT_FOUND: lambda: "That cover request doesn’t exist.",
+    ReasonCode.COVER_NOT_OPEN: lambda: "That cover has already been filled.",
+    ReasonCode.TEACHER_NOT_FOUND: lambda: "Teacher ID not found.",
+    ReasonCode.CLASS_NOT_FOUND_FOR_COVER: lambda: "Class for this cover could not be found.",
+    ReasonCode.ALREADY_FILLED: lambda: "Someone else already accepted this cover.",
+    ReasonCode.ACCEPTED: lambda: "Accepted successfully.",
+    ReasonCode.WEEKLY_COVER_LIMIT_REACHED: lambda: "Already at the maximum number of covers for that week.",
+    ReasonCode.IS_REGULAR_TEACHER: lambda: "You are the regular teacher for this class.",
+    ReasonCode.JUNIOR_CANNOT_COVER_YEAR12: lambda: "Junior teachers can’t cover Year 12 classes.",
+    ReasonCode.JUNIOR_CANNOT_COVER_EXTENSION: lambda: "Junior teachers can’t cover Extension classes (MX1/MX2).",
+    ReasonCode.JUNIOR_ONLY_MAT_7_10: lambda: "Junior teachers can only cover MAT for Years 7–10.",
+    ReasonCode.JUNIOR_ONLY_MADV_OR_MAS_11: lambda: "Junior teachers can only cover MADV/MAS for Year 11.",
+    ReasonCode.INVALID_CLASS_SUBJECT_OR_YEAR: lambda: "This class’s subject/year isn’t one we can match.",
+    ReasonCode.CAMPUS_NOT_ALLOWED: lambda campus: f"Not eligible for {campus.title()} campus.",
+    ReasonCode.SUBJECT_MISMATCH: lambda subj: f"Not approved to teach {subj}.",
+    ReasonCode.YEAR_LEVEL_MISMATCH: lambda yr: f"Not approved to teach Year {yr}.",
+    ReasonCode.NOT_AVAILABLE_ON_DAY: lambda day: f"Not available on {day}.",
+    ReasonCode.NOT_AVAILABLE_IN_WINDOW: lambda day, s, e: (
+        f"Not available {day} {mm_to_hhmm(s)}–{mm_to_hhmm(e)}."
+    ),
+    ReasonCode.TIMETABLE_CLASH: lambda clash_id: f"Clashes with another class ({clash_id}).",
+    ReasonCode.TRAVEL_GAP_INSUFFICIENT: lambda nearest, gap: (
+        f"Not recommended: only {gap} min gap travel to another campus ({nearest})."
+    ),
+    ReasonCode.UNKNOWN: lambda raw: raw,
+}
+
+
+def render_reason(r: Reason) -> str:
+    try:
+        return _RENDER[r.code](*r.params)
+    except TypeError:
+        # Params don't fit the code (e.g. a bare "campus_not_allowed" row):
+        # show it raw, as the text-only version did
+        args = ", ".join(str(p) for p in r.params)
+        return f"{r.code.value}({args})" if r.params else r.code.value
+
+
+# ----------------------------
+# Serialization (accept_attempts.reason): "code" or "code(args)", joined by "|"
+# ----------------------------
+_ENCODE_ARGS: dict[ReasonCode, Callable[..., str]] = {
+    ReasonCode.NOT_AVAILABLE_IN_WINDOW: lambda day, s, e: (
+        f"{day}:{mm_to_hhmm(s)}-{mm_to_hhmm(e)}"
+    ),
+    ReasonCode.TRAVEL_GAP_INSUFFICIENT: lambda nearest, gap: (
+        f"nearest={nearest}, gap_min={gap}"
+    ),
+}
+
+_CODE_RE = re.compile(r"(\w+)(?:\((.*)\))?\Z", re.S)
+
+_HHMM = r"(\d\d):(\d\d)"
+_WINDOW_RE = re.compile(rf"([A-Za-z]{{3}}):{_HHMM}-{_HHMM}\Z")
+_TRAVEL_RE = re.compile(r"nearest=(.+), gap_min=(\d+)\Z")
+
+
+def _window_params(args: str) -> tuple | None:
+    m = _WINDOW_RE.match(args)
+    if not m:
+        return None
+    day, sh, sm, eh, em = m.groups()
+    return day, int(sh) * 60 + int(sm), int(eh) * 60 + int(em)
+
+
+def _travel_params(args: str) -> tuple | None:
+    m = _TRAVEL_RE.match(args)
+    return (m.group(1), int(m.group(2))) if m else None
+
+
+# args string -> params tuple (None = malformed); single-arg codes not listed take it as-is
+_DECODE_ARGS: dict[ReasonCode, Callable[[str], tuple | None]] = {
+    ReasonCode.NOT_AVAILABLE_IN_WINDOW: _window_params,
+    ReasonCode.TRAVEL_GAP_INSUFFICIENT: _travel_params,
+}
+
+_BY_VALUE = {code.value: code for code in ReasonCode}
+
+
+def encode_reason(r: Reason) -> str:
+    if r.code is ReasonCode.UNKNOWN:
+        return r.params[0]
+    if not r.params:
+        return r.code.value
+    enc = _ENCODE_ARGS.get(r.code)
+    args = enc(*r.params) if enc else ", ".join(str(p) for p in r.params)
+    return f"{r.code.value}({args})"
+
+
+def decode_reason(code_str: str) -> Reason:
+    m = _CODE_RE.match(code_str)
+    code = _BY_VALUE.get(m.group(1)) if m else None
+    if code is None or code is ReasonCode.UNKNOWN:
+        return Reason(ReasonCode.UNKNOWN, (code_str,))
+
+    args = m.group(2)
+    if args is None:
+        return _BARE[code]
+    dec = _DECODE_ARGS.get(code)
+    params = dec(args) if dec else (args,)
+    if params is None:
+        return Reason(ReasonCode.UNKNOWN, (code_str,))
+    return Reason(code, params)
+
+
+def encode_reasons(reasons: list[Reason]) -> str:
+    return "|".join(encode_reason(r) for r in reasons)
+
+
+def decode_reasons(reason_str: str) -> list[Reason]:
+    # accept_attempts.reason: codes joined by "|" ("" if accepted)
+    if not reason_str:
+        return []
+    return [decode_reason(s) for s in reason_str.split("|")]
 
 
-def match_reason(code: str) -> str:
-    # Direct matches
-    if code == "cover_not_found":
-        return "That cover request doesn’t exist."
-    if code == "cover_not_open":
-        return "That cover has already been filled."
-    if code == "teacher_not_found":
-        return "Teacher ID not found."
-    if code == "class_not_found_for_cover":
-        return "Class for this cover could not be found."
-    if code == "already_filled":
-        return "Someone else already accepted this cover."
-    if code == "accepted":
-        return "Accepted successfully."
-
-    if code == "is_regular_teacher":
-        return "You are the regular teacher for this class."
-
-    if code == "junior_cannot_cover_year12":
-        return "Junior teachers can’t cover Year 12 classes."
-    if code == "junior_cannot_cover_extension":
-        return "Junior teachers can’t cover Extension classes (MX1/MX2)."
-    if code == "junior_only_mat_7_10":
-        return "Junior teachers can only cover MAT for Years 7–10."
-    if code == "junior_only_madv_or_mas_11":
-        return "Junior teachers can only cover MADV/MAS for Year 11."
-
-    # Patterned codes
-    m = re.match(r"campus_not_allowed\((.+)\)", code)
-    if m:
-        campus = m.group(1)
-        return f"Not eligible for {campus.title()} campus."
-
-    m = re.match(r"subject_mismatch\((.+)\)", code)
-    if m:
-        subj = m.group(1)
-        return f"Not approved to teach {subj}."
-
-    m = re.match(r"year_level_mismatch\((\d+)\)", code)
-    if m:
-        yr = m.group(1)
-        return f"Not approved to teach Year {yr}."
-
-    m = re.match(r"not_available_on_day\((.+)\)", code)
-    if m:
-        day = m.group(1)
-        return f"Not available on {day}."
-
-    # expects: not_available_in_window(Sun:09:00-12:00)
-    m = re.match(
-        r"not_available_in_window\(([A-Za-z]{3}):(\d\d:\d\d)-(\d\d:\d\d)\)", code
-    )
-    if m:
-        day, s, e = m.group(1), m.group(2), m.group(3)
-        return f"Not available {day} {s}–{e}."
-
-    m = re.match(r"timetable_clash\((.+)\)", code)
-    if m:
-        clash_id = m.group(1)
-        return f"Clashes with another class ({clash_id})."
-
-    m = re.match(r"travel_gap_insufficient\(nearest=(.+), gap_min=(\d+)\)", code)
-    if m:
-        nearest, gap = m.group(1), int(m.group(2))
-        return (
-            f"Not recommended: only {gap} min gap travel to another campus ({nearest})."
-        )
-
-    # Fallback
-    return code
-
-
-def match_reasons(codes: list[str]) -> list[str]:
-    return [match_reason(c) for c in codes]
+# ----------------------------
+# Friendly text (accepts Reasons or stored code strings)
+# ----------------------------
+def match_reason(code: Reason | str) -> str:
+    if not isinstance(code, Reason):
+        code = decode_reason(code)
+    return render_reason(code)
 
 
-def split_reason_str(reason_str: str) -> list[str]:
-    # accept_service stores codes joined by "|"
-    if not reason_str:
-        return []
-    return reason_str.split("|")
+def match_reasons(codes: list[Reason] | list[str]) -> list[str]:
+    return [match_reason(c) for c in codes]
@@ -0,0 +1,111 @@
+# src/recommendation_cache.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from cover_models import CoverRequest
+from cover_store import CoverStore
+from cover_time import week_start
+from indexes import (
+    index_regular_classes_by_teacher,
+    index_filled_cover_classes_by_teacher,
+    merge_busy_maps,
+)
+from models import ClassSession, Teacher
+from recommendations_engine import RecommendationResult, get_recommendations_for_cover
+from week_load_store import WeekLoadStore
+
+
+class RecommendationCache:
+    """
+    Process-wide busy map + per-cover RecommendationResult.
+
+    Both only depend on the roster (static) and on which covers are filled
+    (weekly loads included, read from the WeekLoadStore mirror), so they stay
+    valid until CoverStore.generation moves (our own fills via put/refresh,
+    foreign commits via sync/load).
+
+    Results are shared: callers must treat the busy map and the result lists as
+    read-only.
+    """
+
+    def __init__(
+        self,
+        store: CoverStore,
+        teachers_by_id: dict[str, Teacher],
+        classes_by_id: dict[str, ClassSession],
+        loads: WeekLoadStore | None = None,
+    ) -> None:
+        self.store = store
+        self.teachers_by_id = teachers_by_id
+        self.classes_by_id = classes_by_id
+        self.loads = loads
+        # Regular timetable never changes at runtime
+        self._regular = index_regular_classes_by_teacher(classes_by_id)
+        self._generation: int | None = None
+        self._busy: dict[str, list[ClassSession]] | None = None
+        self._by_cover: dict[str, RecommendationResult] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _current(self, con: sqlite3.Connection) -> int:
+        """
+        Sync the store, drop everything if the covers changed. Returns the generation.
+        """
+        self.store.sync(con)
+        gen = self.store.generation
+        with self._lock:
+            if gen != self._generation:
+                self._generation = gen
+                self._busy = None
+                self._by_cover = {}
+        return gen
+
+    def busy_map(self, con: sqlite3.Connection) -> dict[str, list[ClassSession]]:
+        gen = self._current(con)
+        with self._lock:
+            if self._busy is not None:
+                return self._busy
+
+        filled = index_filled_cover_classes_by_teacher(con, self.classes_by_id)
+        busy = merge_busy_maps(self._regular, filled)
+        with self._lock:
+            if self._generation == gen:
+                self._busy = busy
+        return busy
+
+    def get(
+        self,
+        con: sqlite3.Connection,
+        cover_id: str,
+        cover: CoverRequest | None = None,
+    ) -> RecommendationResult:
+        gen = self._current(con)
+        with self._lock:
+            hit = self._by_cover.get(cover_id)
+            if hit is not None:
+                self.hits += 1
+                return hit
+            self.misses += 1
+
+        if cover is None:
+            cover = self.store.get(con, cover_id)
+        weekly = None
+        if cover is not None and self.loads is not None:
+            weekly = self.loads.week(con, week_start(cover.cover_date))
+
+        result = get_recommendations_for_cover(
+            con,
+            cover_id,
+            self.teachers_by_id,
+            self.classes_by_id,
+            cover=cover,
+            busy_map=self.busy_map(con),
+            weekly_covers=weekly,
+        )
+        with self._lock:
+            if self._generation == gen:
+                self._by_cover[cover_id] = result
+        return result
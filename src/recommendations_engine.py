@@ -2,12 +2,20 @@
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from cover_repo import get_cover
-from cover_time import materialize_for_cover_date
-from algorithm import eligible_teachers_for_class, recommended_teachers_for_class
+from cover_time import materialize_for_cover_date, week_start
+from algorithm import (
+    eligible_teachers_for_class,
+    recommended_teachers_for_class,
+    teacher_score,
+    top_k,
+)
 from models import Teacher, ClassSession
+from reason_library import Reason
+from week_load_repo import list_week_loads
+from cover_models import CoverRequest
 from indexes import (
     index_regular_classes_by_teacher,
     index_filled_cover_classes_by_teacher,
@@ -20,8 +28,16 @@ class RecommendationResult:
     cover_id: str
     class_id: str
     recommended: list[str]
-    soft_excluded: dict[str, list[str]]
-    hard_rejected: dict[str, list[str]]
+    soft_excluded: dict[str, list[Reason]]
+    hard_rejected: dict[str, list[Reason]]
+    # teacher_id -> ranking score, for every recommended teacher
+    scores: dict[str, float] = field(default_factory=dict)
+
+    def top(self, k: int) -> list[str]:
+        """
+        The k best recommended teachers, best first (heap select, not a full sort).
+        """
+        return top_k(self.scores, k)
 
 
 def get_recommendations_for_cover(
@@ -29,8 +45,13 @@ def get_recommendations_for_cover(
     cover_id: str,
     teachers_by_id: dict[str, Teacher],
     classes_by_id: dict[str, ClassSession],
+    cover: CoverRequest | None = None,
+    busy_map: dict[str, list[ClassSession]] | None = None,
+    weekly_covers: dict[str, int] | None = None,
 ) -> RecommendationResult:
-    cover = get_cover(con, cover_id)
+    # Callers that already hold the cover (e.g. from CoverStore) pass it in
+    if cover is None:
+        cover = get_cover(con, cover_id)
     if cover is None:
         raise ValueError(f"cover_not_found: {cover_id}")
 
@@ -42,21 +63,34 @@ def get_recommendations_for_cover(
     c = materialize_for_cover_date(template, cover.cover_date)
 
     # Busy sessions = regular timetable + accepted covers
-    regular_map = index_regular_classes_by_teacher(classes_by_id)
-    filled_map = index_filled_cover_classes_by_teacher(
-        con, classes_by_id
-    )  # see note below
-    busy_map = merge_busy_maps(regular_map, filled_map)
+    if busy_map is None:
+        regular_map = index_regular_classes_by_teacher(classes_by_id)
+        filled_map = index_filled_cover_classes_by_teacher(
+            con, classes_by_id
+        )  # see note below
+        busy_map = merge_busy_maps(regular_map, filled_map)
 
-    _eligible, hard_rejected = eligible_teachers_for_class(teachers_by_id, c, busy_map)
+    # Covers each teacher already holds in the cover's week (cap + ranking)
+    if weekly_covers is None:
+        weekly_covers = list_week_loads(con, week_start(cover.cover_date))
+
+    eligible, hard_rejected = eligible_teachers_for_class(
+        teachers_by_id, c, busy_map, weekly_covers
+    )
     recommended, soft_excluded = recommended_teachers_for_class(
-        teachers_by_id, c, busy_map
+        teachers_by_id, c, busy_map, weekly_covers, eligible=eligible
     )
 
+    scores = {
+        tid: teacher_score(teachers_by_id[tid], c, busy_map, weekly_covers.get(tid, 0))
+        for tid in recommended
+    }
+
     return RecommendationResult(
         cover_id=cover.cover_id,
         class_id=cover.class_id,
         recommended=recommended,
         soft_excluded=soft_excluded,
         hard_rejected=hard_rejected,
+        scores=scores,
     )
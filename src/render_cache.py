@@ -0,0 +1,111 @@
+# src/render_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+# Roughly one entry per live card/DM; oldest pointers fall out first.
+RENDER_CACHE_MAX = 5000
+
+
+def payload_hash(text: str, blocks: list[dict]) -> str:
+    """
+    Stable digest of a message payload (key order doesn't matter).
+    """
+    raw = json.dumps(
+        {"text": text, "blocks": blocks}, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    (channel, ts) -> hash of the payload last sent to that message.
+
+    update() skips chat_update when the new payload is identical to what Slack
+    already shows. The cache only learns from successful calls; a failed update
+    forgets the pointer so the next render is always sent.
+
+    Also memoizes the teacher DM payload per cover (it only depends on the
+    cover's class/date, which never change), so a notify wave builds it once.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_MAX) -> None:
+        self._max = max_entries
+        self._hashes: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._dm_blocks: OrderedDict[str, list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.skipped = 0
+
+    # ----------------------------
+    # Card/DM diffing
+    # ----------------------------
+    def remember(self, channel: str, ts: str, text: str, blocks: list[dict]) -> None:
+        """
+        Record what a message currently shows (e.g. right after chat_postMessage).
+        """
+        self._store(channel, ts, payload_hash(text, blocks))
+
+    def forget(self, channel: str, ts: str) -> None:
+        with self._lock:
+            self._hashes.pop((channel, ts), None)
+
+    def update(
+        self, client, channel: str, ts: str, text: str, blocks: list[dict]
+    ) -> bool:
+        """
+        chat_update unless the payload is unchanged. Returns True if sent.
+        """
+        digest = payload_hash(text, blocks)
+        with self._lock:
+            if self._hashes.get((channel, ts)) == digest:
+                self._hashes.move_to_end((channel, ts))
+                self.skipped += 1
+                return False
+
+        try:
+            client.chat_update(channel=channel, ts=ts, text=text, blocks=blocks)
+        except Exception:
+            self.forget(channel, ts)
+            raise
+
+        self._store(channel, ts, digest)
+        with self._lock:
+            self.sent += 1
+        return True
+
+    def _store(self, channel: str, ts: str, digest: str) -> None:
+        with self._lock:
+            self._hashes[(channel, ts)] = digest
+            self._hashes.move_to_end((channel, ts))
+            while len(self._hashes) > self._max:
+                self._hashes.popitem(last=False)
+
+    # ----------------------------
+    # Teacher DM payload
+    # ----------------------------
+    def dm_blocks(self, cover_id: str, build: Callable[[], list[dict]]) -> list[dict]:
+        with self._lock:
+            blocks = self._dm_blocks.get(cover_id)
+            if blocks is not None:
+                self._dm_blocks.move_to_end(cover_id)
+                return blocks
+
+        blocks = build()
+        with self._lock:
+            self._dm_blocks[cover_id] = blocks
+            while len(self._dm_blocks) > self._max:
+                self._dm_blocks.popitem(last=False)
+        return blocks
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "cards_sent": self.sent,
+                "cards_skipped": self.skipped,
+                "tracked_messages": len(self._hashes),
+            }
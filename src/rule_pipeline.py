@@ -0,0 +1,136 @@
+# src/rule_pipeline.py
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from reason_library import Reason
+
+# Re-rank the decide() order after this many decisions
+REORDER_EVERY = 2048
+# Time one decision in this many: two perf_counter calls per rule cost about
+# as much as the cheap rules themselves
+TIME_EVERY = 16
+
+
+@dataclass
+class RuleStats:
+    calls: int = 0
+    rejections: int = 0
+    timed: int = 0  # calls that were timed (a sample of calls)
+    total_s: float = 0.0  # time spent in the timed calls
+
+    def rank(self) -> float:
+        """
+        Expected cost to reach a rejection: mean time / rejection rate.
+        Cheap, selective rules first. Unmeasured rules sort to the front.
+        """
+        if self.calls == 0 or self.timed == 0:
+            return 0.0
+        reject_rate = self.rejections / self.calls
+        return (self.total_s / self.timed) / max(reject_rate, 1e-6)
+
+
+@dataclass
+class Rule:
+    """
+    decide(*args) -> True if the pair passes. explain(*args) -> the Reasons it
+    fails with ([] = passes). Both take the pipeline's arguments.
+    """
+
+    name: str
+    decide: Callable[..., bool]
+    explain: Callable[..., list[Reason]]
+    stats: RuleStats = field(default_factory=RuleStats)
+
+
+class RulePipeline:
+    """
+    Registered predicates, run two ways:
+
+    - decide(): yes/no, stops at the first failing rule. The order adapts:
+      every REORDER_EVERY decisions rules are re-sorted by measured cost and
+      selectivity (RuleStats.rank). Costs come from one decision in TIME_EVERY.
+    - explain(): every rule, always in registration order, so the reasons come
+      back in a stable order.
+
+    Counters are best-effort under threads (no lock on the hot path).
+    """
+
+    def __init__(
+        self, reorder_every: int = REORDER_EVERY, time_every: int = TIME_EVERY
+    ) -> None:
+        self._rules: list[Rule] = []
+        self._order: tuple[Rule, ...] = ()
+        self.reorder_every = reorder_every
+        self.time_every = time_every
+        self._decisions = 0
+        self._lock = threading.Lock()
+
+    def rule(self, name: str, explain: Callable[..., list[Reason]]) -> Callable:
+        """
+        Decorator: register the decorated predicate as the rule's decide().
+        """
+
+        def register(decide: Callable[..., bool]) -> Callable[..., bool]:
+            self._rules.append(Rule(name, decide, explain))
+            self._order = tuple(self._rules)
+            return decide
+
+        return register
+
+    def decide(self, *args) -> bool:
+        self._decisions += 1
+        if self._decisions % self.reorder_every == 0:
+            self.reorder()
+
+        if self._decisions % self.time_every:
+            for r in self._order:
+                st = r.stats
+                st.calls += 1
+                if not r.decide(*args):
+                    st.rejections += 1
+                    return False
+            return True
+
+        for r in self._order:
+            t0 = time.perf_counter()
+            ok = r.decide(*args)
+            st = r.stats
+            st.total_s += time.perf_counter() - t0
+            st.timed += 1
+            st.calls += 1
+            if not ok:
+                st.rejections += 1
+                return False
+        return True
+
+    def explain(self, *args) -> list[Reason]:
+        reasons: list[Reason] = []
+        for r in self._rules:
+            reasons += r.explain(*args)
+        return reasons
+
+    def reorder(self) -> None:
+        with self._lock:
+            self._order = tuple(sorted(self._rules, key=lambda r: r.stats.rank()))
+
+    @property
+    def order(self) -> list[str]:
+        return [r.name for r in self._order]
+
+    def metrics(self) -> dict:
+        return {
+            "order": self.order,
+            "decisions": self._decisions,
+            "rules": {
+                r.name: {
+                    "calls": r.stats.calls,
+                    "rejections": r.stats.rejections,
+                    "total_ms": round(r.stats.total_s * 1000, 2),
+                }
+                for r in self._rules
+            },
+        }
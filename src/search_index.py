@@ -0,0 +1,135 @@
+# src/search_index.py
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+from models import ClassSession, Teacher
+
+_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(s: str) -> str:
+    return s.strip().lower()
+
+
+def tokenize(s: str) -> list[str]:
+    return [t for t in _SPLIT.split(normalize(s)) if t]
+
+
+def trigrams(s: str) -> set[str]:
+    return {s[i : i + 3] for i in range(len(s) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.ids: set[str] = set()  # every item with a token under this prefix
+
+
+class SearchIndex:
+    """
+    Typeahead index for external_select pickers (built once at startup).
+
+    - prefix trie over tokens (and whole fields), so "par" / "jo sm" hit fast
+    - trigram postings over whole fields for substring queries ("11-mo");
+      1-2 character substrings fall back to a scan
+    Ranking: exact id, then every query term is a token prefix, then substring.
+    Ties keep the order items were added in.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode()
+        self._grams: dict[str, set[str]] = {}
+        self._haystack: dict[str, str] = {}
+        self._order: dict[str, int] = {}
+        self._by_norm_id: dict[str, str] = {}
+
+    def add(self, item_id: str, fields: Iterable[str]) -> None:
+        fields = [normalize(f) for f in fields if f]
+        self._order.setdefault(item_id, len(self._order))
+        self._by_norm_id[normalize(item_id)] = item_id
+        self._haystack[item_id] = "\n".join(fields)
+
+        for f in fields:
+            for token in {f, *tokenize(f)}:
+                node = self._root
+                for ch in token:
+                    node = node.children.setdefault(ch, _TrieNode())
+                    node.ids.add(item_id)
+            for g in trigrams(f):
+                self._grams.setdefault(g, set()).add(item_id)
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def _prefixed(self, prefix: str) -> set[str]:
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.ids
+
+    def _substring(self, q: str) -> set[str]:
+        grams = trigrams(q)
+        if not grams:
+            # 1-2 characters have no trigram: scan (short queries are rare)
+            return {i for i, text in self._haystack.items() if q in text}
+        postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        # Trigrams over-match (order isn't checked): confirm on the text
+        return {i for i in candidates if q in self._haystack[i]}
+
+    def search(self, query: str, limit: int = 100) -> list[str]:
+        q = normalize(query)
+        if not q:
+            return sorted(self._order, key=self._order.__getitem__)[:limit]
+
+        ranked: list[str] = []
+        seen: set[str] = set()
+
+        def take(ids: Iterable[str]) -> bool:
+            for i in sorted(ids, key=self._order.__getitem__):
+                if i not in seen:
+                    seen.add(i)
+                    ranked.append(i)
+                    if len(ranked) >= limit:
+                        return True
+            return False
+
+        exact = self._by_norm_id.get(q)
+        if exact is not None and take([exact]):
+            return ranked
+
+        terms = tokenize(q) or [q]
+        hits = self._prefixed(terms[0])
+        for t in terms[1:]:
+            if not hits:
+                break
+            hits = hits & self._prefixed(t)
+        # The raw query as one prefix too (e.g. "par-mat" against the whole class id)
+        if take(hits | self._prefixed(q)):
+            return ranked
+
+        take(self._substring(q))
+        return ranked
+
+
+# ----------------------------
+# Builders
+# ----------------------------
+def teacher_search_index(teachers_by_id: dict[str, Teacher]) -> SearchIndex:
+    idx = SearchIndex()
+    for t in sorted(teachers_by_id.values(), key=lambda t: t.full_name.lower()):
+        idx.add(t.teacher_id, [t.teacher_id, t.full_name])
+    return idx
+
+
+def class_search_index(classes_by_id: dict[str, ClassSession]) -> SearchIndex:
+    idx = SearchIndex()
+    for c in sorted(classes_by_id.values(), key=lambda c: c.class_id):
+        idx.add(c.class_id, [c.class_id, c.class_name])
+    return idx
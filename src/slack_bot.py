@@ -3,41 +3,80 @@ from __future__ import annotations
 
 import os
 import json
-from datetime import datetime, timezone
+import threading
+import time
+from functools import partial
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any
+from typing import Callable
 
 from dotenv import load_dotenv
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
+from slack_sdk.errors import SlackApiError
 
-from cover_time import materialize_for_cover_date
+from cover_time import SYDNEY_TZ, materialize_for_cover_date, week_start
 from csv_loader import load_validated_frames, teachers_from_df, classes_from_df
-from db import get_con, init_db
+from db import DB_PATH, SQL_STATS, get_con, init_db
 
+from cover_models import CoverRequest
+from models import ClassSession, Teacher
 from cover_store import CoverStore
-from cover_repo import insert_cover, get_cover, fill_cover
+from cover_context import CoverContext
+from recommendation_cache import RecommendationCache
+from cover_repo import (
+    insert_cover,
+    fill_cover,
+    expire_past_open_covers,
+    list_cover_keys_between,
+)
 
-from recommendations_engine import get_recommendations_for_cover
 from time_fmt import fmt_local_range
 
 from accept_service import attempt_accept
-
-from indexes import (
-    index_regular_classes_by_teacher,
-    index_filled_cover_classes_by_teacher,
-    merge_busy_maps,
+from assignment_solver import solve_assignment
+from what_if import WhatIf, WhatIfReport
+from algorithm import ELIGIBILITY, clash_reasons, top_k
+
+from cover_message_repo import (
+    upsert_cover_message,
+    get_cover_message,
+    get_cover_messages,
 )
-
-from cover_message_repo import upsert_cover_message, get_cover_message
 from cover_dm_repo import (
     upsert_dm,
-    set_status,
-    list_dms_for_cover,
-    list_declined_teacher_ids,
+    upsert_dms,
+    set_statuses,
+    list_dms_for_covers,
+    expire_notified_dms,
+    repoint_dms,
+)
+from archive_repo import archive_closed_covers
+from slack_fanout import fan_out, gather
+from slack_io import PRIORITY_BULK, PRIORITY_CARDS, PRIORITY_URGENT, SlackIO
+from dm_channel_store import DmChannelStore
+from card_updater import ADMIN, PUBLIC, CardUpdater
+from render_cache import RenderCache
+from job_queue import JobQueue
+from job_repo import count_jobs_by_status, purge_finished_jobs
+from action_guard import ActionClaim, ActionGuard
+from action_repo import purge_expired_actions
+from week_load_repo import backfill_week_loads
+from week_load_store import WeekLoadStore
+from digest_repo import upsert_digests
+from digest_store import DigestStore
+from teacher_cover_index import TeacherCoverIndex
+from board_repo import delete_board_pages_from, list_board_pages, upsert_board_page
+from absence_repo import (
+    get_absence_panel,
+    insert_absence_panel,
+    list_panels_for_covers,
 )
+from cover_board import BoardKey, CoverBoardIndex
 
-from reason_library import match_reasons
+from reason_library import Reason, match_reason, match_reasons
+from search_index import class_search_index, teacher_search_index
+from indexes import index_regular_classes_by_teacher, regular_class_dates
 
 load_dotenv()
 
@@ -51,6 +90,13 @@ teachers_df, classes_df = load_validated_frames(ASSETS_DIR)
 TEACHERS_BY_ID = teachers_from_df(teachers_df)
 CLASSES_BY_ID = classes_from_df(classes_df)
 
+# Typeahead indexes for the external_select pickers
+TEACHER_SEARCH = teacher_search_index(TEACHERS_BY_ID)
+CLASS_SEARCH = class_search_index(CLASSES_BY_ID)
+
+# teacher_id -> their regular (timetabled) classes, for absence entry
+REGULAR_BY_TEACHER = index_regular_classes_by_teacher(CLASSES_BY_ID)
+
 TEACHER_ID_BY_SLACK = {
     t.slack_user_id: t.teacher_id for t in TEACHERS_BY_ID.values() if t.slack_user_id
 }
@@ -63,8 +109,77 @@ COORDINATOR_SLACK_IDS = {
 COORDINATOR_CHANNEL_ID = os.environ.get("COORDINATOR_CHANNEL_ID", "").strip()
 PUBLIC_COVERS_CHANNEL_ID = os.environ["PUBLIC_COVERS_CHANNEL_ID"].strip()
 
+# "sync" (default): Bolt App + SocketModeHandler thread pool
+# "async": AsyncApp on one event loop; see async_runtime.py (needs aiohttp)
+BOT_RUNTIME = os.environ.get("BOT_RUNTIME", "sync").strip().lower()
+
+# DIGEST_MODE=1: one DM per teacher listing all their covers, instead of one per cover
+DIGEST_MODE = os.environ.get("DIGEST_MODE", "0").strip() == "1"
+
+# BOARD_MODE=1: one pinned board per week per campus instead of a public card per cover
+BOARD_MODE = os.environ.get("BOARD_MODE", "0").strip() == "1"
+
 app = App(token=os.environ["SLACK_BOT_TOKEN"])
 
+# Every listener, in registration order: (kind, constraint, fn).
+# The sync App gets them directly; the async runtime re-registers the same functions.
+ROUTES: list[tuple[str, str, Callable]] = []
+
+
+def on(kind: str, constraint: str) -> Callable[[Callable], Callable]:
+    """
+    @on("action", "accept_cover") == @app.action("accept_cover") + recorded in ROUTES.
+    kind: "action" | "command" | "options" | "view"
+    """
+
+    def register(fn: Callable) -> Callable:
+        getattr(app, kind)(constraint)(fn)
+        ROUTES.append((kind, constraint, fn))
+        return fn
+
+    return register
+
+
+# All Web API writes go through SlackIO (rate limits, 429 retries, priority lanes).
+# Lanes are client-shaped, so helpers that take `client` accept them directly.
+SLACK = SlackIO(app.client)
+URGENT = SLACK.lane(PRIORITY_URGENT)  # accept/decline confirmations, ephemerals
+CARDS = SLACK.lane(PRIORITY_CARDS)  # card refreshes, coordinator posts
+BULK = SLACK.lane(PRIORITY_BULK)  # fan-out DMs, LOST updates, sweeps
+
+# Last payload per (channel, ts): unchanged cards skip chat_update entirely.
+RENDERS = RenderCache()
+
+# Hot cover cache (OPEN + recently FILLED). Loaded once; write-through on insert/fill.
+COVER_STORE = CoverStore.new()
+COVER_STORE.attach(DB_PATH)
+_boot_con = get_con()
+init_db(_boot_con)
+COVER_STORE.load(_boot_con)
+
+# slack_user_id -> IM channel (skips conversations_open on repeat DMs)
+DM_CHANNELS = DmChannelStore()
+DM_CHANNELS.load(_boot_con)
+
+# teacher_id -> their digest DM (DIGEST_MODE)
+DIGESTS = DigestStore()
+DIGESTS.load(_boot_con)
+
+# Weekly cover counts (max_covers_per_week); built from covers once if empty
+if backfill_week_loads(_boot_con):
+    _boot_con.commit()
+_boot_con.close()
+WEEK_LOADS = WeekLoadStore(COVER_STORE)
+
+# Busy map + per-cover recommendations, valid until COVER_STORE.generation moves
+RECS = RecommendationCache(COVER_STORE, TEACHERS_BY_ID, CLASSES_BY_ID, WEEK_LOADS)
+
+# teacher_id -> open covers they can accept; drives digest refreshes
+COVER_INDEX = TeacherCoverIndex(COVER_STORE, RECS)
+
+# (week, campus) -> open covers; drives board refreshes
+BOARD = CoverBoardIndex(COVER_STORE, CLASSES_BY_ID)
+
 
 # ----------------------------
 # Small helpers
@@ -73,29 +188,40 @@ def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
+def cover_ctx(con, cover_id: str) -> CoverContext:
+    """
+    One per handler invocation: cover, session, recs, DM rows are loaded lazily, once.
+    """
+    return CoverContext(
+        con, cover_id, COVER_STORE, TEACHERS_BY_ID, CLASSES_BY_ID, recs=RECS
+    )
+
+
 def is_coordinator(slack_user_id: str) -> bool:
     return slack_user_id in COORDINATOR_SLACK_IDS
 
 
-def codes_to_bullets(codes: list[str]) -> str:
+def codes_to_bullets(codes: list[Reason]) -> str:
     if not codes:
         return "Not eligible."
-    lines = [f"• {match_reasons(c)}" for c in codes]
+    lines = [f"• {r}" for r in match_reasons(codes)]
     return "\n".join(lines)
 
 
-def split_reason_str(reason_str: str) -> list[str]:
-    if not reason_str:
-        return []
-    return reason_str.split("|")
-
-
 def dm_teacher(
     client, slack_user_id: str, text: str, blocks: list[dict]
 ) -> tuple[str, str]:
-    im = client.conversations_open(users=slack_user_id)
-    dm_channel_id = im["channel"]["id"]
-    resp = client.chat_postMessage(channel=dm_channel_id, text=text, blocks=blocks)
+    # client is a SlackLane (rate-limited, 429-aware); safe from fan-out threads
+    dm_channel_id = DM_CHANNELS.channel_for(client, slack_user_id)
+    try:
+        resp = client.chat_postMessage(channel=dm_channel_id, text=text, blocks=blocks)
+    except SlackApiError as e:
+        if e.response.get("error") not in {"channel_not_found", "is_archived"}:
+            raise
+        # Cached IM channel went stale: re-open once
+        DM_CHANNELS.forget(slack_user_id)
+        dm_channel_id = DM_CHANNELS.channel_for(client, slack_user_id)
+        resp = client.chat_postMessage(channel=dm_channel_id, text=text, blocks=blocks)
     return dm_channel_id, resp["ts"]
 
 
@@ -124,30 +250,42 @@ def get_admin_message(con, cover_id: str) -> tuple[str, str] | None:
     return (row[0], row[1]) if row else None
 
 
+def get_admin_messages(con, cover_ids: list[str]) -> dict[str, tuple[str, str]]:
+    if not cover_ids:
+        return {}
+    marks = ",".join("?" * len(cover_ids))
+    cur = con.execute(
+        f"SELECT cover_id, channel_id, message_ts FROM cover_admin_messages WHERE cover_id IN ({marks})",
+        cover_ids,
+    )
+    return {r[0]: (r[1], r[2]) for r in cur.fetchall()}
+
+
 # ----------------------------
 # Blocks
 # ----------------------------
-import json
-from cover_time import materialize_for_cover_date
+PANEL_MAX_RECOMMENDED = 15  # rows in the coordinator panel
+NOTIFY_WAVE_SIZE = 25  # best-ranked teachers considered by "Notify all"
 
 
 def frozen_blocks(text: str) -> list[dict]:
     return [{"type": "section", "text": {"type": "mrkdwn", "text": text}}]
 
 
-def _session_for_cover(cover):
+def teacher_dm_blocks(ctx: CoverContext) -> list[dict]:
     """
-    Always render times using the cover's selected date, not the class template date.
+    DM sent to a teacher about a cover. Built once per cover and reused for
+    every recipient (it doesn't depend on the teacher or on cover status).
     """
-    template = CLASSES_BY_ID[cover.class_id]
-    return materialize_for_cover_date(template, cover.cover_date)
+    return RENDERS.dm_blocks(ctx.cover_id, partial(_build_teacher_dm_blocks, ctx))
 
 
-def teacher_dm_blocks(cover) -> list[dict]:
+def _build_teacher_dm_blocks(ctx: CoverContext) -> list[dict]:
     """
-    DM sent to a teacher about a cover.
+    Times always come from ctx.session (the cover's date, not the template date).
     """
-    c = _session_for_cover(cover)
+    cover = ctx.cover
+    c = ctx.session
     when = fmt_local_range(c.start_at, c.end_at)
 
     return [
@@ -184,17 +322,20 @@ def teacher_dm_blocks(cover) -> list[dict]:
     ]
 
 
-def public_cover_blocks(cover, declined_count: int) -> list[dict]:
+def public_cover_blocks(ctx: CoverContext) -> list[dict]:
     """
     Public cover card visible to everyone.
     """
-    c = _session_for_cover(cover)
+    cover = ctx.cover
+    c = ctx.session
     when = fmt_local_range(c.start_at, c.end_at)
 
     if cover.status == "FILLED" and cover.assigned_teacher_id:
         winner = TEACHERS_BY_ID.get(cover.assigned_teacher_id)
         winner_name = winner.full_name if winner else cover.assigned_teacher_id
         status_line = f"*Status:* FILLED ({winner_name})"
+    elif cover.status == "CANCELLED":
+        status_line = "*Status:* EXPIRED (not filled)"
     else:
         status_line = "*Status:* OPEN"
 
@@ -212,7 +353,7 @@ def public_cover_blocks(cover, declined_count: int) -> list[dict]:
                     f"*Campus:* {c.campus.title()}\n"
                     f"*When:* {when} (Sydney time)\n"
                     f"{status_line}\n"
-                    f"*Declined:* {declined_count}"
+                    f"*Declined:* {len(ctx.declined)}"
                 ),
             },
         },
@@ -237,22 +378,22 @@ def public_cover_blocks(cover, declined_count: int) -> list[dict]:
     return blocks
 
 
-def admin_cover_blocks(
-    cover,
-    recommended_ids: list[str],
-    dm_status_by_teacher: dict[str, str],
-    declined_ids: set[str],
-) -> list[dict]:
+def admin_cover_blocks(ctx: CoverContext) -> list[dict]:
     """
     Coordinator panel (where Notify/Assign controls live).
+    Recommendations are only computed while the cover is OPEN.
     """
-    c = _session_for_cover(cover)
+    cover = ctx.cover
+    c = ctx.session
+    declined_ids = ctx.declined
     when = fmt_local_range(c.start_at, c.end_at)
 
     if cover.status == "FILLED" and cover.assigned_teacher_id:
         winner = TEACHERS_BY_ID.get(cover.assigned_teacher_id)
         winner_name = winner.full_name if winner else cover.assigned_teacher_id
         status_line = f"*Status:* FILLED ({winner_name})"
+    elif cover.status == "CANCELLED":
+        status_line = "*Status:* EXPIRED (not filled)"
     else:
         status_line = "*Status:* OPEN"
 
@@ -280,15 +421,17 @@ def admin_cover_blocks(
         {"type": "divider"},
     ]
 
-    # If filled, keep listing visible but remove controls
+    # If filled/expired, keep listing visible but remove controls
     if cover.status != "OPEN":
+        closed_text = (
+            "This cover expired unfilled. Notifications are closed."
+            if cover.status == "CANCELLED"
+            else "This cover is filled. Notifications are closed."
+        )
         blocks.append(
             {
                 "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "This cover is filled. Notifications are closed.",
-                },
+                "text": {"type": "mrkdwn", "text": closed_text},
             }
         )
         return blocks
@@ -321,6 +464,10 @@ def admin_cover_blocks(
         }
     )
 
+    # Best-scored first (heap top-k)
+    recommended_ids = ctx.recommendations.top(PANEL_MAX_RECOMMENDED)
+    dm_status_by_teacher = ctx.dm_status_by_teacher
+
     if not recommended_ids:
         blocks.append(
             {
@@ -374,7 +521,7 @@ def admin_cover_blocks(
             )
 
         shown += 1
-        if shown >= 15:
+        if shown >= PANEL_MAX_RECOMMENDED:
             break
 
     return blocks
@@ -383,71 +530,524 @@ def admin_cover_blocks(
 # ----------------------------
 # Message updaters
 # ----------------------------
-def update_public_cover_card(client, con, cover_id: str) -> None:
-    cover = get_cover(con, cover_id)
-    if not cover:
+def update_public_cover_card(client, ctx: CoverContext) -> None:
+    if not ctx.cover:
         return
 
-    ptr = get_cover_message(con, cover_id)
+    ptr = get_cover_message(ctx.con, ctx.cover_id)
     if not ptr:
         return
 
-    declined = list_declined_teacher_ids(con, cover_id)
     channel_id, msg_ts = ptr
 
-    client.chat_update(
-        channel=channel_id,
-        ts=msg_ts,
-        text=f"Cover {cover_id}",
-        blocks=public_cover_blocks(cover, declined_count=len(declined)),
+    RENDERS.update(
+        client,
+        channel_id,
+        msg_ts,
+        f"Cover {ctx.cover_id}",
+        public_cover_blocks(ctx),
     )
 
 
-def update_admin_cover_card(client, con, cover_id: str) -> None:
-    cover = get_cover(con, cover_id)
-    if not cover:
+def update_admin_cover_card(client, ctx: CoverContext) -> None:
+    if not ctx.cover:
         return
 
-    ptr = get_admin_message(con, cover_id)
+    ptr = get_admin_message(ctx.con, ctx.cover_id)
     if not ptr:
         return
 
     channel_id, msg_ts = ptr
 
-    res = get_recommendations_for_cover(con, cover_id, TEACHERS_BY_ID, CLASSES_BY_ID)
-    declined = list_declined_teacher_ids(con, cover_id)
+    RENDERS.update(
+        client,
+        channel_id,
+        msg_ts,
+        f"Coordinator panel {ctx.cover_id}",
+        admin_cover_blocks(ctx),
+    )
+
+
+def _flush_cover_cards(cover_id: str, kinds: set[str]) -> None:
+    """
+    CardUpdater render callback: fresh connection + context, so it draws the
+    latest state rather than whatever the marking handler saw.
+    """
+    con = get_con()
+    try:
+        ctx = cover_ctx(con, cover_id)
+        if PUBLIC in kinds:
+            update_public_cover_card(CARDS, ctx)
+        if ADMIN in kinds:
+            update_admin_cover_card(CARDS, ctx)
+            # The cover's line on any absence panel is coordinator-facing too
+            for panel_id in list_panels_for_covers(con, [cover_id]):
+                ABSENCE_UPDATES.mark_dirty(str(panel_id), public=False)
+    finally:
+        con.close()
+
+
+# Handlers mark covers dirty; at most one public + one admin update per window.
+CARD_UPDATES = CardUpdater(_flush_cover_cards)
+
+# Slow follow-up work (DM fan-out, LOST updates, thread posts); see "Background jobs".
+JOBS = JobQueue()
+
+# Slack redeliveries / double clicks: only the first delivery of an interaction runs.
+ACTIONS = ActionGuard()
+
+
+def first_delivery(body) -> ActionClaim | None:
+    """
+    Claim this interaction. None means it's a duplicate (redelivery or double
+    click): the user has been told the first one's outcome, and the handler
+    must return without DB writes or Slack calls.
+    """
+    claim = ACTIONS.begin(body)
+    if claim.first:
+        return claim
+    print(f"Duplicate interaction {claim.key}; first: {claim.result or 'in progress'}")
+
+    # Tell the clicker what happened to the first one (a double click otherwise
+    # looks like nothing happened)
+    text = (
+        f"Already done: {claim.result}."
+        if claim.result
+        else "Already in progress — hang on."
+    )
+    user_id = body["user"]["id"]
+    try:
+        if body.get("channel"):
+            _feedback(URGENT, body["channel"]["id"], user_id, text)
+        else:
+            # Modal submissions have no channel: the app DM
+            URGENT.chat_postMessage(channel=user_id, text=text)
+    except Exception as e:
+        print("duplicate feedback failed:", e)
+    return None
+
 
-    dm_rows = list_dms_for_cover(con, cover_id)
-    dm_status_by_teacher = {r["teacher_id"]: r["status"] for r in dm_rows}
+def record_result(body, claim: ActionClaim, result: str) -> None:
+    ACTIONS.finish(body, claim.key, result)
+
+
+def close_lost_dms(
+    client, ctx: CoverContext, winner_id: str, winner_name: str
+) -> list[str]:
+    """
+    After a fill: freeze every other teacher's DM ("cover filled") concurrently,
+    then persist all LOST statuses with one executemany + commit.
+    Returns teacher_ids whose chat_update failed (their status is still LOST).
+    """
+    losers = [
+        r
+        for r in ctx.dm_rows
+        if r["teacher_id"] != winner_id and r["status"] not in {"DECLINED", "LOST"}
+    ]
+    if not losers:
+        return []
 
-    client.chat_update(
-        channel=channel_id,
-        ts=msg_ts,
-        text=f"Coordinator panel {cover_id}",
-        blocks=admin_cover_blocks(
-            cover, res.recommended, dm_status_by_teacher, declined
-        ),
+    # Digest DMs list other covers too: refresh_digests re-renders those instead
+    frozen = [
+        r for r in losers if not DIGESTS.is_digest(r["dm_channel_id"], r["dm_ts"])
+    ]
+    blocks = frozen_blocks(f"Cover `{ctx.cover_id}` has been filled ({winner_name}).")
+    results = gather(
+        [
+            client.submit(
+                "chat_update",
+                channel=r["dm_channel_id"],
+                ts=r["dm_ts"],
+                text="Cover filled",
+                blocks=blocks,
+            )
+            for r in frozen
+        ]
     )
 
+    ts = utc_now_iso()
+    set_statuses(ctx.con, [("LOST", ts, ctx.cover_id, r["teacher_id"]) for r in losers])
+    ctx.con.commit()
+    ctx.invalidate_dms()
+
+    failed = []
+    for r, (_res, err) in zip(frozen, results):
+        if err is not None:
+            print(
+                f"cover {ctx.cover_id}: LOST update for {r['teacher_id']} failed:", err
+            )
+            failed.append(r["teacher_id"])
+    return failed
+
+
+def lost_failures_note(failed: list[str]) -> str:
+    if not failed:
+        return ""
+    return f"\n⚠️ Could not update {len(failed)} DM(s): {', '.join(failed)}"
+
+
+# ----------------------------
+# Digest DMs (DIGEST_MODE): one message per teacher, edited in place
+# ----------------------------
+DIGEST_MAX_COVERS = 20  # one section per cover; Block Kit caps at 50
+
+
+def digest_blocks(sessions: list[tuple[str, ClassSession]]) -> list[dict]:
+    """
+    sessions: (cover_id, session) the teacher can accept, soonest first.
+    """
+    if not sessions:
+        return frozen_blocks("No open covers for you right now.")
+
+    blocks: list[dict] = [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": f"*Covers you can take* ({len(sessions)})",
+            },
+        },
+        {"type": "divider"},
+    ]
+    for cover_id, c in sessions[:DIGEST_MAX_COVERS]:
+        blocks.append(
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": (
+                        f"`{c.class_id}` · {c.campus.title()}\n"
+                        f"{fmt_local_range(c.start_at, c.end_at)} (Sydney time)"
+                    ),
+                },
+                "accessory": {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "Accept"},
+                    "style": "primary",
+                    "action_id": "accept_cover",
+                    "value": json.dumps({"cover_id": cover_id}),
+                },
+            }
+        )
+    if len(sessions) > DIGEST_MAX_COVERS:
+        more = len(sessions) - DIGEST_MAX_COVERS
+        blocks.append(
+            {
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"…and {more} later covers."}],
+            }
+        )
+    return blocks
+
+
+def _digest_sessions(
+    con, teacher_ids: list[str]
+) -> dict[str, list[tuple[str, ClassSession]]]:
+    """
+    Each teacher's eligible open covers (COVER_INDEX) minus any they declined.
+    """
+    open_ids = [c.cover_id for c in COVER_STORE.list_open(con)]
+    declined = {
+        (r["cover_id"], r["teacher_id"])
+        for r in list_dms_for_covers(con, open_ids)
+        if r["status"] == "DECLINED"
+    }
+
+    sessions: dict[str, ClassSession] = {}
+    out: dict[str, list[tuple[str, ClassSession]]] = {}
+    for tid in teacher_ids:
+        rows = []
+        for cover_id in COVER_INDEX.covers_for(con, tid):
+            if (cover_id, tid) in declined:
+                continue
+            c = sessions.get(cover_id)
+            if c is None:
+                cover = COVER_STORE.get(con, cover_id)
+                template = CLASSES_BY_ID.get(cover.class_id) if cover else None
+                if template is None:
+                    continue
+                c = sessions[cover_id] = materialize_for_cover_date(
+                    template, cover.cover_date
+                )
+            rows.append((cover_id, c))
+        rows.sort(key=lambda row: row[1].start_at)
+        out[tid] = rows
+    return out
+
+
+def send_digests(
+    con, teachers: list[Teacher], fresh: bool = False
+) -> list[tuple[tuple[str, str] | None, Exception | None]]:
+    """
+    Post or edit each teacher's digest (concurrently). Returns
+    [((dm_channel_id, dm_ts), None) | (None, exc)] in teacher order.
+    fresh=True (Notify) posts a new digest, so the teacher gets a ping, and
+    deletes the old one; otherwise the existing digest is edited in place.
+    New digest pointers are persisted with one batched write + commit.
+    """
+    sessions = _digest_sessions(con, [t.teacher_id for t in teachers])
+
+    def send(t: Teacher) -> tuple[str, str]:
+        rows = sessions[t.teacher_id]
+        text = f"Covers you can take ({len(rows)})"
+        blocks = digest_blocks(rows)
+        old = DIGESTS.get(t.teacher_id)
+        if old is not None and not fresh:
+            try:
+                RENDERS.update(BULK, *old, text, blocks)
+                return old
+            except SlackApiError as e:
+                # Deleted by the teacher (or stale IM): start a new digest
+                if e.response.get("error") not in {
+                    "message_not_found",
+                    "channel_not_found",
+                    "is_archived",
+                }:
+                    raise
+        ptr = dm_teacher(BULK, t.slack_user_id, text, blocks)
+        RENDERS.remember(*ptr, text, blocks)
+        if old is not None and fresh:
+            # Retire the previous digest: one live list per teacher
+            try:
+                BULK.chat_delete(channel=old[0], ts=old[1])
+            except SlackApiError as e:
+                print(f"digest delete for {t.teacher_id} failed:", e)
+            RENDERS.forget(*old)
+        return ptr
+
+    results = fan_out([partial(send, t) for t in teachers])
+
+    ts = utc_now_iso()
+    moved = [
+        (t.teacher_id, *ptr, ts)
+        for t, (ptr, err) in zip(teachers, results)
+        if err is None and ptr != DIGESTS.get(t.teacher_id)
+    ]
+    if moved:
+        upsert_digests(con, moved)
+        # DM rows pointing at a replaced digest follow it
+        repoint_dms(
+            con,
+            [
+                (ch, dm_ts, ts, *DIGESTS.get(tid))
+                for tid, ch, dm_ts, _ts in moved
+                if DIGESTS.get(tid) is not None
+            ],
+        )
+        con.commit()
+        for tid, ch, dm_ts, _ts in moved:
+            DIGESTS.put(tid, ch, dm_ts)
+    return results
+
+
+def refresh_digests(con) -> None:
+    """
+    Re-render only the digests whose teacher's eligible covers changed (fills,
+    new or expired covers). Teachers without a digest are left alone; Notify
+    starts one.
+    """
+    if not DIGEST_MODE:
+        return
 
-def update_all_cover_cards(client, con, cover_id: str) -> None:
-    update_public_cover_card(client, con, cover_id)
-    update_admin_cover_card(client, con, cover_id)
+    COVER_INDEX.sync(con)
+    changed = COVER_INDEX.take_changed() & DIGESTS.teachers()
+    teachers = [
+        TEACHERS_BY_ID[tid]
+        for tid in sorted(changed)
+        if tid in TEACHERS_BY_ID and TEACHERS_BY_ID[tid].slack_user_id
+    ]
+    for t, (_ptr, err) in zip(teachers, send_digests(con, teachers)):
+        if err is not None:
+            print(f"digest update for {t.teacher_id} failed:", err)
 
 
 # ----------------------------
-# Busy map (regular + filled covers)
+# Public board (BOARD_MODE): one pinned message per week per campus
 # ----------------------------
-def build_busy_map(con) -> dict[str, list[Any]]:
-    regular_map = index_regular_classes_by_teacher(CLASSES_BY_ID)
-    filled_map = index_filled_cover_classes_by_teacher(con, CLASSES_BY_ID)
-    return merge_busy_maps(regular_map, filled_map)
+BOARD_PAGE_SIZE = (
+    45  # covers per message: one section each + header/footer <= 50 blocks
+)
+
+# One refresher at a time, so an older render can't land after a newer one
+_BOARD_LOCK = threading.Lock()
+
+
+def board_title(key: BoardKey) -> str:
+    wk, campus = key
+    return f"Open covers — {campus.title()}, week of {wk}"
+
+
+def board_blocks(
+    key: BoardKey, rows: list[tuple[str, ClassSession]], page: int, pages: int
+) -> list[dict]:
+    title = board_title(key)
+    if pages > 1:
+        title += f" ({page + 1}/{pages})"
+    blocks: list[dict] = [
+        {"type": "header", "text": {"type": "plain_text", "text": title}}
+    ]
+    if not rows:
+        blocks.append(
+            {"type": "section", "text": {"type": "mrkdwn", "text": "No open covers."}}
+        )
+        return blocks
+
+    for cover_id, c in rows:
+        blocks.append(
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": (
+                        f"`{c.class_id}` · {fmt_local_range(c.start_at, c.end_at)}"
+                    ),
+                },
+                "accessory": {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "Accept"},
+                    "style": "primary",
+                    "action_id": "accept_cover",
+                    "value": json.dumps({"cover_id": cover_id}),
+                },
+            }
+        )
+    if page == 0 and pages > 1:
+        blocks.append(
+            {
+                "type": "context",
+                "elements": [
+                    {"type": "mrkdwn", "text": "More covers in the thread below."}
+                ],
+            }
+        )
+    return blocks
+
+
+def _delete_board_messages(ptrs: list[tuple[str, str]]) -> None:
+    for channel_id, ts in ptrs:
+        try:
+            CARDS.chat_delete(channel=channel_id, ts=ts)
+        except SlackApiError as e:
+            if e.response.get("error") != "message_not_found":
+                raise
+        RENDERS.forget(channel_id, ts)
+
+
+def _render_board(con, key: BoardKey, ptrs: list[tuple[str, str]]) -> None:
+    """
+    Page 0 is posted once and pinned; overflow pages live in its thread and
+    are deleted once the board shrinks. Unchanged pages skip chat_update.
+    A page deleted in Slack is reposted (all of them, if it was page 0).
+    """
+    rows = BOARD.rows(key)
+    if not rows and not ptrs:
+        return
+    wk, campus = key
+    text = board_title(key)
+
+    chunks = [
+        rows[i : i + BOARD_PAGE_SIZE] for i in range(0, len(rows), BOARD_PAGE_SIZE)
+    ] or [[]]
+
+    def post(page: int, blocks: list[dict]) -> tuple[str, str]:
+        if page == 0:
+            posted = CARDS.chat_postMessage(
+                channel=PUBLIC_COVERS_CHANNEL_ID, text=text, blocks=blocks
+            )
+            try:
+                CARDS.pins_add(channel=posted["channel"], timestamp=posted["ts"])
+            except SlackApiError as e:
+                print(f"board {key}: pin failed:", e)
+        else:
+            root_channel, root_ts = ptrs[0]
+            posted = CARDS.chat_postMessage(
+                channel=root_channel, thread_ts=root_ts, text=text, blocks=blocks
+            )
+        upsert_board_page(con, wk, campus, page, posted["channel"], posted["ts"])
+        RENDERS.remember(posted["channel"], posted["ts"], text, blocks)
+        return posted["channel"], posted["ts"]
+
+    ptrs = list(ptrs)
+    for page, chunk in enumerate(chunks):
+        blocks = board_blocks(key, chunk, page, len(chunks))
+        if page < len(ptrs):
+            try:
+                RENDERS.update(CARDS, *ptrs[page], text, blocks)
+                continue
+            except SlackApiError as e:
+                if e.response.get("error") != "message_not_found":
+                    raise
+            # Deleted in Slack: drop the pointer and repost
+            RENDERS.forget(*ptrs[page])
+            if page > 0:
+                ptrs[page] = post(page, blocks)
+                continue
+            # Overflow pages hang off page 0's thread: start the board over
+            _delete_board_messages(ptrs[1:])
+            delete_board_pages_from(con, wk, campus, 0)
+            ptrs = []
+        ptrs.append(post(page, blocks))
+
+    if len(ptrs) > len(chunks):
+        _delete_board_messages(ptrs[len(chunks) :])
+        delete_board_pages_from(con, wk, campus, len(chunks))
+    con.commit()
+
+
+def _retire_board(con, key: BoardKey, ptrs: list[tuple[str, str]]) -> None:
+    """
+    A past week's board: unpin it, delete its pages and forget them.
+    """
+    wk, campus = key
+    if ptrs:
+        try:
+            CARDS.pins_remove(channel=ptrs[0][0], timestamp=ptrs[0][1])
+        except SlackApiError as e:
+            if e.response.get("error") not in {"no_pin", "message_not_found"}:
+                print(f"board {key}: unpin failed:", e)
+        # Thread pages first, then the pinned root
+        _delete_board_messages(ptrs[1:] + ptrs[:1])
+    delete_board_pages_from(con, wk, campus, 0)
+    con.commit()
+
+
+def refresh_boards(con) -> None:
+    """
+    Re-render only the boards that gained or lost a cover since the last
+    refresh, and retire boards of past weeks. A board that fails to update is
+    re-queued for the next one.
+    """
+    if not BOARD_MODE:
+        return
+
+    with _BOARD_LOCK:
+        BOARD.sync(con)
+        changed = BOARD.take_changed()
+        ptrs = list_board_pages(con)
+        this_week = week_start(datetime.now(SYDNEY_TZ).date().isoformat())
+
+        for key in sorted(k for k in ptrs if k[0] < this_week):
+            try:
+                _retire_board(con, key, ptrs[key])
+            except Exception as e:
+                # Don't leave a half-written transaction (and its lock) open
+                con.rollback()
+                print(f"board {key} retire failed:", e)
+        changed = {k for k in changed if k[0] >= this_week}
+
+        for key in sorted(changed):
+            try:
+                _render_board(con, key, ptrs.get(key, []))
+            except Exception as e:
+                con.rollback()
+                print(f"board {key} update failed:", e)
+                BOARD.mark(key)
 
 
 # ----------------------------
 # Commands
 # ----------------------------
-@app.command("/cover-create")
+@on("command", "/cover-create")
 def cover_create(ack, command, client, respond):
     ack()
 
@@ -496,112 +1096,634 @@ def cover_create(ack, command, client, respond):
     respond("Opening cover creator…")
 
 
-# ----------------------------
-# Notify actions (coordinator only)
-# ----------------------------
-@app.action("notify_teacher")
-def notify_teacher_action(ack, body, client):
+@on("command", "/cover-sqlstats")
+def cover_sqlstats(ack, command, respond):
+    """
+    Dump per-statement SQL stats (only populated when SQL_STATS=1).
+    Pass "reset" to clear the counters after dumping.
+    """
     ack()
 
-    if not is_coordinator(body["user"]["id"]):
-        _safe_feedback(client, body, "Not authorised.")
+    if not is_coordinator(command["user_id"]):
+        respond("Not authorised.")
         return
 
-    payload = json.loads(body["actions"][0]["value"])
-    cover_id = payload["cover_id"]
-    teacher_id = payload["teacher_id"]
+    if not SQL_STATS.enabled:
+        respond("SQL stats are off. Start the bot with SQL_STATS=1.")
+        return
 
-    con = get_con()
-    init_db(con)
+    respond(f"```{SQL_STATS.summary()}```")
+    if (command.get("text") or "").strip() == "reset":
+        SQL_STATS.reset()
 
-    cover = get_cover(con, cover_id)
-    if not cover:
-        _safe_feedback(client, body, "Cover not found.")
-        return
-    if cover.status != "OPEN":
-        _safe_feedback(client, body, "Cover is already filled.")
-        update_all_cover_cards(client, con, cover_id)
-        return
 
-    t = TEACHERS_BY_ID.get(teacher_id)
-    if not t or not t.slack_user_id:
-        _safe_feedback(client, body, "Teacher has no Slack user linked.")
-        return
+@on("command", "/cover-slackstats")
+def cover_slackstats(ack, command, respond):
+    """
+    SlackIO metrics: queue depth per lane, calls/errors per method, throttling,
+    plus card updates sent vs skipped as unchanged, background jobs by status and
+    per-rule eligibility counters (calls / rejections / time, current order).
+    """
+    ack()
 
-    c = CLASSES_BY_ID[cover.class_id]
-    blocks = teacher_dm_blocks(cover_id, c)
+    if not is_coordinator(command["user_id"]):
+        respond("Not authorised.")
+        return
 
-    dm_channel_id, dm_ts = dm_teacher(
-        client, t.slack_user_id, f"Cover {cover_id}", blocks
-    )
-    upsert_dm(
-        con, cover_id, teacher_id, dm_channel_id, dm_ts, "NOTIFIED", utc_now_iso()
-    )
-    con.commit()
+    con = get_con()
+    try:
+        init_db(con)
+        jobs = count_jobs_by_status(con)
+    finally:
+        con.close()
+    metrics = {
+        **SLACK.metrics(),
+        "renders": RENDERS.metrics(),
+        "jobs": jobs,
+        "duplicate_interactions": ACTIONS.duplicates,
+        "eligibility_rules": ELIGIBILITY.metrics(),
+    }
+    respond(f"```{json.dumps(metrics, indent=2)}```")
 
-    # Update the panel (this keeps it visible)
-    update_admin_cover_card(client, con, cover_id)
 
-    # Confirmation that does NOT replace the panel
-    _safe_feedback(client, body, f"Notification sent to {t.full_name}.")
+SOLVE_MAX_LINES = 60
 
 
-@app.action("notify_all")
-def notify_all_action(ack, body, client):
+@on("command", "/cover-solve")
+def cover_solve(ack, command, respond):
+    """
+    Proposal only: jointly assign every OPEN cover (assignment_solver) so as many
+    as possible get a teacher, best-ranked first, within clashes and weekly caps.
+    Nothing is written; the coordinator applies it with Manual assign.
+    """
     ack()
 
-    if not is_coordinator(body["user"]["id"]):
-        _safe_feedback(client, body, "Not authorised.")
+    if not is_coordinator(command["user_id"]):
+        respond("Not authorised.")
         return
 
-    cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
-
     con = get_con()
-    init_db(con)
+    try:
+        init_db(con)
+        covers = COVER_STORE.list_open(con)
+        if not covers:
+            respond("No open covers.")
+            return
 
-    cover = get_cover(con, cover_id)
-    if not cover:
-        _safe_feedback(client, body, "Cover not found.")
-        return
-    if cover.status != "OPEN":
-        _safe_feedback(client, body, "Cover is already filled.")
-        update_all_cover_cards(client, con, cover_id)
-        return
+        declined = {
+            (r["cover_id"], r["teacher_id"])
+            for r in list_dms_for_covers(con, [c.cover_id for c in covers])
+            if r["status"] == "DECLINED"
+        }
+        weeks = {week_start(c.cover_date) for c in covers}
+
+        t0 = time.perf_counter()
+        proposal = solve_assignment(
+            covers,
+            TEACHERS_BY_ID,
+            CLASSES_BY_ID,
+            RECS.busy_map(con),
+            {wk: WEEK_LOADS.week(con, wk) for wk in weeks},
+            declined,
+        )
+        elapsed = time.perf_counter() - t0
+    finally:
+        con.close()
 
-    res = get_recommendations_for_cover(con, cover_id, TEACHERS_BY_ID, CLASSES_BY_ID)
-    declined = list_declined_teacher_ids(con, cover_id)
-    existing = {r["teacher_id"]: r["status"] for r in list_dms_for_cover(con, cover_id)}
+    lines = [
+        f"*Assignment proposal* — {len(proposal.assignments)}/{len(covers)} open "
+        f"covers filled ({elapsed:.1f}s). Nothing has been assigned yet."
+    ]
+    if proposal.ceiling > len(proposal.assignments):
+        lines.append(
+            "Search stopped early: up to "
+            f"{proposal.ceiling - len(proposal.assignments)} more might fit."
+        )
+    flagged = set(proposal.travel_flagged)
+    rows = sorted(covers, key=lambda c: (c.cover_date, c.cover_id))
+    for cover in rows[:SOLVE_MAX_LINES]:
+        template = CLASSES_BY_ID.get(cover.class_id)
+        when = cover.cover_date
+        if template is not None:
+            try:
+                c = materialize_for_cover_date(template, cover.cover_date)
+                when = fmt_local_range(c.start_at, c.end_at)
+            except ValueError:
+                pass
 
-    c = CLASSES_BY_ID[cover.class_id]
-    ts = utc_now_iso()
+        tid = proposal.assignments.get(cover.cover_id)
+        if tid is None:
+            who = "_no teacher available_"
+        else:
+            t = TEACHERS_BY_ID[tid]
+            who = f"{t.full_name} ({tid})"
+            if cover.cover_id in flagged:
+                who += " — tight travel gap"
+        lines.append(f"• `{cover.cover_id}` `{cover.class_id}` {when} → {who}")
 
-    sent = 0
-    skipped = 0
+    if len(rows) > SOLVE_MAX_LINES:
+        lines.append(f"…and {len(rows) - SOLVE_MAX_LINES} more.")
+    respond("\n".join(lines))
 
-    for tid in res.recommended[:25]:
-        if tid in declined:
-            skipped += 1
-            continue
-        if existing.get(tid) in {"NOTIFIED", "DECLINED", "ACCEPTED", "LOST"}:
-            skipped += 1
-            continue
 
-        t = TEACHERS_BY_ID.get(tid)
-        if not t or not t.slack_user_id:
-            skipped += 1
-            continue
+# ----------------------------
+# Bulk absence (coordinator): one cover per regular class in a date range
+# ----------------------------
+ABSENCE_MAX_DAYS = 31
+ABSENCE_PANEL_MAX_ROWS = 40  # one section block per cover; Block Kit caps at 50
 
-        blocks = teacher_dm_blocks(cover_id, c)
-        dm_channel_id, dm_ts = dm_teacher(
-            client, t.slack_user_id, f"Cover {cover_id}", blocks
+
+@on("command", "/cover-absence")
+def cover_absence(ack, command, client, respond):
+    ack()
+
+    if not is_coordinator(command["user_id"]):
+        respond("Not authorised.")
+        return
+
+    client.views_open(
+        trigger_id=command["trigger_id"],
+        view={
+            "type": "modal",
+            "callback_id": "absence_modal",
+            "title": {"type": "plain_text", "text": "Teacher absence"},
+            "submit": {"type": "plain_text", "text": "Create covers"},
+            "close": {"type": "plain_text", "text": "Cancel"},
+            "blocks": [
+                {
+                    "type": "input",
+                    "block_id": "absence_teacher",
+                    "label": {"type": "plain_text", "text": "Absent teacher"},
+                    "element": {
+                        "type": "external_select",
+                        "action_id": "absence_teacher_select",
+                        "placeholder": {
+                            "type": "plain_text",
+                            "text": "Search by name or ID",
+                        },
+                        "min_query_length": 0,
+                    },
+                },
+                {
+                    "type": "input",
+                    "block_id": "absence_start",
+                    "label": {"type": "plain_text", "text": "First day away"},
+                    "element": {
+                        "type": "datepicker",
+                        "action_id": "absence_start_select",
+                        "placeholder": {"type": "plain_text", "text": "Select date"},
+                    },
+                },
+                {
+                    "type": "input",
+                    "block_id": "absence_end",
+                    "label": {"type": "plain_text", "text": "Last day away"},
+                    "element": {
+                        "type": "datepicker",
+                        "action_id": "absence_end_select",
+                        "placeholder": {"type": "plain_text", "text": "Select date"},
+                    },
+                },
+            ],
+        },
+    )
+
+    respond("Opening absence entry…")
+
+
+@on("options", "absence_teacher_select")
+def absence_teacher_options(ack, body):
+    # Only teachers who actually have regular classes to cover
+    q = body.get("value") or ""
+
+    options = []
+    for tid in TEACHER_SEARCH.search(q, limit=len(TEACHERS_BY_ID)):
+        classes = REGULAR_BY_TEACHER.get(tid)
+        if not classes:
+            continue
+        t = TEACHERS_BY_ID[tid]
+        options.append(
+            {
+                "text": {
+                    "type": "plain_text",
+                    "text": option_text(
+                        f"{t.full_name} ({tid})", f"{len(classes)} classes/week"
+                    ),
+                },
+                "value": tid,
+            }
         )
-        upsert_dm(con, cover_id, tid, dm_channel_id, dm_ts, "NOTIFIED", ts)
-        sent += 1
+        if len(options) == 100:
+            break
 
-    con.commit()
-    update_admin_cover_card(client, con, cover_id)
+    ack(options=options)
+
+
+@on("view", "absence_modal")
+def absence_modal_submit(ack, body, client, view):
+    state = view["state"]["values"]
+    teacher_id = state["absence_teacher"]["absence_teacher_select"]["selected_option"][
+        "value"
+    ]
+    start = date.fromisoformat(
+        state["absence_start"]["absence_start_select"]["selected_date"]
+    )
+    end = date.fromisoformat(
+        state["absence_end"]["absence_end_select"]["selected_date"]
+    )
+
+    # Range errors go back into the modal
+    if end < start:
+        ack(
+            response_action="errors",
+            errors={"absence_end": "Last day is before the first day."},
+        )
+        return
+    if (end - start).days >= ABSENCE_MAX_DAYS:
+        ack(
+            response_action="errors",
+            errors={"absence_end": f"At most {ABSENCE_MAX_DAYS} days at a time."},
+        )
+        return
+
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
+
+    result = "failed"
+    try:
+        creator = body["user"]["id"]
+        if not is_coordinator(creator):
+            result = "not authorised"
+            return
+
+        wanted = regular_class_dates(REGULAR_BY_TEACHER.get(teacher_id, []), start, end)
+
+        # All covers in one transaction; skip any class/date that already has one
+        con = get_con()
+        init_db(con)
+        created: list[CoverRequest] = []
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            existing = list_cover_keys_between(con, start.isoformat(), end.isoformat())
+            for class_id, cover_date in wanted:
+                if (class_id, cover_date) in existing:
+                    continue
+                cover = COVER_STORE.create_cover(
+                    class_id=class_id, cover_date=cover_date
+                )
+                insert_cover(con, cover)
+                created.append(cover)
+            con.commit()
+        except Exception:
+            con.rollback()
+            con.close()
+            raise
+
+        # Write-through: cache only once the inserts are committed
+        for cover in created:
+            COVER_STORE.put(cover)
+
+        already = len(wanted) - len(created)
+        try:
+            blocks = absence_summary_blocks(
+                con, teacher_id, start, end, created, already
+            )
+            text = absence_panel_text(teacher_id)
+            if COORDINATOR_CHANNEL_ID:
+                posted = CARDS.chat_postMessage(
+                    channel=COORDINATOR_CHANNEL_ID, text=text, blocks=blocks
+                )
+                ptr = (posted["channel"], posted["ts"])
+            else:
+                ptr = dm_teacher(CARDS, creator, text, blocks)
+            RENDERS.remember(*ptr, text, blocks)
+
+            # Saved so fills/expiries can re-render it (see _flush_absence_panel)
+            if created:
+                insert_absence_panel(
+                    con,
+                    teacher_id,
+                    start.isoformat(),
+                    end.isoformat(),
+                    already,
+                    *ptr,
+                    [c.cover_id for c in created],
+                )
+                con.commit()
+            refresh_boards(con)
+        finally:
+            con.close()
+        result = f"created {len(created)} covers"
+    finally:
+        record_result(body, claim, result)
+
+
+def absence_panel_text(teacher_id: str) -> str:
+    t = TEACHERS_BY_ID.get(teacher_id)
+    return f"Absence covers for {t.full_name if t else teacher_id}"
+
+
+def _flush_absence_panel(panel_key: str, _kinds: set[str]) -> None:
+    """
+    CardUpdater render callback for absence panels (keyed by str(panel_id)).
+    """
+    con = get_con()
+    try:
+        panel = get_absence_panel(con, int(panel_key))
+        if panel is None:
+            return
+        # Archived covers drop off the panel
+        covers = [
+            c
+            for c in (COVER_STORE.get(con, cid) for cid in panel["cover_ids"])
+            if c is not None
+        ]
+        blocks = absence_summary_blocks(
+            con,
+            panel["teacher_id"],
+            date.fromisoformat(panel["start_date"]),
+            date.fromisoformat(panel["end_date"]),
+            covers,
+            panel["already"],
+        )
+        RENDERS.update(
+            CARDS,
+            panel["channel_id"],
+            panel["message_ts"],
+            absence_panel_text(panel["teacher_id"]),
+            blocks,
+        )
+    finally:
+        con.close()
+
+
+# Panels list many covers: a burst of fills becomes one re-render per window
+ABSENCE_UPDATES = CardUpdater(_flush_absence_panel)
+
+
+def absence_summary_blocks(
+    con,
+    teacher_id: str,
+    start: date,
+    end: date,
+    covers: list[CoverRequest],
+    already: int,
+) -> list[dict]:
+    """
+    One coordinator panel for the whole absence (instead of a card per cover).
+    Recommendations come from one RECS pass (one busy map), and a joint
+    solve_assignment proposal shows who could take the still-open covers
+    without double-booking. Re-rendered as the covers fill or expire.
+    """
+    t = TEACHERS_BY_ID.get(teacher_id)
+    name = t.full_name if t else teacher_id
+
+    open_covers = [c for c in covers if c.status == "OPEN"]
+    recs = {c.cover_id: RECS.get(con, c.cover_id, cover=c) for c in open_covers}
+    weeks = {week_start(c.cover_date) for c in open_covers}
+    proposal = solve_assignment(
+        open_covers,
+        TEACHERS_BY_ID,
+        CLASSES_BY_ID,
+        RECS.busy_map(con),
+        {wk: WEEK_LOADS.week(con, wk) for wk in weeks},
+    )
+
+    summary = (
+        f"*Absent:* {name} ({teacher_id})\n"
+        f"*Dates:* {start.isoformat()} – {end.isoformat()}\n"
+        f"*Covers created:* {len(covers)}"
+    )
+    if already:
+        summary += f" ({already} already existed)"
+    if len(open_covers) < len(covers):
+        summary += f"\n*Still open:* {len(open_covers)}"
+    if open_covers:
+        summary += (
+            f"\n*Proposal:* {len(proposal.assignments)}/{len(open_covers)} can be "
+            "filled without double-booking. Nothing has been assigned yet."
+        )
+        # No per-cover public cards for an absence: the board (if any) lists them
+        if BOARD_MODE:
+            summary += "\nListed on the public covers board."
+        else:
+            summary += (
+                "\nNot posted publicly: use *Notify all* to DM recommended teachers."
+            )
+
+    blocks: list[dict] = [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"Absence — {name}"},
+        },
+        {"type": "section", "text": {"type": "mrkdwn", "text": summary}},
+        {"type": "divider"},
+    ]
+
+    for cover in covers[:ABSENCE_PANEL_MAX_ROWS]:
+        c = materialize_for_cover_date(CLASSES_BY_ID[cover.class_id], cover.cover_date)
+        line = (
+            f"`{cover.cover_id}` `{c.class_id}` {fmt_local_range(c.start_at, c.end_at)}"
+            f" · {c.campus.title()}"
+        )
+        if cover.status != "OPEN":
+            winner = TEACHERS_BY_ID.get(cover.assigned_teacher_id or "")
+            line += f"\n*{cover.status.title()}*"
+            if winner is not None:
+                line += f": {winner.full_name}"
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": line}})
+            continue
+
+        line += f" · {len(recs[cover.cover_id].recommended)} recommended"
+        tid = proposal.assignments.get(cover.cover_id)
+        if tid is not None:
+            line += f"\nProposed: {TEACHERS_BY_ID[tid].full_name}"
+        else:
+            line += "\n_No teacher available_"
+        blocks.append(
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": line},
+                "accessory": {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "Manual assign"},
+                    "action_id": "open_assign_modal",
+                    "value": json.dumps({"cover_id": cover.cover_id}),
+                },
+            }
+        )
+
+    if len(covers) > ABSENCE_PANEL_MAX_ROWS:
+        more = len(covers) - ABSENCE_PANEL_MAX_ROWS
+        blocks.append(
+            {
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"…and {more} more."}],
+            }
+        )
+
+    if open_covers:
+        blocks.append(
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {
+                            "type": "plain_text",
+                            "text": "Notify all (recommended)",
+                        },
+                        "action_id": "notify_absence",
+                        "value": json.dumps(
+                            {"cover_ids": [c.cover_id for c in open_covers]}
+                        ),
+                    }
+                ],
+            }
+        )
+    return blocks
+
+
+@on("action", "notify_absence")
+def notify_absence_action(ack, body, client):
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
+
+    result = "failed"
+    try:
+        if not is_coordinator(body["user"]["id"]):
+            _safe_feedback(URGENT, body, "Not authorised.")
+            result = "not authorised"
+            return
+
+        action = body["actions"][0]
+        cover_ids = json.loads(action["value"])["cover_ids"]
+
+        job_id = JOBS.enqueue(
+            "notify_batch",
+            {"cover_ids": cover_ids, **_feedback_target(body)},
+            dedupe_key=f"notify_batch:{action['action_ts']}",
+        )
+        result = f"notify_batch job {job_id}"
+    finally:
+        record_result(body, claim, result)
+
+
+# ----------------------------
+# Notify actions (coordinator only)
+# Handlers validate + enqueue; the DMs are sent by the job workers below.
+# ----------------------------
+@on("action", "notify_teacher")
+def notify_teacher_action(ack, body, client):
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
+
+    result = "failed"
+    try:
+        if not is_coordinator(body["user"]["id"]):
+            _safe_feedback(URGENT, body, "Not authorised.")
+            result = "not authorised"
+            return
+
+        action = body["actions"][0]
+        payload = json.loads(action["value"])
+        cover_id = payload["cover_id"]
+        teacher_id = payload["teacher_id"]
+
+        con = get_con()
+        try:
+            init_db(con)
+            ctx = cover_ctx(con, cover_id)
+
+            cover = ctx.cover
+            if not cover:
+                _safe_feedback(URGENT, body, "Cover not found.")
+                result = "cover not found"
+                return
+            if cover.status != "OPEN":
+                _safe_feedback(URGENT, body, "Cover is already filled.")
+                CARD_UPDATES.mark_dirty(cover_id)
+                result = "already filled"
+                return
+
+            t = TEACHERS_BY_ID.get(teacher_id)
+            if not t or not t.slack_user_id:
+                _safe_feedback(URGENT, body, "Teacher has no Slack user linked.")
+                result = "teacher not linked"
+                return
+
+            # The DM pointer as of now: if it has changed when the job runs, an earlier
+            # attempt already sent this notification.
+            prev = next((r for r in ctx.dm_rows if r["teacher_id"] == teacher_id), None)
+        finally:
+            con.close()
+
+        job_id = JOBS.enqueue(
+            "notify_teacher",
+            {
+                "cover_id": cover_id,
+                "teacher_id": teacher_id,
+                "prev_dm_ts": prev["dm_ts"] if prev else None,
+                **_feedback_target(body),
+            },
+            dedupe_key=f"notify_teacher:{action['action_ts']}",
+        )
+        result = f"notify_teacher job {job_id}"
+    finally:
+        record_result(body, claim, result)
+
+
+@on("action", "notify_all")
+def notify_all_action(ack, body, client):
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
+
+    result = "failed"
+    try:
+        if not is_coordinator(body["user"]["id"]):
+            _safe_feedback(URGENT, body, "Not authorised.")
+            result = "not authorised"
+            return
+
+        action = body["actions"][0]
+        cover_id = json.loads(action["value"])["cover_id"]
+
+        con = get_con()
+        try:
+            init_db(con)
+            cover = COVER_STORE.get(con, cover_id)
+            if not cover:
+                _safe_feedback(URGENT, body, "Cover not found.")
+                result = "cover not found"
+                return
+            if cover.status != "OPEN":
+                _safe_feedback(URGENT, body, "Cover is already filled.")
+                CARD_UPDATES.mark_dirty(cover_id)
+                result = "already filled"
+                return
+        finally:
+            con.close()
+
+        job_id = JOBS.enqueue(
+            "notify_all",
+            {"cover_id": cover_id, **_feedback_target(body)},
+            dedupe_key=f"notify_all:{action['action_ts']}",
+        )
+        result = f"notify_all job {job_id}"
+    finally:
+        record_result(body, claim, result)
 
-    _safe_feedback(client, body, f"Notified {sent}. Skipped {skipped}.")
+
+def _feedback_target(body) -> dict[str, str]:
+    return {"channel_id": body["channel"]["id"], "user_id": body["user"]["id"]}
 
 
 def _safe_feedback(client, body, text: str) -> None:
@@ -610,17 +1732,21 @@ def _safe_feedback(client, body, text: str) -> None:
     In channels: ephemeral.
     In DMs: normal message.
     """
-    channel_id = body["channel"]["id"]
-    user_id = body["user"]["id"]
+    _feedback(client, **_feedback_target(body), text=text)
+
 
+def _feedback(client, channel_id: str, user_id: str, text: str) -> None:
     if channel_id.startswith("D"):
-        client.chat_postMessage(channel=channel_id, text=text)
+        CARDS.chat_postMessage(channel=channel_id, text=text)
     else:
         client.chat_postEphemeral(channel=channel_id, user=user_id, text=text)
 
 
-@app.action("notify_all")
-def notify_all_action(ack, body, client, respond):
+# ----------------------------
+# Manual assign (coordinator modal)
+# ----------------------------
+@on("action", "open_assign_modal")
+def open_assign_modal(ack, body, client, respond):
     ack()
 
     if not is_coordinator(body["user"]["id"]):
@@ -629,626 +1755,1110 @@ def notify_all_action(ack, body, client, respond):
 
     cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
 
-    con = get_con()
-    init_db(con)
+    client.views_open(trigger_id=body["trigger_id"], view=assign_modal_view(cover_id))
 
-    cover = get_cover(con, cover_id)
-    if not cover:
-        respond("Cover not found.")
-        return
-    if cover.status != "OPEN":
-        respond("Cover is already filled.")
-        update_all_cover_cards(client, con, cover_id)
-        return
 
-    res = get_recommendations_for_cover(con, cover_id, TEACHERS_BY_ID, CLASSES_BY_ID)
-    declined = list_declined_teacher_ids(con, cover_id)
-    existing = {r["teacher_id"]: r["status"] for r in list_dms_for_cover(con, cover_id)}
+ASSIGN_IMPACT_PROMPT = "Pick a teacher to see the impact on other open covers."
+IMPACT_MAX_LINES = 10
 
-    c = CLASSES_BY_ID[cover.class_id]
-    ts = utc_now_iso()
 
-    sent = 0
-    skipped = 0
+def assign_modal_view(
+    cover_id: str, selected: dict | None = None, impact: str = ASSIGN_IMPACT_PROMPT
+) -> dict:
+    select = {
+        "type": "external_select",
+        "action_id": "assign_teacher_select",
+        "placeholder": {
+            "type": "plain_text",
+            "text": "Search by name or ID",
+        },
+        "min_query_length": 0,
+    }
+    if selected:
+        select["initial_option"] = selected
+
+    return {
+        "type": "modal",
+        "callback_id": "assign_modal",
+        "title": {"type": "plain_text", "text": "Manual assign"},
+        "submit": {"type": "plain_text", "text": "Assign"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "private_metadata": json.dumps({"cover_id": cover_id}),
+        "blocks": [
+            {
+                "type": "input",
+                "block_id": "assign_teacher",
+                # Selecting fires assign_teacher_select (impact preview)
+                "dispatch_action": True,
+                "label": {"type": "plain_text", "text": "Select teacher"},
+                "element": select,
+            },
+            {
+                "type": "section",
+                "block_id": "assign_impact",
+                "text": {"type": "mrkdwn", "text": impact},
+            },
+        ],
+    }
 
-    for tid in res.recommended[:25]:
-        if tid in declined:
-            skipped += 1
-            continue
-        if existing.get(tid) in {"NOTIFIED", "DECLINED", "ACCEPTED", "LOST"}:
-            skipped += 1
-            continue
 
-        t = TEACHERS_BY_ID.get(tid)
-        if not t or not t.slack_user_id:
-            skipped += 1
-            continue
+@on("action", "assign_teacher_select")
+def assign_teacher_preview(ack, body):
+    """
+    What-if for the picked teacher: which other open covers would lose
+    candidates (or their last one) if this assignment went through.
+    Shown in the modal; nothing is written.
+    """
+    ack()
 
-        blocks = teacher_dm_blocks(cover_id, c)
-        dm_channel_id, dm_ts = dm_teacher(
-            client, t.slack_user_id, f"Cover {cover_id}", blocks
+    if not is_coordinator(body["user"]["id"]):
+        return
+
+    view = body["view"]
+    cover_id = json.loads(view.get("private_metadata") or "{}").get("cover_id")
+    selected = body["actions"][0].get("selected_option")
+    if not cover_id or not selected:
+        return
+
+    con = get_con()
+    try:
+        covers = COVER_STORE.list_open(con)
+        declined = {
+            (r["cover_id"], r["teacher_id"])
+            for r in list_dms_for_covers(con, [c.cover_id for c in covers])
+            if r["status"] == "DECLINED"
+        }
+        by_id = {c.cover_id: c for c in covers}
+
+        def pool(cid: str) -> set[str]:
+            rec = RECS.get(con, cid, cover=by_id.get(cid))
+            return {
+                tid
+                for tid in (*rec.recommended, *rec.soft_excluded)
+                if (cid, tid) not in declined
+            }
+
+        weeks = {week_start(c.cover_date) for c in covers}
+        sim = WhatIf(
+            covers,
+            TEACHERS_BY_ID,
+            CLASSES_BY_ID,
+            RECS.busy_map(con),
+            {wk: WEEK_LOADS.week(con, wk) for wk in weeks},
+            declined,
+            pools=pool,
         )
-        upsert_dm(con, cover_id, tid, dm_channel_id, dm_ts, "NOTIFIED", ts)
-        sent += 1
+        sim.assign(cover_id, selected["value"])
+        impact = what_if_text(sim.report(), by_id)
+    finally:
+        con.close()
+
+    URGENT.views_update(
+        view_id=view["id"],
+        hash=view.get("hash"),
+        view=assign_modal_view(cover_id, selected, impact),
+    )
 
-    con.commit()
-    update_admin_cover_card(client, con, cover_id)
-    respond(f"Notified {sent}. Skipped {skipped}.")
+
+def what_if_text(report: WhatIfReport, covers_by_id: dict[str, CoverRequest]) -> str:
+    def label(cover_id: str) -> str:
+        cover = covers_by_id.get(cover_id)
+        if cover is None:
+            return f"`{cover_id}`"
+        return f"`{cover_id}` `{cover.class_id}` {cover.cover_date}"
+
+    lines = []
+    for (_cid, _tid), codes in report.conflicts.items():
+        lines.append(f":warning: {match_reason(codes[0])}")
+    if report.newly_unfillable:
+        lines.append("*Would be left with no candidates:*")
+        lines += [f"• {label(i.cover_id)}" for i in report.newly_unfillable]
+    if report.shrunk:
+        lines.append("*Fewer candidates:*")
+        lines += [
+            f"• {label(i.cover_id)}: {i.before} → {i.after}" for i in report.shrunk
+        ]
+    if not lines:
+        return "No other open cover loses a candidate."
+
+    if len(lines) > IMPACT_MAX_LINES:
+        more = len(lines) - IMPACT_MAX_LINES
+        lines = lines[:IMPACT_MAX_LINES] + [f"…and {more} more."]
+    return "\n".join(lines)
 
 
-# ----------------------------
-# Manual assign (coordinator modal)
-# ----------------------------
-@app.action("open_assign_modal")
-def open_assign_modal(ack, body, client, respond):
+@on("command", "/cover-create")
+def cover_create(ack, command, client, respond):
     ack()
 
-    if not is_coordinator(body["user"]["id"]):
+    creator = command["user_id"]
+    if not is_coordinator(creator):
         respond("Not authorised.")
         return
 
-    cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
-
     client.views_open(
-        trigger_id=body["trigger_id"],
+        trigger_id=command["trigger_id"],
         view={
             "type": "modal",
-            "callback_id": "assign_modal",
-            "title": {"type": "plain_text", "text": "Manual assign"},
-            "submit": {"type": "plain_text", "text": "Assign"},
+            "callback_id": "create_cover_modal",
+            "title": {"type": "plain_text", "text": "Create cover"},
+            "submit": {"type": "plain_text", "text": "Create"},
             "close": {"type": "plain_text", "text": "Cancel"},
-            "private_metadata": json.dumps({"cover_id": cover_id}),
             "blocks": [
                 {
                     "type": "input",
-                    "block_id": "assign_teacher",
-                    "label": {"type": "plain_text", "text": "Select teacher"},
+                    "block_id": "class_pick",
+                    "label": {"type": "plain_text", "text": "Class"},
                     "element": {
                         "type": "external_select",
-                        "action_id": "assign_teacher_select",
+                        "action_id": "class_pick_select",
                         "placeholder": {
                             "type": "plain_text",
-                            "text": "Search by name or ID",
+                            "text": "Search class_id",
                         },
                         "min_query_length": 0,
                     },
-                }
+                },
+                {
+                    "type": "input",
+                    "block_id": "date_pick",
+                    "label": {"type": "plain_text", "text": "Cover date"},
+                    "element": {
+                        "type": "datepicker",
+                        "action_id": "date_pick_select",
+                        "placeholder": {"type": "plain_text", "text": "Select date"},
+                    },
+                },
             ],
         },
     )
 
+    respond("Opening cover creator…")
+
+
+@on("options", "class_pick_select")
+def class_pick_options(ack, body):
+    q = body.get("value") or ""
+
+    options = []
+    for class_id in CLASS_SEARCH.search(q, limit=100):
+        c = CLASSES_BY_ID[class_id]
+        options.append(
+            {
+                "text": {
+                    "type": "plain_text",
+                    "text": option_text(c.class_id, c.class_name),
+                },
+                "value": c.class_id,
+            }
+        )
+
+    ack(options=options)
+
+
+@on("options", "assign_teacher_select")
+def assign_teacher_options(ack, body):
+    """
+    Manual-assign picker, ranked for the modal's cover (private_metadata):
+    recommended -> soft-excluded -> not eligible, each with its first reason.
+    Served from RECS, so a keystroke costs a search + dict lookups.
+    """
+    query = body.get("value") or ""
+    matches = TEACHER_SEARCH.search(query, limit=len(TEACHERS_BY_ID))
+
+    meta = json.loads((body.get("view") or {}).get("private_metadata") or "{}")
+    rec = None
+    if meta.get("cover_id"):
+        con = get_con()
+        try:
+            cover = COVER_STORE.get(con, meta["cover_id"])
+            if cover:
+                rec = RECS.get(con, cover.cover_id, cover=cover)
+        finally:
+            con.close()
+
+    def option(tid: str, codes: list[Reason] | None = None) -> dict:
+        t = TEACHERS_BY_ID[tid]
+        detail = ""
+        if codes:
+            detail = match_reason(codes[0])
+            if len(codes) > 1:
+                detail += f" (+{len(codes) - 1})"
+        return {
+            "text": {
+                "type": "plain_text",
+                "text": option_text(f"{t.full_name} ({t.teacher_id})", detail),
+            },
+            "value": t.teacher_id,
+        }
+
+    if rec is None:
+        ack(options=[option(tid) for tid in matches[:100]])
+        return
+
+    matched = set(matches)
+    recommended = top_k(
+        {tid: score for tid, score in rec.scores.items() if tid in matched}, 100
+    )
+    soft = [tid for tid in matches if tid in rec.soft_excluded]
+    hard = [tid for tid in matches if tid in rec.hard_rejected]
+
+    groups = []
+    budget = 100  # total options per response
+    for label, tids, reasons in [
+        ("Recommended", recommended, {}),
+        ("Soft-excluded", soft, rec.soft_excluded),
+        ("Not eligible", hard, rec.hard_rejected),
+    ]:
+        tids = tids[:budget]
+        budget -= len(tids)
+        if tids:
+            groups.append(
+                {
+                    "label": {"type": "plain_text", "text": label},
+                    "options": [option(tid, reasons.get(tid)) for tid in tids],
+                }
+            )
+
+    ack(option_groups=groups)
+
+
+def option_text(label: str, detail: str = "") -> str:
+    # Slack caps option text at 75 chars
+    text = f"{label} — {detail}" if detail else label
+    return text if len(text) <= 75 else text[:74] + "…"
+
+
+@on("view", "create_cover_modal")
+def create_cover_modal_submit(ack, body, client, view):
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
+
+    result = "failed"
+    try:
+        creator = body["user"]["id"]
+        if not is_coordinator(creator):
+            result = "not authorised"
+            return
+
+        state = view["state"]["values"]
+        class_id = state["class_pick"]["class_pick_select"]["selected_option"]["value"]
+        cover_date = state["date_pick"]["date_pick_select"][
+            "selected_date"
+        ]  # "YYYY-MM-DD"
+
+        if class_id not in CLASSES_BY_ID:
+            URGENT.chat_postEphemeral(
+                channel=COORDINATOR_CHANNEL_ID or body["channel"]["id"],
+                user=creator,
+                text="Invalid class_id.",
+            )
+            result = "invalid class"
+            return
+
+        # Validate day-of-week now (fail early)
+        template = CLASSES_BY_ID[class_id]
+        try:
+            materialize_for_cover_date(template, cover_date)
+        except Exception as e:
+            URGENT.chat_postEphemeral(
+                channel=COORDINATOR_CHANNEL_ID or body["channel"]["id"],
+                user=creator,
+                text=f"Invalid date for that class: {e}",
+            )
+            result = "invalid date"
+            return
+
+        con = get_con()
+        try:
+            init_db(con)
+
+            # ✅ Create + insert cover (insert_cover sets cover.cover_id)
+            cover = COVER_STORE.create_cover(class_id=class_id, cover_date=cover_date)
+            cover_id = insert_cover(con, cover)
+
+            # Brand-new cover: nothing to look up for it yet
+            ctx = cover_ctx(con, cover_id)
+            ctx.seed(cover=cover, dm_rows=[])
+
+            # ✅ Post public cover card to the public covers channel (the board lists it instead)
+            if not BOARD_MODE:
+                public_blocks = public_cover_blocks(ctx)
+                posted = CARDS.chat_postMessage(
+                    channel=PUBLIC_COVERS_CHANNEL_ID,
+                    text=f"Cover {cover_id}",
+                    blocks=public_blocks,
+                )
+                upsert_cover_message(con, cover_id, posted["channel"], posted["ts"])
+                RENDERS.remember(
+                    posted["channel"], posted["ts"], f"Cover {cover_id}", public_blocks
+                )
+
+            # ✅ Post coordinator panel
+            admin_blocks = admin_cover_blocks(ctx)
+
+            if COORDINATOR_CHANNEL_ID:
+                admin_post = CARDS.chat_postMessage(
+                    channel=COORDINATOR_CHANNEL_ID,
+                    text=f"Coordinator panel {cover_id}",
+                    blocks=admin_blocks,
+                )
+                upsert_admin_message(
+                    con, cover_id, admin_post["channel"], admin_post["ts"]
+                )
+                admin_ptr = (admin_post["channel"], admin_post["ts"])
+            else:
+                dm_channel_id, dm_ts = dm_teacher(
+                    CARDS, creator, f"Coordinator panel {cover_id}", admin_blocks
+                )
+                upsert_admin_message(con, cover_id, dm_channel_id, dm_ts)
+                admin_ptr = (dm_channel_id, dm_ts)
+            RENDERS.remember(*admin_ptr, f"Coordinator panel {cover_id}", admin_blocks)
+
+            con.commit()
+
+            # Write-through: cache only once the insert is committed
+            COVER_STORE.put(cover)
+            result = f"created {cover_id}"
+            refresh_boards(con)
+        finally:
+            con.close()
+
+        # ✅ Confirmation to coordinator
+        URGENT.chat_postEphemeral(
+            channel=COORDINATOR_CHANNEL_ID or PUBLIC_COVERS_CHANNEL_ID,
+            user=creator,
+            text=f"Created cover `{cover_id}` for `{class_id}` on `{cover_date}`.",
+        )
+    finally:
+        record_result(body, claim, result)
+
+
+@on("view", "assign_modal")
+def assign_modal_submit(ack, body, client, view):
+    meta = json.loads(view.get("private_metadata", "{}"))
+    cover_id = meta["cover_id"]
+
+    state = view["state"]["values"]
+    teacher_id = state["assign_teacher"]["assign_teacher_select"]["selected_option"][
+        "value"
+    ]
+
+    # Auth first: no reads for someone who can't assign
+    if not is_coordinator(body["user"]["id"]):
+        ack(response_action="errors", errors={"assign_teacher": "Not authorised."})
+        return
+
+    con = get_con()
+    try:
+        init_db(con)
+        ctx = cover_ctx(con, cover_id)
+
+        # Clash check before ack so the modal shows it (cached busy map: cheap)
+        clash = assign_clash(ctx, teacher_id)
+        if clash:
+            ack(response_action="errors", errors={"assign_teacher": clash})
+            return
+
+        ack()
+        claim = first_delivery(body)
+        if claim is None:
+            return
+
+        # Fill cover atomically
+        # (read the row inside the write lock — the cache is not authoritative here)
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            ctx.invalidate_cover()
+            cover = ctx.cover
+            if not cover or cover.status != "OPEN":
+                con.commit()
+                record_result(body, claim, "not open")
+                CARD_UPDATES.mark_dirty(cover_id)
+                return
+
+            # Re-check under the lock: a fill may have landed since the modal check
+            clash = assign_clash(ctx, teacher_id)
+            if clash:
+                con.commit()
+                record_result(body, claim, "clash")
+                CARDS.chat_postMessage(
+                    channel=body["user"]["id"],
+                    text=f"Could not assign `{cover_id}`: {clash}",
+                )
+                return
+
+            ok = fill_cover(con, cover_id, teacher_id)
+            if ok:
+                # Same transaction as the fill: the follow-up can't be lost to a crash
+                JOBS.enqueue(
+                    "cover_filled",
+                    {"cover_id": cover_id, "winner_id": teacher_id, "how": "assigned"},
+                    dedupe_key=f"cover_filled:{cover_id}",
+                    con=con,
+                )
+            con.commit()
+            JOBS.wake()
+            ctx.invalidate_cover()
+            record_result(body, claim, f"assigned {teacher_id}" if ok else "not open")
+            if not ok:
+                CARD_UPDATES.mark_dirty(cover_id)
+                return
+
+        except Exception:
+            con.rollback()
+            record_result(body, claim, "failed")
+            raise
+    finally:
+        con.close()
+
+
+def assign_clash(ctx: CoverContext, teacher_id: str) -> str | None:
+    """
+    Friendly reason if teacher_id is already busy during the cover, else None.
+    Other eligibility rules are the coordinator's call on a manual assign.
+    """
+    if not ctx.cover or ctx.cover.status != "OPEN":
+        return None
+    codes = clash_reasons(teacher_id, ctx.session, ctx.busy_map)
+    return match_reason(codes[0]) if codes else None
+
+
+# ----------------------------
+# Decline (teacher DM)
+# ----------------------------
+@on("action", "decline_cover")
+def decline_cover_action(ack, body, client, respond):
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
+
+    result = "failed"
+    try:
+        cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
+        slack_user_id = body["user"]["id"]
+        teacher_id = TEACHER_ID_BY_SLACK.get(slack_user_id)
+
+        dm_channel_id = body["channel"]["id"]
+        dm_ts = body["message"]["ts"]
 
-@app.command("/cover-create")
-def cover_create(ack, command, client, respond):
-    ack()
+        # Only meaningful in DMs
+        if not dm_channel_id.startswith("D"):
+            respond("Decline is only available in the DM notification.")
+            result = "not a DM"
+            return
 
-    creator = command["user_id"]
-    if not is_coordinator(creator):
-        respond("Not authorised.")
-        return
+        con = get_con()
+        try:
+            init_db(con)
+            ctx = cover_ctx(con, cover_id)
+
+            if not ctx.cover:
+                URGENT.chat_update(
+                    channel=dm_channel_id,
+                    ts=dm_ts,
+                    text="Declined",
+                    blocks=frozen_blocks("Declined. (Cover not found.)"),
+                )
+                result = "cover not found"
+                return
+
+            # Filled/expired/cancelled: keep that status rather than overwriting it
+            if ctx.cover.status != "OPEN":
+                URGENT.chat_update(
+                    channel=dm_channel_id,
+                    ts=dm_ts,
+                    text="Cover closed",
+                    blocks=frozen_blocks(f"Cover `{cover_id}` is no longer open."),
+                )
+                result = "not open"
+                return
 
-    client.views_open(
-        trigger_id=command["trigger_id"],
-        view={
-            "type": "modal",
-            "callback_id": "create_cover_modal",
-            "title": {"type": "plain_text", "text": "Create cover"},
-            "submit": {"type": "plain_text", "text": "Create"},
-            "close": {"type": "plain_text", "text": "Cancel"},
-            "blocks": [
-                {
-                    "type": "input",
-                    "block_id": "class_pick",
-                    "label": {"type": "plain_text", "text": "Class"},
-                    "element": {
-                        "type": "external_select",
-                        "action_id": "class_pick_select",
-                        "placeholder": {
-                            "type": "plain_text",
-                            "text": "Search class_id",
-                        },
-                        "min_query_length": 0,
-                    },
-                },
-                {
-                    "type": "input",
-                    "block_id": "date_pick",
-                    "label": {"type": "plain_text", "text": "Cover date"},
-                    "element": {
-                        "type": "datepicker",
-                        "action_id": "date_pick_select",
-                        "placeholder": {"type": "plain_text", "text": "Select date"},
-                    },
-                },
-            ],
-        },
-    )
+            if teacher_id:
+                upsert_dm(
+                    con,
+                    cover_id,
+                    teacher_id,
+                    dm_channel_id,
+                    dm_ts,
+                    "DECLINED",
+                    utc_now_iso(),
+                )
+                con.commit()
+                ctx.invalidate_dms()
+        finally:
+            con.close()
 
-    respond("Opening cover creator…")
+        URGENT.chat_update(
+            channel=dm_channel_id,
+            ts=dm_ts,
+            text="Declined",
+            blocks=frozen_blocks("Declined."),
+        )
 
+        CARD_UPDATES.mark_dirty(cover_id)
+        result = "declined"
+        respond("Recorded.")
+    finally:
+        record_result(body, claim, result)
 
-@app.options("class_pick_select")
-def class_pick_options(ack, body):
-    q = (body.get("value") or "").strip().lower()
 
-    options = []
-    for c in CLASSES_BY_ID.values():
-        if not q or q in c.class_id.lower():
-            options.append(
-                {
-                    "text": {"type": "plain_text", "text": c.class_id},
-                    "value": c.class_id,
-                }
-            )
-        if len(options) >= 100:
-            break
+# ----------------------------
+# Accept (public or DM)
+# ----------------------------
+@on("action", "accept_cover")
+def accept_cover_action(ack, body, client, respond):
+    ack()
+    claim = first_delivery(body)
+    if claim is None:
+        return
 
-    ack(options=options)
+    result = "failed"
+    try:
+        cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
+        slack_user_id = body["user"]["id"]
+        teacher_id = TEACHER_ID_BY_SLACK.get(slack_user_id)
+
+        channel_id = body["channel"]["id"]
+        msg_ts = body["message"]["ts"]
+        # A digest lists other covers too: answer ephemerally, refresh_digests edits it
+        is_dm = channel_id.startswith("D") and not DIGESTS.is_digest(channel_id, msg_ts)
+
+        if not teacher_id:
+            if is_dm:
+                URGENT.chat_update(
+                    channel=channel_id,
+                    ts=msg_ts,
+                    text="Not linked",
+                    blocks=frozen_blocks(
+                        "You are not linked to a Teacher profile yet."
+                    ),
+                )
+            else:
+                URGENT.chat_postEphemeral(
+                    channel=channel_id,
+                    user=slack_user_id,
+                    text="You are not linked to a Teacher profile yet.",
+                )
+            result = "not linked"
+            return
 
+        con = get_con()
+        try:
+            init_db(con)
+            ctx = cover_ctx(con, cover_id)
+
+            cover = ctx.cover
+            if not cover:
+                if is_dm:
+                    URGENT.chat_update(
+                        channel=channel_id,
+                        ts=msg_ts,
+                        text="Not found",
+                        blocks=frozen_blocks("Cover not found."),
+                    )
+                else:
+                    URGENT.chat_postEphemeral(
+                        channel=channel_id, user=slack_user_id, text="Cover not found."
+                    )
+                result = "cover not found"
+                return
+
+            # Gate by "recommended list" (your rule)
+            rec = ctx.recommendations
+            if teacher_id not in rec.recommended:
+                # Prefer showing specific reasons if present
+                reasons = []
+                if teacher_id in rec.soft_excluded:
+                    reasons = rec.soft_excluded[teacher_id]
+                elif teacher_id in rec.hard_rejected:
+                    reasons = rec.hard_rejected[teacher_id]
+
+                msg = "You are not eligible to accept this cover.\n" + codes_to_bullets(
+                    reasons
+                )
 
-@app.options("assign_teacher_select")
-def assign_teacher_options(ack, body):
-    query = (body.get("value") or "").strip().lower()
+                if is_dm:
+                    URGENT.chat_update(
+                        channel=channel_id,
+                        ts=msg_ts,
+                        text="Not eligible",
+                        blocks=frozen_blocks(msg),
+                    )
+                else:
+                    URGENT.chat_postEphemeral(
+                        channel=channel_id, user=slack_user_id, text=msg
+                    )
+                result = "not eligible"
+                return
+
+            def on_fill(con) -> None:
+                # Same transaction as the fill: the follow-up can't be lost to a crash,
+                # and the job sees the DM as ACCEPTED (so it doesn't DM the winner again)
+                if is_dm:
+                    upsert_dm(
+                        con,
+                        cover_id,
+                        teacher_id,
+                        channel_id,
+                        msg_ts,
+                        "ACCEPTED",
+                        utc_now_iso(),
+                    )
+                JOBS.enqueue(
+                    "cover_filled",
+                    {"cover_id": cover_id, "winner_id": teacher_id, "how": "accepted"},
+                    dedupe_key=f"cover_filled:{cover_id}",
+                    con=con,
+                )
 
-    def matches(t) -> bool:
-        if not query:
-            return True
-        return query in t.teacher_id.lower() or query in t.full_name.lower()
+            # Busy map for deterministic clash check (regular + filled covers);
+            # same one the recommendations above were computed from
+            ok, reason_or_msg = attempt_accept(
+                con,
+                cover_id,
+                teacher_id,
+                TEACHERS_BY_ID,
+                CLASSES_BY_ID,
+                ctx.busy_map,
+                on_fill=on_fill,
+            )
 
-    options = []
-    for t in TEACHERS_BY_ID.values():
-        if matches(t):
-            options.append(
-                {
-                    "text": {
-                        "type": "plain_text",
-                        "text": f"{t.full_name} ({t.teacher_id})",
-                    },
-                    "value": t.teacher_id,
-                }
+            # attempt_accept committed (fill or rejection) — write it through to the cache
+            ctx.invalidate_cover()
+            cover = ctx.cover
+            if not cover:
+                result = "cover not found"
+                return
+
+            if ok:
+                JOBS.wake()
+                if is_dm:
+                    ctx.invalidate_dms()
+                    URGENT.chat_update(
+                        channel=channel_id,
+                        ts=msg_ts,
+                        text="Accepted",
+                        blocks=frozen_blocks(
+                            f"Accepted. You are assigned to cover `{cover_id}`."
+                        ),
+                    )
+                else:
+                    # Accepted from public channel: confirm via ephemeral (the job DMs the winner)
+                    URGENT.chat_postEphemeral(
+                        channel=channel_id,
+                        user=slack_user_id,
+                        text=f"Accepted. You are assigned to cover `{cover_id}`.",
+                    )
+
+                result = "accepted"
+                return
+
+            # Not accepted
+            # attempt_accept already renders its reasons as "• ..." bullets
+            result = f"rejected: {reason_or_msg}"
+            msg = (
+                "Could not accept.\n" + reason_or_msg
+                if reason_or_msg
+                else "Could not accept."
             )
-        if len(options) >= 100:
-            break
 
-    ack(options=options)
+            if is_dm:
+                URGENT.chat_update(
+                    channel=channel_id,
+                    ts=msg_ts,
+                    text="Could not accept",
+                    blocks=frozen_blocks(msg),
+                )
+            else:
+                URGENT.chat_postEphemeral(
+                    channel=channel_id, user=slack_user_id, text=msg
+                )
 
+            CARD_UPDATES.mark_dirty(cover_id)
+        finally:
+            con.close()
+    finally:
+        record_result(body, claim, result)
 
-@app.view("create_cover_modal")
-def create_cover_modal_submit(ack, body, client, view):
-    ack()
 
-    creator = body["user"]["id"]
-    if not is_coordinator(creator):
+# ----------------------------
+# Background jobs (run by JOBS workers; must be safe to re-run)
+# ----------------------------
+@JOBS.handler("notify_teacher")
+def notify_teacher_job(con, job: dict) -> None:
+    cover_id, teacher_id = job["cover_id"], job["teacher_id"]
+    ctx = cover_ctx(con, cover_id)
+
+    cover = ctx.cover
+    if not cover or cover.status != "OPEN":
+        _feedback(URGENT, job["channel_id"], job["user_id"], "Cover is already filled.")
+        CARD_UPDATES.mark_dirty(cover_id)
         return
 
-    state = view["state"]["values"]
-    class_id = state["class_pick"]["class_pick_select"]["selected_option"]["value"]
-    cover_date = state["date_pick"]["date_pick_select"]["selected_date"]  # "YYYY-MM-DD"
+    t = TEACHERS_BY_ID[teacher_id]
+    row = next((r for r in ctx.dm_rows if r["teacher_id"] == teacher_id), None)
+    already_sent = row is not None and row["dm_ts"] != job["prev_dm_ts"]
 
-    if class_id not in CLASSES_BY_ID:
-        client.chat_postEphemeral(
-            channel=COORDINATOR_CHANNEL_ID or body["channel"]["id"],
-            user=creator,
-            text="Invalid class_id.",
+    if not already_sent:
+        if DIGEST_MODE and cover_id in COVER_INDEX.covers_for(con, teacher_id):
+            ptr, err = send_digests(con, [t], fresh=True)[0]
+            if err is not None:
+                raise err
+            dm_channel_id, dm_ts = ptr
+        else:
+            dm_channel_id, dm_ts = dm_teacher(
+                CARDS, t.slack_user_id, f"Cover {cover_id}", teacher_dm_blocks(ctx)
+            )
+        upsert_dm(
+            con, cover_id, teacher_id, dm_channel_id, dm_ts, "NOTIFIED", utc_now_iso()
         )
-        return
+        con.commit()
+        ctx.invalidate_dms()
+
+    # Update the panel (this keeps it visible)
+    CARD_UPDATES.mark_dirty(cover_id, public=False)
 
-    # Validate day-of-week now (fail early)
-    from cover_time import materialize_for_cover_date
+    _feedback(
+        URGENT,
+        job["channel_id"],
+        job["user_id"],
+        f"Notification sent to {t.full_name}.",
+    )
 
-    template = CLASSES_BY_ID[class_id]
-    try:
-        materialize_for_cover_date(template, cover_date)
-    except Exception as e:
-        client.chat_postEphemeral(
-            channel=COORDINATOR_CHANNEL_ID or body["channel"]["id"],
-            user=creator,
-            text=f"Invalid date for that class: {e}",
-        )
+
+@JOBS.handler("notify_all")
+def notify_all_job(con, job: dict) -> None:
+    wave = notify_wave(con, job["cover_id"])
+    if wave is None:
+        _feedback(URGENT, job["channel_id"], job["user_id"], "Cover is already filled.")
         return
 
-    con = get_con()
-    init_db(con)
-
-    # ✅ Create + insert cover
-    store = CoverStore.new()  # optional; can delete later
-    cover = store.create_cover(class_id=class_id, cover_date=cover_date)
-    cover_id = insert_cover(con, cover)
-
-    # ✅ Fetch row for formatting blocks
-    cover_row = get_cover(con, cover_id)
-    declined = list_declined_teacher_ids(con, cover_id)
-
-    # ✅ Post public cover card to the public covers channel
-    posted = client.chat_postMessage(
-        channel=PUBLIC_COVERS_CHANNEL_ID,
-        text=f"Cover {cover_id}",
-        blocks=public_cover_blocks(cover_row, declined_count=len(declined)),
-    )
-    upsert_cover_message(con, cover_id, posted["channel"], posted["ts"])
+    notified, skipped, failed = wave
+    msg = f"Notified {notified}. Skipped {skipped}."
+    if failed:
+        msg += f" Failed {len(failed)}: {', '.join(failed)}."
+    _feedback(URGENT, job["channel_id"], job["user_id"], msg)
 
-    # ✅ Post coordinator panel
-    res = get_recommendations_for_cover(con, cover_id, TEACHERS_BY_ID, CLASSES_BY_ID)
-    dm_rows = list_dms_for_cover(con, cover_id)
-    dm_status_by_teacher = {r["teacher_id"]: r["status"] for r in dm_rows}
 
-    admin_blocks = admin_cover_blocks(
-        cover_row, res.recommended, dm_status_by_teacher, declined
-    )
+@JOBS.handler("notify_batch")
+def notify_batch_job(con, job: dict) -> None:
+    """
+    "Notify all" for several covers (absence summary): one wave per cover,
+    one feedback message for the lot.
+    """
+    notified = skipped = closed = 0
+    failed: list[str] = []
+    for cover_id in job["cover_ids"]:
+        wave = notify_wave(con, cover_id)
+        if wave is None:
+            closed += 1
+            continue
+        notified += wave[0]
+        skipped += wave[1]
+        failed += wave[2]
 
-    if COORDINATOR_CHANNEL_ID:
-        admin_post = client.chat_postMessage(
-            channel=COORDINATOR_CHANNEL_ID,
-            text=f"Coordinator panel {cover_id}",
-            blocks=admin_blocks,
-        )
-        upsert_admin_message(con, cover_id, admin_post["channel"], admin_post["ts"])
-    else:
-        dm_channel_id, dm_ts = dm_teacher(
-            client, creator, f"Coordinator panel {cover_id}", admin_blocks
-        )
-        upsert_admin_message(con, cover_id, dm_channel_id, dm_ts)
+    open_count = len(job["cover_ids"]) - closed
+    msg = f"Notified {notified} across {open_count} covers. Skipped {skipped}."
+    if closed:
+        msg += f" {closed} no longer open."
+    if failed:
+        msg += f" Failed {len(failed)}: {', '.join(sorted(set(failed)))}."
+    _feedback(URGENT, job["channel_id"], job["user_id"], msg)
 
-    # Optional: store in-memory (not required)
-    store.open_covers[cover_id] = cover
-    store.all_covers[cover_id] = cover
 
-    con.commit()
+def notify_wave(con, cover_id: str) -> tuple[int, int, list[str]] | None:
+    """
+    DM the cover's best-ranked teachers (NOTIFY_WAVE_SIZE) who haven't been
+    contacted yet. Returns (notified, skipped, failed names); None if not OPEN.
+    """
+    ctx = cover_ctx(con, cover_id)
 
-    # ✅ Confirmation to coordinator
-    client.chat_postEphemeral(
-        channel=COORDINATOR_CHANNEL_ID or posted["channel"],
-        user=creator,
-        text=f"Created cover `{cover_id}` for `{class_id}` on `{cover_date}`.",
-    )
+    cover = ctx.cover
+    if not cover or cover.status != "OPEN":
+        CARD_UPDATES.mark_dirty(cover_id)
+        return None
 
+    declined = ctx.declined
+    existing = ctx.dm_status_by_teacher
 
-@app.view("assign_modal")
-def assign_modal_submit(ack, body, client, view):
-    ack()
+    # Same payload for every recipient
+    blocks = teacher_dm_blocks(ctx)
+    ts = utc_now_iso()
 
-    if not is_coordinator(body["user"]["id"]):
-        return
+    skipped = 0
+    targets = []
 
-    meta = json.loads(view.get("private_metadata", "{}"))
-    cover_id = meta["cover_id"]
+    # Anyone already NOTIFIED (e.g. by an earlier attempt of this job) is skipped
+    for tid in ctx.recommendations.top(NOTIFY_WAVE_SIZE):
+        if tid in declined:
+            skipped += 1
+            continue
+        if existing.get(tid) in {"NOTIFIED", "DECLINED", "ACCEPTED", "LOST"}:
+            skipped += 1
+            continue
 
-    state = view["state"]["values"]
-    teacher_id = state["assign_teacher"]["assign_teacher_select"]["selected_option"][
-        "value"
-    ]
+        t = TEACHERS_BY_ID.get(tid)
+        if not t or not t.slack_user_id:
+            skipped += 1
+            continue
 
-    con = get_con()
-    init_db(con)
+        targets.append(t)
 
-    # Fill cover atomically
-    con.execute("BEGIN IMMEDIATE")
-    try:
-        cover = get_cover(con, cover_id)
-        if not cover or cover.status != "OPEN":
-            con.commit()
-            update_all_cover_cards(client, con, cover_id)
-            return
+    # Concurrent DMs (bounded pool, per-method token buckets, 429 retries)
+    def send(t):
+        return dm_teacher(BULK, t.slack_user_id, f"Cover {cover_id}", blocks)
 
-        ok = fill_cover(con, cover_id, teacher_id)
-        con.commit()
-        if not ok:
-            update_all_cover_cards(client, con, cover_id)
-            return
+    if DIGEST_MODE:
+        # Targets are all recommended, so the cover is in each of their digests
+        results = send_digests(con, targets, fresh=True)
+    else:
+        results = fan_out([partial(send, t) for t in targets])
 
-    except Exception:
-        con.rollback()
-        raise
+    rows = []
+    failed = []
+    for t, (res, err) in zip(targets, results):
+        if err is not None:
+            failed.append(t.full_name)
+            continue
+        dm_channel_id, dm_ts = res
+        rows.append((cover_id, t.teacher_id, dm_channel_id, dm_ts, "NOTIFIED", ts))
 
-    # Notify assigned teacher by DM (and record it)
-    t = TEACHERS_BY_ID.get(teacher_id)
-    if t and t.slack_user_id:
-        cover = get_cover(con, cover_id)
-        template = CLASSES_BY_ID[cover.class_id]
-        c = materialize_for_cover_date(template, cover.cover_date)
+    # One batched write + one commit for the whole wave
+    upsert_dms(con, rows)
+    con.commit()
+    ctx.invalidate_dms()
+    CARD_UPDATES.mark_dirty(cover_id, public=False)
+    return len(rows), skipped, failed
+
+
+@JOBS.handler("cover_filled")
+def cover_filled_job(con, job: dict) -> None:
+    """
+    Everything after a fill except the winner's own confirmation:
+    DM the winner (if they didn't accept from a DM), freeze the other DMs as LOST,
+    refresh the cards, post to the coordinator thread.
+    """
+    cover_id, winner_id = job["cover_id"], job["winner_id"]
+    assigned = job["how"] == "assigned"
+    ctx = cover_ctx(con, cover_id)
+    if not ctx.cover:
+        return
 
+    t = TEACHERS_BY_ID.get(winner_id)
+    winner_name = t.full_name if t else winner_id
+
+    # Winner DM, unless one is already recorded (DM accept, or an earlier attempt)
+    if t and t.slack_user_id and ctx.dm_status_by_teacher.get(winner_id) != "ACCEPTED":
+        c = ctx.session
+        headline = (
+            f"You have been assigned to cover `{cover_id}`."
+            if assigned
+            else f"Accepted. You are assigned to cover `{cover_id}`."
+        )
         blocks = frozen_blocks(
-            f"You have been assigned to cover `{cover_id}`.\n"
+            f"{headline}\n"
             f"Class: `{c.class_id}`\n"
             f"Campus: {c.campus.title()}\n"
             f"When: {fmt_local_range(c.start_at, c.end_at)} (Sydney time)"
         )
         dm_channel_id, dm_ts = dm_teacher(
-            client, t.slack_user_id, f"Cover {cover_id} assigned", blocks
+            URGENT,
+            t.slack_user_id,
+            f"Cover {cover_id} {'assigned' if assigned else 'accepted'}",
+            blocks,
         )
         upsert_dm(
-            con, cover_id, teacher_id, dm_channel_id, dm_ts, "ACCEPTED", utc_now_iso()
+            con, cover_id, winner_id, dm_channel_id, dm_ts, "ACCEPTED", utc_now_iso()
         )
         con.commit()
+        ctx.invalidate_dms()
 
-    # Update any other notified teachers
-    winner_name = t.full_name if t else teacher_id
-    ts = utc_now_iso()
-    for row in list_dms_for_cover(con, cover_id):
-        tid = row["teacher_id"]
-        ch = row["dm_channel_id"]
-        mts = row["dm_ts"]
-        status = row["status"]
-
-        if tid == teacher_id:
-            continue
-        if status == "DECLINED":
-            continue
-
-        client.chat_update(
-            channel=ch,
-            ts=mts,
-            text="Cover filled",
-            blocks=frozen_blocks(
-                f"Cover `{cover_id}` has been filled ({winner_name})."
-            ),
-        )
-        set_status(con, cover_id, tid, "LOST", ts)
+    # Update any other notified teachers (parallel, one batched status write)
+    failed = close_lost_dms(BULK, ctx, winner_id, winner_name)
+    refresh_digests(con)
+    refresh_boards(con)
 
-    con.commit()
-    update_all_cover_cards(client, con, cover_id)
+    # Update public + admin panels
+    CARD_UPDATES.mark_dirty(cover_id)
 
     # Coordinator notification in panel thread if we have it
     ptr = get_admin_message(con, cover_id)
     if ptr:
-        channel_id, msg_ts = ptr
-        client.chat_postMessage(
-            channel=channel_id,
-            thread_ts=msg_ts,
-            text=f"Cover `{cover_id}` manually assigned to {winner_name}.",
+        admin_ch, admin_ts = ptr
+        text = (
+            f"Cover `{cover_id}` manually assigned to {winner_name}."
+            if assigned
+            else f"Cover `{cover_id}` filled ({winner_name})."
+        )
+        CARDS.chat_postMessage(
+            channel=admin_ch,
+            thread_ts=admin_ts,
+            text=text + lost_failures_note(failed),
         )
 
 
 # ----------------------------
-# Decline (teacher DM)
+# Background maintenance (expiry sweep + archival)
 # ----------------------------
-@app.action("decline_cover")
-def decline_cover_action(ack, body, client, respond):
-    ack()
-
-    cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
-    slack_user_id = body["user"]["id"]
-    teacher_id = TEACHER_ID_BY_SLACK.get(slack_user_id)
+SWEEP_INTERVAL_S = int(os.environ.get("SWEEP_INTERVAL_S", "900"))
 
-    dm_channel_id = body["channel"]["id"]
-    dm_ts = body["message"]["ts"]
 
-    # Only meaningful in DMs
-    if not dm_channel_id.startswith("D"):
-        respond("Decline is only available in the DM notification.")
-        return
+def expire_stale_covers(client, today: date | None = None) -> list[str]:
+    """
+    OPEN covers whose date has passed -> CANCELLED (one UPDATE), then freeze their
+    public/admin cards and any outstanding NOTIFIED DMs.
+    """
+    if today is None:
+        today = datetime.now(SYDNEY_TZ).date()
 
     con = get_con()
-    init_db(con)
-
-    cover = get_cover(con, cover_id)
-    if not cover:
-        client.chat_update(
-            channel=dm_channel_id,
-            ts=dm_ts,
-            text="Declined",
-            blocks=frozen_blocks("Declined. (Cover not found.)"),
-        )
-        return
-
-    if teacher_id:
-        upsert_dm(
-            con, cover_id, teacher_id, dm_channel_id, dm_ts, "DECLINED", utc_now_iso()
-        )
-        con.commit()
-
-    client.chat_update(
-        channel=dm_channel_id,
-        ts=dm_ts,
-        text="Declined",
-        blocks=frozen_blocks("Declined."),
-    )
-
-    update_all_cover_cards(client, con, cover_id)
-    respond("Recorded.")
-
+    try:
+        init_db(con)
 
-# ----------------------------
-# Accept (public or DM)
-# ----------------------------
-@app.action("accept_cover")
-def accept_cover_action(ack, body, client, respond):
-    ack()
+        try:
+            expired = expire_past_open_covers(con, today.isoformat())
+            expire_notified_dms(con, expired, utc_now_iso())
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+
+        if not expired:
+            return []
+
+        COVER_STORE.load(con)
+        for panel_id in list_panels_for_covers(con, expired):
+            ABSENCE_UPDATES.mark_dirty(str(panel_id), public=False)
+
+        # Batched pointer reads (one query per table, not per cover)
+        public_ptrs = get_cover_messages(con, expired)
+        admin_ptrs = get_admin_messages(con, expired)
+        dm_rows_by_cover: dict[str, list] = {}
+        for r in list_dms_for_covers(con, expired):
+            dm_rows_by_cover.setdefault(r["cover_id"], []).append(r)
+
+        updates: list[dict] = []
+        for cover_id in expired:
+            ctx = cover_ctx(con, cover_id)
+            ctx.seed(dm_rows=dm_rows_by_cover.get(cover_id, []))
+            if cover_id in public_ptrs:
+                ch, ts = public_ptrs[cover_id]
+                updates.append(
+                    dict(
+                        channel=ch,
+                        ts=ts,
+                        text=f"Cover {cover_id}",
+                        blocks=public_cover_blocks(ctx),
+                    )
+                )
+            if cover_id in admin_ptrs:
+                ch, ts = admin_ptrs[cover_id]
+                updates.append(
+                    dict(
+                        channel=ch,
+                        ts=ts,
+                        text=f"Coordinator panel {cover_id}",
+                        blocks=admin_cover_blocks(ctx),
+                    )
+                )
 
-    cover_id = json.loads(body["actions"][0]["value"])["cover_id"]
-    slack_user_id = body["user"]["id"]
-    teacher_id = TEACHER_ID_BY_SLACK.get(slack_user_id)
-
-    channel_id = body["channel"]["id"]
-    msg_ts = body["message"]["ts"]
-    is_dm = channel_id.startswith("D")
-
-    if not teacher_id:
-        if is_dm:
-            client.chat_update(
-                channel=channel_id,
-                ts=msg_ts,
-                text="Not linked",
-                blocks=frozen_blocks("You are not linked to a Teacher profile yet."),
-            )
-        else:
-            client.chat_postEphemeral(
-                channel=channel_id,
-                user=slack_user_id,
-                text="You are not linked to a Teacher profile yet.",
+        dm_rows = [
+            r
+            for rows in dm_rows_by_cover.values()
+            for r in rows
+            if r["status"] == "EXPIRED"
+            and not DIGESTS.is_digest(r["dm_channel_id"], r["dm_ts"])
+        ]
+        for r in dm_rows:
+            updates.append(
+                dict(
+                    channel=r["dm_channel_id"],
+                    ts=r["dm_ts"],
+                    text="Cover expired",
+                    blocks=frozen_blocks(f"Cover `{r['cover_id']}` has expired."),
+                )
             )
-        return
 
-    con = get_con()
-    init_db(con)
-
-    cover = get_cover(con, cover_id)
-    if not cover:
-        if is_dm:
-            client.chat_update(
-                channel=channel_id,
-                ts=msg_ts,
-                text="Not found",
-                blocks=frozen_blocks("Cover not found."),
-            )
-        else:
-            client.chat_postEphemeral(
-                channel=channel_id, user=slack_user_id, text="Cover not found."
-            )
-        return
+        results = gather([client.submit("chat_update", **u) for u in updates])
+        for u, (_res, err) in zip(updates, results):
+            if err is not None:
+                print("expiry sweep: chat_update failed:", err)
+                RENDERS.forget(u["channel"], u["ts"])
+            else:
+                RENDERS.remember(**u)
 
-    # Gate by "recommended list" (your rule)
-    rec = get_recommendations_for_cover(con, cover_id, TEACHERS_BY_ID, CLASSES_BY_ID)
-    if teacher_id not in rec.recommended:
-        # Prefer showing specific reasons if present
-        reasons = []
-        if teacher_id in rec.soft_excluded:
-            reasons = rec.soft_excluded[teacher_id]
-        elif teacher_id in rec.hard_rejected:
-            reasons = rec.hard_rejected[teacher_id]
-
-        msg = "You are not eligible to accept this cover.\n" + codes_to_bullets(reasons)
-
-        if is_dm:
-            client.chat_update(
-                channel=channel_id,
-                ts=msg_ts,
-                text="Not eligible",
-                blocks=frozen_blocks(msg),
-            )
-        else:
-            client.chat_postEphemeral(channel=channel_id, user=slack_user_id, text=msg)
-        return
+        return expired
+    finally:
+        con.close()
 
-    # Busy map for deterministic clash check (regular + filled covers)
-    busy_map = build_busy_map(con)
 
-    ok, reason_or_msg = attempt_accept(
-        con,
-        cover_id,
-        teacher_id,
-        TEACHERS_BY_ID,
-        CLASSES_BY_ID,
-        busy_map,
-    )
+JOB_RETENTION_DAYS = 7
 
-    cover = get_cover(con, cover_id)
-    if not cover:
-        return
 
-    winner_id = cover.assigned_teacher_id
-    winner = TEACHERS_BY_ID.get(winner_id) if winner_id else None
-    winner_name = winner.full_name if winner else (winner_id or "unknown")
+def _job_purge_cutoff() -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=JOB_RETENTION_DAYS)).isoformat()
 
-    if ok:
-        # If accepted from DM, mark that DM record as accepted
-        if is_dm:
-            upsert_dm(
-                con, cover_id, teacher_id, channel_id, msg_ts, "ACCEPTED", utc_now_iso()
-            )
-            con.commit()
-            client.chat_update(
-                channel=channel_id,
-                ts=msg_ts,
-                text="Accepted",
-                blocks=frozen_blocks(
-                    f"Accepted. You are assigned to cover `{cover_id}`."
-                ),
-            )
-        else:
-            # Accepted from public channel: confirm via ephemeral and DM the winner
-            client.chat_postEphemeral(
-                channel=channel_id,
-                user=slack_user_id,
-                text=f"Accepted. You are assigned to cover `{cover_id}`.",
-            )
 
-            t = TEACHERS_BY_ID.get(teacher_id)
-            if t and t.slack_user_id:
-                cover = get_cover(con, cover_id)
-                template = CLASSES_BY_ID[cover.class_id]
-                c = materialize_for_cover_date(template, cover.cover_date)
-                blocks = frozen_blocks(
-                    f"Accepted. You are assigned to cover `{cover_id}`.\n"
-                    f"Class: `{c.class_id}`\n"
-                    f"Campus: {c.campus.title()}\n"
-                    f"When: {fmt_local_range(c.start_at, c.end_at)} (Sydney time)"
-                )
-                dm_channel_id, dm_ts = dm_teacher(
-                    client, t.slack_user_id, f"Cover {cover_id} accepted", blocks
-                )
-                upsert_dm(
-                    con,
-                    cover_id,
-                    teacher_id,
-                    dm_channel_id,
-                    dm_ts,
-                    "ACCEPTED",
-                    utc_now_iso(),
-                )
+def _maintenance_loop(client) -> None:
+    while True:
+        try:
+            expired = expire_stale_covers(client)
+            if expired:
+                print(f"Expired {len(expired)} stale covers.")
+
+            con = get_con()
+            try:
+                init_db(con)
+                # Catches new/expired covers and other processes' fills
+                refresh_digests(con)
+                refresh_boards(con)
+                archive_closed_covers(con)
+                purge_finished_jobs(con, _job_purge_cutoff())
+                purge_expired_actions(con, datetime.now(timezone.utc).isoformat())
                 con.commit()
+            finally:
+                # Never sleep holding a connection (or its write lock)
+                con.close()
+        except Exception as e:
+            print("maintenance failed:", e)
 
-        # Update all other DMs (lost)
-        ts = utc_now_iso()
-        for row in list_dms_for_cover(con, cover_id):
-            tid = row["teacher_id"]
-            ch = row["dm_channel_id"]
-            mts = row["dm_ts"]
-            status = row["status"]
+        time.sleep(SWEEP_INTERVAL_S)
 
-            if tid == teacher_id:
-                continue
-            if status == "DECLINED":
-                continue
 
-            client.chat_update(
-                channel=ch,
-                ts=mts,
-                text="Cover filled",
-                blocks=frozen_blocks(
-                    f"Cover `{cover_id}` has been filled ({winner_name})."
-                ),
-            )
-            set_status(con, cover_id, tid, "LOST", ts)
+def start_maintenance(client) -> None:
+    threading.Thread(
+        target=_maintenance_loop, args=(client,), name="maintenance", daemon=True
+    ).start()
 
-        con.commit()
 
-        # Update public + admin panels
-        update_all_cover_cards(client, con, cover_id)
-
-        # Coordinator notification in panel thread if we have it
-        ptr = get_admin_message(con, cover_id)
-        if ptr:
-            admin_ch, admin_ts = ptr
-            client.chat_postMessage(
-                channel=admin_ch,
-                thread_ts=admin_ts,
-                text=f"Cover `{cover_id}` filled ({winner_name}).",
-            )
+def prewarm_dm_channels(client) -> None:
+    """
+    Open (and persist) IM channels for every linked teacher not cached yet.
+    Runs in the background so startup isn't blocked on Slack.
+    """
 
-        return
+    def run() -> None:
+        try:
+            n = DM_CHANNELS.prewarm(client, list(TEACHER_ID_BY_SLACK.keys()))
+            print(f"Pre-warmed {n} DM channels.")
+        except Exception as e:
+            print("DM channel prewarm failed:", e)
 
-    # Not accepted
-    # attempt_accept gives reason_str like "code|code|code"
-    codes = split_reason_str(reason_or_msg)
-    msg = (
-        "Could not accept.\n" + codes_to_bullets(codes)
-        if codes
-        else "Could not accept."
-    )
+    threading.Thread(target=run, name="dm-prewarm", daemon=True).start()
 
-    if is_dm:
-        client.chat_update(
-            channel=channel_id,
-            ts=msg_ts,
-            text="Could not accept",
-            blocks=frozen_blocks(msg),
-        )
-    else:
-        client.chat_postEphemeral(channel=channel_id, user=slack_user_id, text=msg)
 
-    update_all_cover_cards(client, con, cover_id)
+if __name__ == "__main__":
+    JOBS.start()
+    start_maintenance(BULK)
+    prewarm_dm_channels(BULK)
 
+    if BOT_RUNTIME == "async":
+        from async_runtime import run_async
 
-if __name__ == "__main__":
-    SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"]).start()
+        run_async(ROUTES, app.client, os.environ["SLACK_APP_TOKEN"])
+    else:
+        SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"]).start()
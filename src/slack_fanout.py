@@ -0,0 +1,35 @@
+# src/slack_fanout.py
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+FANOUT_MAX_WORKERS = 8
+
+
+def fan_out(
+    tasks: list[Callable[[], Any]], max_workers: int = FANOUT_MAX_WORKERS
+) -> list[tuple[Any, Exception | None]]:
+    """
+    Runs multi-call tasks (e.g. open IM + post) concurrently on a bounded pool.
+    Rate limiting/retries happen underneath in SlackIO.
+    Returns [(result, None) | (None, exc)] in the same order as tasks.
+    """
+    if not tasks:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+        return gather([pool.submit(t) for t in tasks])
+
+
+def gather(futures: list[Future]) -> list[tuple[Any, Exception | None]]:
+    """
+    Waits for every future. Returns [(result, None) | (None, exc)] in order.
+    """
+    out: list[tuple[Any, Exception | None]] = []
+    for fut in futures:
+        try:
+            out.append((fut.result(), None))
+        except Exception as e:
+            out.append((None, e))
+    return out
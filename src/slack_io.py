@@ -0,0 +1,255 @@
+# src/slack_io.py
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any
+
+from slack_sdk.errors import SlackApiError
+
+# Lanes (lower runs first)
+PRIORITY_URGENT = 0  # accept/decline confirmations, ephemeral feedback
+PRIORITY_CARDS = 1  # public/admin card refreshes, thread notes
+PRIORITY_BULK = 2  # fan-out DMs, LOST updates, sweeps, prewarm
+
+LANE_NAMES = {PRIORITY_URGENT: "urgent", PRIORITY_CARDS: "cards", PRIORITY_BULK: "bulk"}
+
+SLACK_IO_WORKERS = 8
+MAX_RETRIES = 3
+
+# Web API tiers -> (tokens/sec, burst). Limits are per method per workspace.
+TIER_LIMITS: dict[str, tuple[float, int]] = {
+    "tier2": (20 / 60, 5),
+    "tier3": (50 / 60, 20),
+    "tier4": (100 / 60, 30),
+    # chat.postMessage is "special": ~1/s per channel. Every DM is its own channel,
+    # so one workspace-wide bucket with a higher rate is a fair approximation.
+    "post": (5, 20),
+}
+
+METHOD_TIERS: dict[str, str] = {
+    "chat_postMessage": "post",
+    "chat_update": "tier3",
+    "chat_postEphemeral": "tier4",
+    "conversations_open": "tier3",
+    "pins_add": "tier2",
+    "pins_remove": "tier2",
+    "views_open": "tier4",
+    "views_update": "tier4",
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens/sec, up to `burst` banked.
+    pause() empties it until a Retry-After has elapsed.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._tokens = 0.0
+            self._last = max(self._last, time.monotonic() + seconds)
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available and returns 0; otherwise returns the
+        seconds until one will be (nothing is taken).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._last:
+                # paused (Retry-After)
+                return self._last - now
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    method: str = field(compare=False)
+    kwargs: dict = field(compare=False)
+    future: Future = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+    # monotonic time it first reached the head of its method's queue without a token
+    held_since: float | None = field(default=None, compare=False)
+
+
+@dataclass
+class SlackIOStats:
+    calls: dict[str, int] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    rate_limited: int = 0  # 429s seen
+    throttled: int = 0  # calls that waited on a bucket
+    throttled_s: float = 0.0
+
+
+class SlackIO:
+    """
+    Single path for Slack Web API writes: priority lanes, per-method buckets sized
+    by tier, and Retry-After-aware retries on 429.
+
+    Handlers use lanes (SLACK.lane(PRIORITY_URGENT).chat_update(...)) which block
+    for the result, or lane.submit(...) for a Future.
+
+    Jobs queue per method, and a worker only takes a job whose bucket has a
+    token, so no worker sits on a throttled call while URGENT work waits. The
+    next token for a method goes to its highest-priority job.
+    """
+
+    def __init__(self, client, workers: int = SLACK_IO_WORKERS) -> None:
+        self.client = client
+        self.stats = SlackIOStats()
+        self._queues: dict[str, list[_Job]] = {}
+        self._seq = itertools.count()
+        self._pending = {p: 0 for p in LANE_NAMES}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._buckets: dict[str, TokenBucket] = {}
+
+        for i in range(workers):
+            threading.Thread(
+                target=self._worker, name=f"slack-io-{i}", daemon=True
+            ).start()
+
+    def _bucket(self, method: str) -> TokenBucket:
+        """
+        Caller holds self._lock.
+        """
+        b = self._buckets.get(method)
+        if b is None:
+            rate, burst = TIER_LIMITS[METHOD_TIERS.get(method, "tier3")]
+            b = self._buckets[method] = TokenBucket(rate, burst)
+        return b
+
+    def _put(self, job: _Job) -> None:
+        with self._ready:
+            self._bucket(job.method)
+            self._pending[job.priority] += 1
+            heapq.heappush(self._queues.setdefault(job.method, []), job)
+            self._ready.notify()
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def submit(self, method: str, priority: int = PRIORITY_CARDS, **kwargs) -> Future:
+        fut: Future = Future()
+        self._put(_Job(priority, next(self._seq), method, kwargs, fut))
+        return fut
+
+    def call(self, method: str, priority: int = PRIORITY_CARDS, **kwargs) -> Any:
+        return self.submit(method, priority, **kwargs).result()
+
+    def lane(self, priority: int) -> "SlackLane":
+        return SlackLane(self, priority)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            depth = {LANE_NAMES[p]: n for p, n in self._pending.items()}
+            return {
+                "queue_depth": depth,
+                "calls": dict(self.stats.calls),
+                "errors": dict(self.stats.errors),
+                "rate_limited_429": self.stats.rate_limited,
+                "throttled_calls": self.stats.throttled,
+                "throttled_s": round(self.stats.throttled_s, 2),
+            }
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _take(self) -> _Job:
+        """
+        Blocks until some queued job has a token: the highest-priority such
+        job is dequeued with its token already taken.
+        """
+        with self._ready:
+            while True:
+                heads = sorted(
+                    (q[0], method) for method, q in self._queues.items() if q
+                )
+                wait = None
+                for job, method in heads:
+                    w = self._buckets[method].try_acquire()
+                    if w == 0:
+                        heapq.heappop(self._queues[method])
+                        self._pending[job.priority] -= 1
+                        self.stats.calls[method] = self.stats.calls.get(method, 0) + 1
+                        if job.held_since is not None:
+                            self.stats.throttled += 1
+                            self.stats.throttled_s += time.monotonic() - job.held_since
+                        return job
+                    if job.held_since is None:
+                        job.held_since = time.monotonic()
+                    wait = w if wait is None else min(wait, w)
+                self._ready.wait(wait)
+
+    def _worker(self) -> None:
+        while True:
+            job = self._take()
+            bucket = self._buckets[job.method]
+
+            try:
+                res = getattr(self.client, job.method)(**job.kwargs)
+                job.future.set_result(res)
+            except SlackApiError as e:
+                resp = e.response
+                if (
+                    resp is not None
+                    and resp.status_code == 429
+                    and job.attempt < MAX_RETRIES
+                ):
+                    retry_after = float(resp.headers.get("Retry-After", "1"))
+                    bucket.pause(retry_after)
+                    job.attempt += 1
+                    with self._lock:
+                        self.stats.rate_limited += 1
+                    # same priority + seq: keeps its place in the lane
+                    self._put(job)
+                    continue
+                self._fail(job, e)
+            except Exception as e:
+                self._fail(job, e)
+
+    def _fail(self, job: _Job, e: Exception) -> None:
+        with self._lock:
+            self.stats.errors[job.method] = self.stats.errors.get(job.method, 0) + 1
+        job.future.set_exception(e)
+
+
+class SlackLane:
+    """
+    Client-shaped view of SlackIO at one priority: lane.chat_update(**kw) blocks
+    for the response, so it can stand in for a WebClient in existing helpers.
+    """
+
+    def __init__(self, io: SlackIO, priority: int) -> None:
+        self.io = io
+        self.priority = priority
+
+    def submit(self, method: str, **kwargs) -> Future:
+        return self.io.submit(method, self.priority, **kwargs)
+
+    def __getattr__(self, method: str):
+        def call(**kwargs):
+            return self.io.call(method, self.priority, **kwargs)
+
+        return call
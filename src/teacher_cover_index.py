@@ -0,0 +1,135 @@
+# src/teacher_cover_index.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from algorithm import is_eligible, travel_buffer_reason
+from cover_store import CoverStore
+from cover_time import materialize_for_cover_date, week_start
+from models import ClassSession
+from recommendation_cache import RecommendationCache
+
+
+class TeacherCoverIndex:
+    """
+    Reverse index: teacher_id -> OPEN cover_ids they may accept (the cover's
+    recommended list, which is what the Accept button is gated on).
+
+    Built once from RECS, then kept in step with CoverStore.generation
+    incrementally. A fill only changes the winner's standing (a new clash, one
+    more cover that week, a travel gap on that weekday), so a sync touches:
+    - new covers: their recommended list (one RECS entry each)
+    - closed covers: dropped
+    - each new fill: the winner alone, re-checked on the open covers
+    Teachers whose entry moved are collected until take_changed().
+    """
+
+    def __init__(self, store: CoverStore, recs: RecommendationCache) -> None:
+        self.store = store
+        self.recs = recs
+        self._generation: int | None = None
+        self._sessions: dict[str, tuple[str, ClassSession]] = {}
+        self._filled: set[str] = set()
+        self._by_cover: dict[str, frozenset[str]] = {}
+        self._by_teacher: dict[str, set[str]] = {}
+        self._changed: set[str] = set()
+        self._lock = threading.Lock()
+        # One sync at a time: each applies a diff against the previous one
+        self._sync_lock = threading.Lock()
+
+    def sync(self, con: sqlite3.Connection) -> None:
+        with self._sync_lock:
+            self.store.sync(con)
+            gen = self.store.generation
+            if gen == self._generation:
+                return
+
+            cached = self.store.list_cached(con)
+            open_covers = {c.cover_id: c for c in cached if c.status == "OPEN"}
+            filled = {c.cover_id: c for c in cached if c.status == "FILLED"}
+            first = self._generation is None
+
+            with self._lock:
+                for cover_id in [
+                    cid for cid in self._by_cover if cid not in open_covers
+                ]:
+                    self._move(cover_id, self._by_cover.pop(cover_id), frozenset())
+                    self._sessions.pop(cover_id, None)
+
+            for cover_id, cover in open_covers.items():
+                if cover_id in self._sessions:
+                    continue
+                template = self.recs.classes_by_id.get(cover.class_id)
+                if template is None:
+                    continue
+                try:
+                    c = materialize_for_cover_date(template, cover.cover_date)
+                except ValueError:
+                    continue
+                self._sessions[cover_id] = (week_start(cover.cover_date), c)
+                rec = self.recs.get(con, cover_id, cover=cover)
+                self._set(cover_id, frozenset(rec.recommended))
+
+            if not first:
+                winners = {
+                    cover.assigned_teacher_id
+                    for cover_id, cover in filled.items()
+                    if cover_id not in self._filled and cover.assigned_teacher_id
+                }
+                for teacher_id in winners:
+                    self._recheck(con, teacher_id)
+
+            self._filled = set(filled)
+            self._generation = gen
+
+    def _recheck(self, con: sqlite3.Connection, teacher_id: str) -> None:
+        t = self.recs.teachers_by_id.get(teacher_id)
+        if t is None:
+            return
+        busy = self.recs.busy_map(con)
+        loads: dict[str, int] = {}
+        for cover_id, (wk, c) in list(self._sessions.items()):
+            if wk not in loads:
+                loads[wk] = (
+                    self.recs.loads.week(con, wk).get(teacher_id, 0)
+                    if self.recs.loads
+                    else 0
+                )
+            ok = is_eligible(t, c, busy, loads[wk]) and (
+                travel_buffer_reason(teacher_id, c, busy) is None
+            )
+            tids = self._by_cover.get(cover_id, frozenset())
+            if ok != (teacher_id in tids):
+                self._set(cover_id, tids | {teacher_id} if ok else tids - {teacher_id})
+
+    def _set(self, cover_id: str, tids: frozenset[str]) -> None:
+        with self._lock:
+            old = self._by_cover.get(cover_id, frozenset())
+            if tids != old:
+                self._move(cover_id, old, tids)
+            self._by_cover[cover_id] = tids
+
+    def _move(self, cover_id: str, old: frozenset[str], new: frozenset[str]) -> None:
+        for tid in old - new:
+            covers = self._by_teacher.get(tid)
+            if covers is not None:
+                covers.discard(cover_id)
+                if not covers:
+                    del self._by_teacher[tid]
+        for tid in new - old:
+            self._by_teacher.setdefault(tid, set()).add(cover_id)
+        self._changed |= old ^ new
+
+    def covers_for(self, con: sqlite3.Connection, teacher_id: str) -> list[str]:
+        self.sync(con)
+        with self._lock:
+            return sorted(self._by_teacher.get(teacher_id, ()))
+
+    def take_changed(self) -> set[str]:
+        """
+        Teachers whose eligible covers changed since the last call.
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed
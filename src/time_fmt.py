@@ -13,3 +13,9 @@ def fmt_local_range(start_utc, end_utc) -> str:
         return f"{s:%a %d %b %H:%M}–{e:%H:%M}"
     # crosses midnight
     return f"{s:%a %d %b %H:%M}–{e:%a %d %b %H:%M}"
+
+
+def mm_to_hhmm(m: int) -> str:
+    h = m // 60
+    mm = m % 60
+    return f"{h:02d}:{mm:02d}"
@@ -0,0 +1,54 @@
+import sqlite3
+
+# IMPORTANT: does NOT commit. Caller decides.
+
+
+def add_week_load(con: sqlite3.Connection, teacher_id: str, week_start: str) -> None:
+    """
+    One more filled cover for teacher_id in the week starting week_start (Monday).
+    """
+    con.execute(
+        """
+      INSERT INTO teacher_week_loads (week_start, teacher_id, covers)
+      VALUES (?, ?, 1)
+      ON CONFLICT(week_start, teacher_id) DO UPDATE SET covers = covers + 1
+    """,
+        (week_start, teacher_id),
+    )
+
+
+def get_week_load(con: sqlite3.Connection, teacher_id: str, week_start: str) -> int:
+    row = con.execute(
+        "SELECT covers FROM teacher_week_loads WHERE week_start=? AND teacher_id=?",
+        (week_start, teacher_id),
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def list_week_loads(con: sqlite3.Connection, week_start: str) -> dict[str, int]:
+    """
+    teacher_id -> covers for one week (primary-key range read).
+    """
+    rows = con.execute(
+        "SELECT teacher_id, covers FROM teacher_week_loads WHERE week_start=?",
+        (week_start,),
+    ).fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def backfill_week_loads(con: sqlite3.Connection) -> int:
+    """
+    One-off: build the counters from FILLED covers if the table is still empty
+    (databases that filled covers before it existed). Returns rows inserted.
+    """
+    cur = con.execute(
+        """
+      INSERT INTO teacher_week_loads (week_start, teacher_id, covers)
+      SELECT date(cover_date, 'weekday 0', '-6 days'), assigned_teacher_id, COUNT(*)
+      FROM covers
+      WHERE status = 'FILLED' AND assigned_teacher_id IS NOT NULL
+        AND NOT EXISTS (SELECT 1 FROM teacher_week_loads)
+      GROUP BY 1, 2
+    """
+    )
+    return cur.rowcount
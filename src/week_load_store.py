@@ -0,0 +1,44 @@
+# src/week_load_store.py
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from cover_store import CoverStore
+from week_load_repo import list_week_loads
+
+
+class WeekLoadStore:
+    """
+    In-memory mirror of teacher_week_loads: week_start -> {teacher_id: covers}.
+
+    Weeks are read once (one primary-key range read) and then served from
+    memory, so a teacher's weekly load is a dict lookup. Every fill, ours or
+    another process's, moves CoverStore.generation, which drops the mirror.
+    """
+
+    def __init__(self, store: CoverStore) -> None:
+        self.store = store
+        self._generation: int | None = None
+        self._weeks: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def week(self, con: sqlite3.Connection, week_start: str) -> dict[str, int]:
+        """
+        Read-only: teacher_id -> covers filled in the week starting week_start.
+        """
+        self.store.sync(con)
+        gen = self.store.generation
+        with self._lock:
+            if gen != self._generation:
+                self._generation = gen
+                self._weeks = {}
+            loads = self._weeks.get(week_start)
+        if loads is not None:
+            return loads
+
+        loads = list_week_loads(con, week_start)
+        with self._lock:
+            if self._generation == gen:
+                self._weeks[week_start] = loads
+        return loads
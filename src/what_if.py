@@ -0,0 +1,187 @@
+# src/what_if.py
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from algorithm import eligibility_reasons, is_eligible
+from cover_models import CoverRequest
+from cover_time import materialize_for_cover_date, week_start
+from models import ClassSession, Teacher
+from reason_library import Reason
+
+
+class BusyOverlay(Mapping):
+    """
+    Copy-on-write view of a busy map: reads fall through to the shared base, and
+    only teachers given a hypothetical session get their own (copied) list.
+    Drop-in for busy_sessions_by_teacher anywhere in algorithm.py.
+    """
+
+    def __init__(self, base: Mapping[str, list[ClassSession]]) -> None:
+        self.base = base
+        self._own: dict[str, list[ClassSession]] = {}
+
+    def add(self, teacher_id: str, session: ClassSession) -> None:
+        own = self._own.get(teacher_id)
+        if own is None:
+            own = self._own[teacher_id] = list(self.base.get(teacher_id, []))
+        own.append(session)
+
+    def __getitem__(self, teacher_id: str) -> list[ClassSession]:
+        own = self._own.get(teacher_id)
+        return own if own is not None else self.base[teacher_id]
+
+    def __contains__(self, teacher_id: object) -> bool:
+        return teacher_id in self._own or teacher_id in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._own
+        yield from (tid for tid in self.base if tid not in self._own)
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for tid in self._own if tid not in self.base)
+
+
+@dataclass
+class CoverImpact:
+    cover_id: str
+    before: int  # candidates without the hypothetical assignments
+    lost: list[str] = field(default_factory=list)  # teacher_ids no longer eligible
+
+    @property
+    def after(self) -> int:
+        return self.before - len(self.lost)
+
+
+@dataclass
+class WhatIfReport:
+    # tentative assignments that are themselves invalid (e.g. clash with another one)
+    conflicts: dict[tuple[str, str], list[Reason]]
+    # open covers that had candidates and would have none left
+    newly_unfillable: list[CoverImpact]
+    # open covers that keep some candidates but lose at least one
+    shrunk: list[CoverImpact]
+
+
+class WhatIf:
+    """
+    Tentative assignments over the open covers, nothing written.
+
+    assign(cover_id, teacher_id) adds the cover's session to the teacher in a
+    BusyOverlay and bumps their weekly load. Only that teacher's standing on
+    open covers in the same week can change, so only those covers are
+    re-checked (one decide() each); a cover's full candidate pool is counted
+    only once the teacher actually drops out of it.
+
+    pools(cover_id) -> the cover's current candidates; defaults to running
+    eligibility here, callers with cached recommendations pass their own.
+    """
+
+    def __init__(
+        self,
+        open_covers: list[CoverRequest],
+        teachers_by_id: dict[str, Teacher],
+        classes_by_id: dict[str, ClassSession],
+        busy_map: Mapping[str, list[ClassSession]],
+        weekly_loads: Mapping[str, Mapping[str, int]],
+        declined: set[tuple[str, str]] | None = None,
+        pools: Callable[[str], set[str]] | None = None,
+    ) -> None:
+        self.teachers_by_id = teachers_by_id
+        self.busy = BusyOverlay(busy_map)
+        self._base_busy = busy_map
+        self._base_loads = weekly_loads
+        self._load_delta: dict[tuple[str, str], int] = {}
+        self.declined = declined or set()
+        self._pools = pools
+
+        # cover_id -> (week, session); week -> cover_ids
+        self._sessions: dict[str, tuple[str, ClassSession]] = {}
+        self._by_week: dict[str, list[str]] = {}
+        for cover in open_covers:
+            template = classes_by_id.get(cover.class_id)
+            if template is None:
+                continue
+            try:
+                c = materialize_for_cover_date(template, cover.cover_date)
+            except ValueError:
+                continue
+            wk = week_start(cover.cover_date)
+            self._sessions[cover.cover_id] = (wk, c)
+            self._by_week.setdefault(wk, []).append(cover.cover_id)
+
+        self._assigned: dict[str, str] = {}
+        self._baseline_pools: dict[str, set[str]] = {}
+        self._lost: dict[str, set[str]] = {}
+        self.conflicts: dict[tuple[str, str], list[Reason]] = {}
+
+    def _load(self, teacher_id: str, wk: str) -> int:
+        base = self._base_loads.get(wk, {}).get(teacher_id, 0)
+        return base + self._load_delta.get((teacher_id, wk), 0)
+
+    def _pool(self, cover_id: str) -> set[str]:
+        if self._pools is not None:
+            return self._pools(cover_id)
+        wk, c = self._sessions[cover_id]
+        loads = self._base_loads.get(wk, {})
+        return {
+            t.teacher_id
+            for t in self.teachers_by_id.values()
+            if (cover_id, t.teacher_id) not in self.declined
+            and is_eligible(t, c, self._base_busy, loads.get(t.teacher_id, 0))
+        }
+
+    def assign(self, cover_id: str, teacher_id: str) -> None:
+        if cover_id not in self._sessions or teacher_id not in self.teachers_by_id:
+            return
+        wk, c = self._sessions[cover_id]
+        t = self.teachers_by_id[teacher_id]
+
+        # Still valid given the earlier tentative assignments?
+        reasons = eligibility_reasons(t, c, self.busy, self._load(teacher_id, wk))
+        if reasons:
+            self.conflicts[(cover_id, teacher_id)] = reasons
+
+        self._assigned[cover_id] = teacher_id
+        self.busy.add(teacher_id, c)
+        self._load_delta[(teacher_id, wk)] = (
+            self._load_delta.get((teacher_id, wk), 0) + 1
+        )
+        self._recheck(teacher_id, wk)
+
+    def _recheck(self, teacher_id: str, wk: str) -> None:
+        t = self.teachers_by_id[teacher_id]
+        load = self._load(teacher_id, wk)
+        base_load = self._base_loads.get(wk, {}).get(teacher_id, 0)
+        for other in self._by_week.get(wk, []):
+            if other in self._assigned or teacher_id in self._lost.get(other, ()):
+                continue
+            _wk, c = self._sessions[other]
+            if is_eligible(t, c, self.busy, load):
+                continue
+            # Dropped out now; only a loss if they were a candidate to begin with
+            if (other, teacher_id) in self.declined or not is_eligible(
+                t, c, self._base_busy, base_load
+            ):
+                continue
+            pool = self._baseline(other)
+            if teacher_id in pool:
+                self._lost.setdefault(other, set()).add(teacher_id)
+
+    def _baseline(self, cover_id: str) -> set[str]:
+        pool = self._baseline_pools.get(cover_id)
+        if pool is None:
+            pool = self._baseline_pools[cover_id] = self._pool(cover_id)
+        return pool
+
+    def report(self) -> WhatIfReport:
+        unfillable: list[CoverImpact] = []
+        shrunk: list[CoverImpact] = []
+        for cover_id, lost in sorted(self._lost.items()):
+            if cover_id in self._assigned or not lost:
+                continue
+            impact = CoverImpact(cover_id, len(self._baseline(cover_id)), sorted(lost))
+            (unfillable if impact.after <= 0 else shrunk).append(impact)
+        return WhatIfReport(dict(self.conflicts), unfillable, shrunk)